@@ -1,5 +1,6 @@
 """Main Singapore SMB Support Agent using Pydantic AI."""
 
+import time
 
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
@@ -9,6 +10,7 @@ from app.agent.prompts.system import RESPONSE_GENERATION_PROMPT, SYSTEM_PROMPT
 from app.agent.validators import ResponseValidator
 from app.config import settings
 from app.memory.manager import MemoryManager
+from app.services.session_lock import session_locks
 
 
 class AgentContext(BaseModel):
@@ -61,6 +63,7 @@ class SupportAgent:
         self.db = db
         self.validator = ResponseValidator()
         self.ws_manager = ws_manager
+        self._turn_started_at: dict[str, float] = {}
 
     def _get_system_prompt(self, context: AgentContext) -> str:
         """Get formatted system prompt with context."""
@@ -111,7 +114,24 @@ class SupportAgent:
 
         Returns:
             AgentResponse with generated response
+
+        Raises:
+            SessionLockTimeoutError: If an earlier turn for the session holds the lock too long
         """
+        async with session_locks.acquire(session_id):
+            self._turn_started_at[session_id] = time.perf_counter()
+            try:
+                return await self._process_message(message, session_id, user_id)
+            finally:
+                self._turn_started_at.pop(session_id, None)
+
+    async def _process_message(
+        self,
+        message: str,
+        session_id: str,
+        user_id: int | None = None,
+    ) -> AgentResponse:
+        """Process a user message while holding the session lock."""
         try:
             await self._emit_thought(session_id, "assembling_context")
 
@@ -215,12 +235,14 @@ class SupportAgent:
     async def _emit_thought(self, session_id: str, step: str, details: str = ""):
         """Emit thought event via WebSocket if manager is available."""
         if self.ws_manager:
+            started_at = self._turn_started_at.get(session_id, time.perf_counter())
             await self.ws_manager.send_message(
                 session_id=session_id,
                 message={
                     "type": "thought",
                     "step": step,
                     "details": details,
+                    "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 1),
                 },
             )
 
@@ -12,43 +12,18 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agent.support_agent import get_support_agent
-from app.dependencies import get_db, get_memory_manager
+from app.dependencies import db_session_scope, get_db, get_memory_manager
+from app.memory.manager import MemoryManager
+from app.memory.short_term import ShortTermMemory
 from app.models.schemas import ChatRequest, ChatResponse, SourceCitation
-from app.rag.pipeline import rag_pipeline
+from app.rag.pipeline import get_rag_pipeline
+from app.services.connection_manager import manager
+from app.services.session_lock import SessionLockTimeoutError
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 security = HTTPBearer(auto_error=False)
 
 
-class ConnectionManager:
-    """Manage WebSocket connections."""
-
-    def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
-
-    async def connect(self, session_id: str, websocket: WebSocket):
-        """Accept a WebSocket connection."""
-        await websocket.accept()
-        self.active_connections[session_id] = websocket
-
-    def disconnect(self, session_id: str):
-        """Remove a WebSocket connection."""
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-
-    async def send_message(
-        self,
-        session_id: str,
-        message: dict,
-    ):
-        """Send a message to a specific session."""
-        if session_id in self.active_connections:
-            await self.active_connections[session_id].send_json(message)
-
-
-manager = ConnectionManager()
-
-
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -80,7 +55,7 @@ async def chat(
         user_id = session_data.get("user_id")
 
         agent = await get_support_agent(
-            rag_pipeline=rag_pipeline,
+            rag_pipeline=get_rag_pipeline(),
             memory_manager=memory_manager,
             db=db,
         )
@@ -112,6 +87,11 @@ async def chat(
 
     except HTTPException:
         raise
+    except SessionLockTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A previous message for this session is still being processed.",
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -120,16 +100,15 @@ async def chat(
 
 
 @router.websocket("/ws")
-async def websocket_chat(
-    websocket: WebSocket,
-    db: AsyncSession = Depends(get_db),
-):
+async def websocket_chat(websocket: WebSocket):
     """
     WebSocket endpoint for real-time chat.
 
+    A database session is borrowed from the pool only while a message is
+    being processed, so idle sockets do not hold Postgres connections.
+
     Args:
         websocket: WebSocket connection
-        db: Database session
     """
     session_id = None
 
@@ -139,9 +118,7 @@ async def websocket_chat(
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
-        memory_manager = await get_memory_manager(db)
-
-        session_data = await memory_manager.get_session(session_id)
+        session_data = await ShortTermMemory.get_session(session_id)
         if not session_data:
             await websocket.send_json(
                 {
@@ -154,14 +131,9 @@ async def websocket_chat(
 
         await manager.connect(session_id, websocket)
 
-        agent = await get_support_agent(
-            rag_pipeline=rag_pipeline,
-            memory_manager=memory_manager,
-            db=db,
-            ws_manager=manager,
-        )
-
-        await websocket.send_json(
+        await manager.send_personal(
+            session_id,
+            websocket,
             {
                 "type": "connected",
                 "message": "Connected to support agent",
@@ -177,7 +149,9 @@ async def websocket_chat(
 
             if message_type == "message":
                 if not message_content:
-                    await websocket.send_json(
+                    await manager.send_personal(
+                        session_id,
+                        websocket,
                         {
                             "type": "error",
                             "message": "Message cannot be empty",
@@ -187,13 +161,34 @@ async def websocket_chat(
 
                 user_id = session_data.get("user_id")
 
-                response = await agent.process_message(
-                    message=message_content,
-                    session_id=session_id,
-                    user_id=user_id,
-                )
+                try:
+                    async with db_session_scope() as db:
+                        agent = await get_support_agent(
+                            rag_pipeline=get_rag_pipeline(),
+                            memory_manager=MemoryManager(db),
+                            db=db,
+                            ws_manager=manager,
+                        )
+
+                        response = await agent.process_message(
+                            message=message_content,
+                            session_id=session_id,
+                            user_id=user_id,
+                        )
+                except SessionLockTimeoutError:
+                    await manager.send_personal(
+                        session_id,
+                        websocket,
+                        {
+                            "type": "error",
+                            "message": "A previous message is still being processed.",
+                        }
+                    )
+                    continue
 
-                await websocket.send_json(
+                await manager.send_personal(
+                    session_id,
+                    websocket,
                     {
                         "type": "response",
                         "session_id": session_id,
@@ -207,7 +202,7 @@ async def websocket_chat(
                 )
 
             elif message_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send_personal(session_id, websocket, {"type": "pong"})
 
             elif message_type == "disconnect":
                 break
@@ -216,7 +211,9 @@ async def websocket_chat(
         pass
     except Exception as e:
         if session_id and session_id in manager.active_connections:
-            await manager.active_connections[session_id].send_json(
+            await manager.send_personal(
+                session_id,
+                websocket,
                 {
                     "type": "error",
                     "message": f"Error: {str(e)}",
@@ -224,7 +221,7 @@ async def websocket_chat(
             )
     finally:
         if session_id:
-            manager.disconnect(session_id)
+            await manager.disconnect(session_id, websocket)
 
 
 @router.get("/sessions/{session_id}")
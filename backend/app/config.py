@@ -22,6 +22,37 @@ class Settings(BaseSettings):
     QDRANT_URL: str = Field(
         default="http://localhost:6333", description="Qdrant vector database URL"
     )
+    QDRANT_KEYWORD_INDEXES: str = Field(
+        default="language,file_name,file_extension,source_path,doc_hash",
+        description="Comma-separated payload fields to index as keywords",
+    )
+    QDRANT_QUANTIZATION: str = Field(
+        default="int8", description="Vector quantization: int8 or none"
+    )
+    QDRANT_QUANTIZATION_RESCORE: bool = Field(
+        default=True, description="Rescore quantized search hits with original vectors"
+    )
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = Field(
+        default=2.0, ge=1.0, description="Candidates fetched per result before rescoring"
+    )
+    QDRANT_VECTORS_ON_DISK: bool = Field(
+        default=True, description="Keep original vectors memory-mapped on disk"
+    )
+    QDRANT_HNSW_M: int = Field(default=16, description="HNSW graph degree")
+    QDRANT_HNSW_EF_CONSTRUCT: int = Field(
+        default=100, description="HNSW construction beam width"
+    )
+    QDRANT_HNSW_EF: int = Field(default=128, description="HNSW search beam width")
+    VECTOR_STORE_BACKEND: str = Field(
+        default="qdrant", description="Knowledge base search backend: qdrant or local"
+    )
+    LOCAL_INDEX_PATH: str = Field(
+        default="data/snapshots/knowledge_base",
+        description="Snapshot directory loaded by the local vector index",
+    )
+    LOCAL_INDEX_NPROBE: int = Field(
+        default=8, ge=1, description="IVF lists searched per query by the local index"
+    )
 
     OPENROUTER_API_KEY: str = Field(
         ..., description="OpenRouter API key for LLM access"
@@ -47,10 +78,32 @@ class Settings(BaseSettings):
     )
 
     EMBEDDING_MODEL: str = Field(
-        default="text-embedding-3-small", description="Embedding model name"
+        default="text-embedding-3-small",
+        description="Embedding model name; local/<model> runs sentence-transformers on CPU",
     )
     EMBEDDING_DIMENSION: int = Field(
-        default=1536, description="Embedding vector dimension"
+        default=1536,
+        description="Embedding vector dimension (remote models); text-embedding-3 "
+        "models return truncated embeddings below their native size",
+    )
+    EMBEDDING_LOCAL_BACKEND: str = Field(
+        default="torch", description="Local embedding backend: torch or onnx"
+    )
+    EMBEDDING_LOCAL_DEVICE: str | None = Field(
+        default=None, description="Torch device for local embeddings (default: auto)"
+    )
+    EMBEDDING_LOCAL_BATCH_SIZE: int = Field(
+        default=32, ge=1, description="Texts per local embedding forward pass"
+    )
+    EMBEDDING_LOCAL_QUERY_PREFIX: str | None = Field(
+        default=None,
+        description="Instruction prepended to queries for local models "
+        "(default: the model's own, e.g. 'query: ' for e5)",
+    )
+    EMBEDDING_LOCAL_DOCUMENT_PREFIX: str | None = Field(
+        default=None,
+        description="Instruction prepended to ingested chunks for local models "
+        "(default: the model's own, e.g. 'passage: ' for e5)",
     )
     RERANKER_MODEL: str = Field(
         default="BAAI/bge-reranker-v2-m3", description="Reranker model name"
@@ -64,14 +117,126 @@ class Settings(BaseSettings):
         le=1.0,
         description="Similarity threshold for semantic chunking",
     )
+    CHUNK_BREAKPOINT_PERCENTILE: float | None = Field(
+        default=None,
+        ge=0.0,
+        le=100.0,
+        description="Split semantic chunks at adjacent-sentence distances above this percentile (overrides the threshold)",
+    )
+    KNOWLEDGE_BASE_COLLECTION: str = Field(
+        default="knowledge_base",
+        description="Knowledge base alias queried by retrieval (points at <name>_v<N>)",
+    )
+    KNOWLEDGE_BASE_KEEP_VERSIONS: int = Field(
+        default=2,
+        ge=1,
+        description="Versioned knowledge base collections kept after a rebuild",
+    )
+    INGESTION_MANIFEST_DIR: str = Field(
+        default="data/manifests",
+        description="Directory for per-collection ingestion manifests",
+    )
+    INGESTION_WORKERS: int | None = Field(
+        default=None,
+        description="Processes for parsing and chunking (None: CPU count, 0: in-process thread)",
+    )
+    INGESTION_QUEUE_SIZE: int = Field(
+        default=8, description="Items buffered between ingestion stages"
+    )
+    INGESTION_UPSERT_BATCH_SIZE: int = Field(
+        default=256, description="Points per Qdrant upsert during ingestion"
+    )
+    INGESTION_SKIP_NEAR_DUPLICATES: bool = Field(
+        default=False,
+        description="Skip chunks that near-duplicate a chunk of another document",
+    )
+    NEAR_DUPLICATE_MAX_DISTANCE: int = Field(
+        default=3,
+        ge=0,
+        le=63,
+        description="Largest SimHash Hamming distance (of 64 bits) treated as a near duplicate",
+    )
+    EMBEDDING_MAX_BATCH_SIZE: int = Field(
+        default=256, description="Maximum texts per embedding request"
+    )
+    EMBEDDING_MAX_BATCH_TOKENS: int = Field(
+        default=100_000, description="Maximum total tokens per embedding request"
+    )
+    EMBEDDING_MAX_CONCURRENCY: int = Field(
+        default=4, description="Maximum embedding requests in flight"
+    )
+    EMBEDDING_MAX_RETRIES: int = Field(
+        default=6, description="Retries for rate-limited or failed embedding requests"
+    )
+    EMBEDDING_BATCH_WAIT_MS: int = Field(
+        default=20,
+        description="Milliseconds a partial embedding batch waits for more texts",
+    )
+    EMBEDDING_QUERY_BATCHING: bool = Field(
+        default=True,
+        description="Coalesce concurrent query-time embeddings into shared requests",
+    )
+    EMBEDDING_QUERY_BATCH_WAIT_MS: int = Field(
+        default=5,
+        description="Milliseconds a query embedding waits for concurrent queries",
+    )
+    EMBEDDING_QUERY_MAX_BATCH_SIZE: int = Field(
+        default=64, description="Maximum query texts per coalesced embedding request"
+    )
+    EMBEDDING_QUERY_MAX_RETRIES: int = Field(
+        default=2, description="Retries for failed query-time embedding requests"
+    )
+    MOCK_EMBEDDING_MODE: str = Field(
+        default="random",
+        description="Mock embeddings: random (per text) or semantic (hashed bag-of-words)",
+    )
+    EMBEDDING_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Reuse embeddings from the on-disk cache before calling the API",
+    )
+    EMBEDDING_CACHE_PATH: str = Field(
+        default="data/embedding_cache.sqlite3",
+        description="SQLite file for the embedding cache",
+    )
+    EMBEDDING_CACHE_QUERY_TIMEOUT_MS: int = Field(
+        default=100,
+        description="How long query-time cache writes wait for a locked database before skipping",
+    )
 
     RETRIEVAL_TOP_K: int = Field(
         default=50, description="Top K documents for retrieval"
     )
+    RETRIEVAL_MULTI_QUERY: bool = Field(
+        default=True, description="Search decomposed sub-queries alongside the rewritten query"
+    )
+    RETRIEVAL_MAX_SUB_QUERIES: int = Field(
+        default=3, ge=0, description="Maximum sub-queries searched per user query"
+    )
+    RRF_K: int = Field(default=60, ge=1, description="Reciprocal Rank Fusion damping constant")
+    RETRIEVAL_COLLAPSE_NEAR_DUPLICATES: bool = Field(
+        default=True,
+        description="Keep only the best chunk of each near-duplicate group before reranking",
+    )
     RERANK_TOP_N: int = Field(default=5, description="Top N documents after reranking")
     CONTEXT_TOKEN_BUDGET: int = Field(
         default=4000, description="Maximum tokens for context"
     )
+    CONTEXT_COMPRESSION_MODE: str = Field(
+        default="extractive",
+        description="Context compression: extractive (keyword heuristics) or mmr "
+        "(embedding similarity with Maximal Marginal Relevance)",
+    )
+    CONTEXT_MMR_DIVERSITY: float = Field(
+        default=0.3,
+        ge=0.0,
+        le=1.0,
+        description="MMR redundancy penalty weight (0 = relevance only)",
+    )
+    CONTEXT_MMR_MAX_SENTENCES: int = Field(
+        default=200,
+        ge=1,
+        description="Most candidate sentences MMR compression embeds per query",
+    )
 
     LLM_MODEL_PRIMARY: str = Field(
         default="openai/gpt-4o-mini", description="Primary LLM model"
@@ -96,6 +261,49 @@ class Settings(BaseSettings):
     )
     REQUEST_TIMEOUT: int = Field(default=30, description="Request timeout in seconds")
 
+    SESSION_LOCK_DISTRIBUTED: bool = Field(
+        default=False,
+        description="Use a Redis lock to serialize session turns across workers",
+    )
+    SESSION_LOCK_TIMEOUT_SECONDS: float = Field(
+        default=120.0, gt=0, description="Expiry of the distributed session lock"
+    )
+    SESSION_LOCK_WAIT_SECONDS: float = Field(
+        default=60.0, gt=0, description="Maximum wait for a session lock"
+    )
+
+    WS_FANOUT_ENABLED: bool = Field(
+        default=False,
+        description="Route WebSocket messages between workers via Redis pub/sub",
+    )
+    WS_FANOUT_BATCH_MS: int = Field(
+        default=5, ge=0, description="Buffer window for cross-worker WebSocket publishes"
+    )
+    WS_FANOUT_MAX_BATCH: int = Field(
+        default=100, gt=0, description="Maximum messages per cross-worker publish"
+    )
+    WS_FANOUT_ROUTE_CACHE_MS: int = Field(
+        default=1000,
+        ge=0,
+        description="How long a session's worker list is reused before re-reading Redis",
+    )
+    WS_PROGRESS_THROTTLE_MS: int = Field(
+        default=100, ge=0, description="Minimum interval between progress frames per socket"
+    )
+    WS_OUTBOUND_QUEUE_SIZE: int = Field(
+        default=256, gt=0, description="Per-socket outbound queue length before shedding progress"
+    )
+    WS_PER_MESSAGE_DEFLATE: bool = Field(
+        default=True, description="Negotiate permessage-deflate compression for WebSockets"
+    )
+
+    WARMUP_ON_STARTUP: bool = Field(
+        default=True, description="Load ML models during startup instead of on first request"
+    )
+    TORCH_NUM_THREADS: int | None = Field(
+        default=None, ge=1, description="Torch intra-op threads per worker (default: torch's own)"
+    )
+
     DEBUG: bool = Field(default=False, description="Debug mode")
     ENABLE_RAGAS_EVALUATION: bool = Field(
         default=False, description="Enable RAGAS evaluation"
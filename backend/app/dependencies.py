@@ -1,6 +1,7 @@
 """FastAPI dependency injection functions for Singapore SMB Support Agent."""
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 
 from fastapi import Depends, HTTPException, status
@@ -35,6 +36,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@asynccontextmanager
+async def db_session_scope() -> AsyncIterator[AsyncSession]:
+    """Borrow a database session for one unit of work (e.g. one WebSocket message)."""
+    async with async_session() as session:
+        yield session
+
+
 async def get_memory_manager(
     db: AsyncSession = Depends(get_db),
 ) -> MemoryManager:
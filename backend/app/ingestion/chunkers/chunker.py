@@ -1,7 +1,11 @@
 """Text chunking strategies for RAG."""
 
+from collections import deque
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from app.config import settings
+from app.services.tokenizer import count_tokens, count_tokens_batch, split_by_tokens
 
 
 class SemanticChunker:
@@ -12,38 +16,116 @@ class SemanticChunker:
         model_name: str = "all-MiniLM-L6-v2",
         chunk_size: int = 512,
         similarity_threshold: float = 0.5,
+        chunk_overlap: int = 0,
+        breakpoint_percentile: float | None = None,
+        tokenizer_model: str | None = None,
     ):
-        """Initialize semantic chunker."""
+        """
+        Initialize semantic chunker.
+
+        Args:
+            model_name: Sentence-transformers model for sentence embeddings
+            chunk_size: Maximum chunk size in tokens
+            similarity_threshold: Adjacent-sentence similarity below which to split
+            chunk_overlap: Tokens of trailing sentences repeated after a size-forced split
+            breakpoint_percentile: Split at adjacent distances above this percentile
+                of the document's distances instead of the fixed threshold
+            tokenizer_model: Model whose tokenizer measures chunk size
+        """
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
         self.chunk_size = chunk_size
         self.similarity_threshold = similarity_threshold
+        self.chunk_overlap = chunk_overlap
+        self.breakpoint_percentile = breakpoint_percentile
+        self.tokenizer_model = tokenizer_model
 
     def chunk(self, text: str) -> list[str]:
-        """Chunk text based on semantic boundaries."""
-        sentences = self._split_sentences(text)
+        """Chunk text based on semantic boundaries, capped at ``chunk_size`` tokens."""
+        sentences, token_counts = self._prepare_sentences(text)
 
         if not sentences:
             return []
 
-        embeddings = self.model.encode(sentences, convert_to_numpy=True)
+        breakpoints = self._find_breakpoints(sentences)
 
         chunks = []
-        current_chunk = [sentences[0]]
+        current: list[int] = []
+        current_tokens = 0
 
-        for i in range(1, len(sentences)):
-            similarity = self._cosine_similarity(embeddings[i - 1], embeddings[i])
+        for i, tokens in enumerate(token_counts):
+            if current and (i in breakpoints or current_tokens + tokens > self.chunk_size):
+                chunks.append(" ".join(sentences[j] for j in current))
 
-            if similarity < self.similarity_threshold:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = [sentences[i]]
-            else:
-                current_chunk.append(sentences[i])
+                # Only size-forced splits carry overlap; semantic breaks change topic.
+                if i in breakpoints:
+                    current, current_tokens = [], 0
+                else:
+                    current, current_tokens = self._overlap_tail(
+                        current, token_counts, self.chunk_size - tokens
+                    )
+
+            current.append(i)
+            current_tokens += tokens
 
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        if current:
+            chunks.append(" ".join(sentences[j] for j in current))
 
         return chunks
 
+    def _prepare_sentences(self, text: str) -> tuple[list[str], list[int]]:
+        """Split text into sentences no longer than ``chunk_size`` tokens."""
+        sentences = self._split_sentences(text)
+        token_counts = count_tokens_batch(sentences, self.tokenizer_model)
+
+        if all(tokens <= self.chunk_size for tokens in token_counts):
+            return sentences, token_counts
+
+        pieces = []
+        for sentence, tokens in zip(sentences, token_counts):
+            if tokens <= self.chunk_size:
+                pieces.append(sentence)
+            else:
+                pieces.extend(
+                    split_by_tokens(sentence, self.chunk_size, 0, self.tokenizer_model)
+                )
+        return pieces, count_tokens_batch(pieces, self.tokenizer_model)
+
+    def _find_breakpoints(self, sentences: list[str]) -> set[int]:
+        """Indices of sentences that start a new semantic segment."""
+        if len(sentences) < 2:
+            return set()
+
+        embeddings = self.model.encode(
+            sentences, convert_to_numpy=True, normalize_embeddings=True
+        )
+        # Row-wise dot products of unit vectors: all adjacent cosine similarities at once.
+        similarities = np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+
+        if self.breakpoint_percentile is not None:
+            distances = 1.0 - similarities
+            cutoff = np.percentile(distances, self.breakpoint_percentile)
+            split_after = np.flatnonzero(distances > cutoff)
+        else:
+            split_after = np.flatnonzero(similarities < self.similarity_threshold)
+
+        return set((split_after + 1).tolist())
+
+    def _overlap_tail(
+        self, indices: list[int], token_counts: list[int], room: int
+    ) -> tuple[list[int], int]:
+        """Trailing sentences within ``chunk_overlap`` tokens that leave ``room`` for the next."""
+        limit = min(self.chunk_overlap, room)
+        tail: list[int] = []
+        total = 0
+        for j in reversed(indices):
+            if total + token_counts[j] > limit:
+                break
+            tail.insert(0, j)
+            total += token_counts[j]
+        return tail, total
+
     def _split_sentences(self, text: str) -> list[str]:
         """Split text into sentences."""
         import re
@@ -51,64 +133,114 @@ class SemanticChunker:
         sentences = re.split(r"(?<=[.!?])\s+", text)
         return [s.strip() for s in sentences if s.strip()]
 
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors."""
-        return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-
 
 class RecursiveChunker:
-    """Recursive character chunking as fallback."""
+    """Recursive separator-based chunking measured in tokens."""
 
     def __init__(
         self,
         chunk_size: int = 500,
         chunk_overlap: int = 100,
-        separators: list[str] = ["\n\n", "\n", ". ", " ", ""],
+        separators: list[str] | None = None,
+        tokenizer_model: str | None = None,
     ):
-        """Initialize recursive chunker."""
+        """
+        Initialize recursive chunker.
+
+        Args:
+            chunk_size: Maximum chunk size in tokens
+            chunk_overlap: Tokens shared between consecutive chunks
+            separators: Separators tried from coarsest to finest
+            tokenizer_model: Model whose tokenizer measures chunk size
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})"
+            )
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.separators = separators
+        self.separators = separators or ["\n\n", "\n", ". ", " ", ""]
+        self.tokenizer_model = tokenizer_model
 
     def chunk(self, text: str) -> list[str]:
         """Recursively chunk text."""
-        return self._recursive_split(text, self.separators)
-
-    def _recursive_split(self, text: str, separators: list[str]) -> list[str]:
-        """Recursively split text using separators."""
-        separator = separators[0]
-
-        if separator == "":
-            return self._split_text(text, separator)
-
-        if separator not in text:
-            return self._recursive_split(text, separators[1:])
-
-        parts = text.split(separator)
-        chunks = []
-        current_chunk = ""
+        if not text.strip():
+            return []
 
-        for part in parts:
-            if len(current_chunk) + len(part) < self.chunk_size:
-                current_chunk += part + separator
+        pieces = self._split_pieces(text, count_tokens(text, self.tokenizer_model), self.separators)
+        return self._merge_pieces(pieces)
+
+    def _split_pieces(
+        self, text: str, tokens: int, separators: list[str]
+    ) -> list[tuple[str, int]]:
+        """Split text into (piece, tokens) pairs no larger than ``chunk_size``."""
+        if tokens <= self.chunk_size:
+            return [(text, tokens)]
+
+        for i, separator in enumerate(separators):
+            if separator == "":
+                windows = split_by_tokens(
+                    text, self.chunk_size, self.chunk_overlap, self.tokenizer_model
+                )
+                return list(zip(windows, count_tokens_batch(windows, self.tokenizer_model)))
+            if separator in text:
+                break
+        else:
+            return [(text, tokens)]
+
+        # Keep each separator on the piece before it so joining restores the text.
+        raw = text.split(separator)
+        parts = [part + separator for part in raw[:-1]] + [raw[-1]]
+        parts = [part for part in parts if part.strip()]
+
+        pieces = []
+        for part, part_tokens in zip(parts, count_tokens_batch(parts, self.tokenizer_model)):
+            if part_tokens <= self.chunk_size:
+                pieces.append((part, part_tokens))
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.rstrip())
-                current_chunk = part + separator
+                pieces.extend(self._split_pieces(part, part_tokens, separators[i + 1 :]))
+        return pieces
 
-        if current_chunk:
-            chunks.append(current_chunk.rstrip())
-
-        return chunks
-
-    def _split_text(self, text: str, separator: str) -> list[str]:
-        """Split text into chunks with overlap."""
+    def _merge_pieces(self, pieces: list[tuple[str, int]]) -> list[str]:
+        """Greedily pack pieces into chunks, carrying up to ``chunk_overlap`` tokens."""
         chunks = []
-        start = 0
-
-        while start < len(text):
-            end = start + self.chunk_size
-            chunks.append(text[start:end])
-            start = end - self.chunk_overlap
-
-        return chunks
+        window: deque[tuple[str, int]] = deque()
+        window_tokens = 0
+
+        for piece, tokens in pieces:
+            if window and window_tokens + tokens > self.chunk_size:
+                chunks.append("".join(p for p, _ in window))
+                while window and (
+                    window_tokens > self.chunk_overlap
+                    or window_tokens + tokens > self.chunk_size
+                ):
+                    _, dropped = window.popleft()
+                    window_tokens -= dropped
+
+            window.append((piece, tokens))
+            window_tokens += tokens
+
+        if window:
+            chunks.append("".join(p for p, _ in window))
+
+        return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def create_chunker(chunk_strategy: str = "semantic"):
+    """Factory function to create a chunker from settings."""
+    if chunk_strategy == "semantic":
+        return SemanticChunker(
+            model_name="all-MiniLM-L6-v2",
+            chunk_size=settings.CHUNK_SIZE,
+            similarity_threshold=settings.CHUNK_SIMILARITY_THRESHOLD,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            breakpoint_percentile=settings.CHUNK_BREAKPOINT_PERCENTILE,
+            tokenizer_model=settings.EMBEDDING_MODEL,
+        )
+    return RecursiveChunker(
+        chunk_size=settings.CHUNK_SIZE,
+        chunk_overlap=settings.CHUNK_OVERLAP,
+        separators=["\n\n", "\n", ". ", " ", ""],
+        tokenizer_model=settings.EMBEDDING_MODEL,
+    )
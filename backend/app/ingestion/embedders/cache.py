@@ -0,0 +1,326 @@
+"""Persistent on-disk embedding cache."""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from app.config import settings
+from app.services.metrics import metrics
+
+
+def text_hash(text: str) -> str:
+    """Compute the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed store of embedding vectors.
+
+    Rows are keyed by sha256(text), model and dimension, and vectors are
+    stored as float32 blobs. WAL mode lets several processes (ingestion
+    runs, API workers) read and write the same file.
+
+    Reads do not write: ``last_used_at`` updates are collected and written
+    in one transaction with the next ``put_many``, or once enough are
+    pending or the oldest is ``TOUCH_INTERVAL_S`` old.
+    """
+
+    TOUCH_BATCH_SIZE = 1000
+    TOUCH_INTERVAL_S = 60.0
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Initialize cache, creating the database file if needed.
+
+        Args:
+            path: SQLite database file
+            timeout: Seconds to wait for another connection's write lock
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._touched: dict[tuple[str, str, int], float] = {}
+        self._touched_since = 0.0
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (text_hash, model, dimension)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used_at)"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: list[str], model: str, dimension: int) -> dict[str, list[float]]:
+        """Look up vectors by text hash, returning only the hits."""
+        if not hashes:
+            return {}
+
+        unique = list(dict.fromkeys(hashes))
+        found: dict[str, list[float]] = {}
+        now = time.time()
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimension = ? AND text_hash IN ({placeholders})",
+                    [model, dimension, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+            if found:
+                if not self._touched:
+                    self._touched_since = time.monotonic()
+                for key in found:
+                    self._touched[(key, model, dimension)] = now
+                if (
+                    len(self._touched) >= self.TOUCH_BATCH_SIZE
+                    or time.monotonic() - self._touched_since >= self.TOUCH_INTERVAL_S
+                ):
+                    try:
+                        self._write_touches()
+                        self._conn.commit()
+                    except sqlite3.OperationalError:
+                        # Recency only guides pruning; drop it rather than wait for the lock.
+                        self._conn.rollback()
+                        metrics.increment("embedding_cache.touch_errors")
+                    self._touched.clear()
+
+        return found
+
+    def put_many(
+        self, items: list[tuple[str, list[float]]], model: str, dimension: int
+    ) -> None:
+        """Store (text hash, vector) pairs."""
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(text_hash, model, dimension, vector, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, model, dimension, array("f", vector).tobytes(), now, now)
+                        for key, vector in items
+                    ],
+                )
+                self._write_touches()
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._conn.rollback()
+                raise
+            self._touched.clear()
+
+    def flush(self) -> None:
+        """Write pending ``last_used_at`` updates."""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._touched.clear()
+
+    def _write_touches(self) -> None:
+        """Add pending ``last_used_at`` updates to the open transaction (lock held)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used_at = ? "
+                "WHERE text_hash = ? AND model = ? AND dimension = ?",
+                [(used, *key) for key, used in self._touched.items()],
+            )
+
+    def prune(
+        self,
+        max_age_days: float | None = None,
+        keep_models: list[str] | None = None,
+        max_entries: int | None = None,
+    ) -> int:
+        """
+        Delete cache entries.
+
+        Args:
+            max_age_days: Remove entries not used within this many days
+            keep_models: Remove entries for any model not in this list
+            max_entries: Keep at most this many most recently used entries
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            self._write_touches()
+            self._touched.clear()
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE last_used_at < ?", (cutoff,)
+                ).rowcount
+
+            if keep_models:
+                placeholders = ",".join("?" * len(keep_models))
+                removed += self._conn.execute(
+                    f"DELETE FROM embeddings WHERE model NOT IN ({placeholders})",
+                    keep_models,
+                ).rowcount
+
+            if max_entries is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid NOT IN ("
+                    "SELECT rowid FROM embeddings ORDER BY last_used_at DESC LIMIT ?)",
+                    (max_entries,),
+                ).rowcount
+
+            self._conn.commit()
+
+        return removed
+
+    def vacuum(self) -> None:
+        """Reclaim disk space after pruning."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def stats(self) -> dict:
+        """Entry counts per model and database size."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, dimension, COUNT(*) FROM embeddings GROUP BY model, dimension"
+            ).fetchall()
+
+        return {
+            "path": self.path,
+            "entries": sum(count for _, _, count in rows),
+            "models": [
+                {"model": model, "dimension": dimension, "entries": count}
+                for model, dimension, count in rows
+            ],
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def close(self) -> None:
+        """Write pending updates and close the database connection."""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._touched.clear()
+            self._conn.close()
+
+
+class CachedEmbeddingGenerator:
+    """Embedding generator wrapper that consults an EmbeddingCache first."""
+
+    def __init__(self, embedder, cache: EmbeddingCache, model: str | None = None):
+        """
+        Initialize cached generator.
+
+        Args:
+            embedder: Generator with async ``generate(texts)``
+            cache: Embedding cache to read and populate
+            model: Cache key model name (default: ``embedder.cache_key``, or
+                ``embedder.model`` when it has none)
+        """
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model or getattr(embedder, "cache_key", embedder.model)
+        self.dimension = embedder.dimension
+        self.hits = 0
+        self.misses = 0
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings, calling the wrapped generator only for cache misses.
+
+        SQLite calls run in a worker thread. A cache that stays locked longer
+        than its timeout counts as all misses and is not written, so slow
+        writers elsewhere never fail the request.
+        """
+        hashes = [text_hash(text) for text in texts]
+        try:
+            cached = await asyncio.to_thread(
+                self.cache.get_many, hashes, self.model, self.dimension
+            )
+        except sqlite3.OperationalError:
+            metrics.increment("embedding_cache.read_errors")
+            cached = {}
+
+        missing: dict[str, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        self.hits += len(texts) - sum(1 for key in hashes if key in missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = await self.embedder.generate(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            try:
+                await asyncio.to_thread(self.cache.put_many, fresh, self.model, self.dimension)
+            except sqlite3.OperationalError:
+                metrics.increment("embedding_cache.write_errors")
+            cached.update(fresh)
+
+        return [cached[key] for key in hashes]
+
+    async def generate_single(self, text: str) -> list[float]:
+        """Generate embedding for a single text."""
+        result = await self.generate([text])
+        return result[0]
+
+    def stats(self) -> dict:
+        """Hit and miss counters since creation."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the shared embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH)
+    return _embedding_cache
+
+
+_query_embedding_cache: EmbeddingCache | None = None
+
+
+def get_query_embedding_cache() -> EmbeddingCache:
+    """Get or create the embedding cache connection used at query time."""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        _query_embedding_cache = EmbeddingCache(
+            settings.EMBEDDING_CACHE_PATH,
+            timeout=settings.EMBEDDING_CACHE_QUERY_TIMEOUT_MS / 1000,
+        )
+    return _query_embedding_cache
@@ -4,25 +4,65 @@
 from openai import AsyncOpenAI
 
 from app.config import settings
+from app.ingestion.embedders.local_embedding import (
+    LocalEmbeddingGenerator,
+    instruction_prefix,
+    is_local_model,
+)
+
+# Native sizes of models that accept a smaller ``dimensions`` (Matryoshka
+# representation learning: a prefix of the vector is itself an embedding).
+MATRYOSHKA_MODELS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+def requested_dimensions(model: str, dimension: int) -> int | None:
+    """
+    The ``dimensions`` request parameter for a model and target size.
+
+    Returns None when the model's native size is wanted or unknown.
+
+    Raises:
+        ValueError: If a reduced size is asked of a model that cannot
+            produce one.
+    """
+    native = MATRYOSHKA_MODELS.get(model.split("/")[-1])
+    if native is None or dimension == native:
+        return None
+    if dimension > native:
+        raise ValueError(f"{model} produces at most {native} dimensions, not {dimension}")
+    return dimension
 
 
 class EmbeddingGenerator:
     """Generate embeddings using OpenAI via OpenRouter."""
 
-    def __init__(self):
-        """Initialize embedding generator."""
+    def __init__(self, dimension: int | None = None):
+        """
+        Initialize embedding generator.
+
+        Args:
+            dimension: Vector size (default: EMBEDDING_DIMENSION). Below the
+                native size of a text-embedding-3 model, the API returns
+                truncated, renormalized embeddings.
+        """
         self.client = AsyncOpenAI(
             api_key=settings.OPENROUTER_API_KEY,
             base_url=settings.OPENROUTER_BASE_URL,
         )
         self.model = settings.EMBEDDING_MODEL
-        self.dimension = settings.EMBEDDING_DIMENSION
+        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.dimensions = requested_dimensions(self.model, self.dimension)
 
     async def generate(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings for a list of texts."""
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
         response = await self.client.embeddings.create(
             model=self.model,
             input=texts,
+            **kwargs,
         )
 
         return [item.embedding for item in response.data]
@@ -33,4 +73,87 @@ class EmbeddingGenerator:
         return result[0]
 
 
-embedding_generator = EmbeddingGenerator()
+def create_embedding_generator(input_type: str = "document"):
+    """
+    Create the API or local generator selected by EMBEDDING_MODEL.
+
+    Args:
+        input_type: query or document; local models prefix texts accordingly
+    """
+    if is_local_model(settings.EMBEDDING_MODEL):
+        return LocalEmbeddingGenerator(input_type=input_type)
+    return EmbeddingGenerator()
+
+
+_embedding_generator = None
+
+
+def get_embedding_generator():
+    """
+    Get or create the shared query-time embedding generator.
+
+    Concurrent queries are coalesced into shared requests by an
+    EmbeddingScheduler (metrics under ``embedding.query.*``), behind the
+    embedding cache when it is enabled.
+    """
+    global _embedding_generator
+    if _embedding_generator is None:
+        _embedding_generator = create_embedding_generator(input_type="query")
+        if settings.EMBEDDING_QUERY_BATCHING:
+            from app.ingestion.embedders.scheduler import EmbeddingScheduler
+
+            _embedding_generator = EmbeddingScheduler(
+                _embedding_generator,
+                max_batch_size=settings.EMBEDDING_QUERY_MAX_BATCH_SIZE,
+                max_retries=settings.EMBEDDING_QUERY_MAX_RETRIES,
+                max_wait_ms=settings.EMBEDDING_QUERY_BATCH_WAIT_MS,
+                metrics_prefix="embedding.query",
+            )
+        if settings.EMBEDDING_CACHE_ENABLED:
+            from app.ingestion.embedders.cache import (
+                CachedEmbeddingGenerator,
+                get_query_embedding_cache,
+            )
+
+            _embedding_generator = CachedEmbeddingGenerator(
+                _embedding_generator, get_query_embedding_cache()
+            )
+    return _embedding_generator
+
+
+_document_embedding_generator = None
+
+
+def get_document_embedding_generator():
+    """
+    Get or create the generator for document text embedded at query time.
+
+    Context sentences compared against a query are passages, so local
+    models that prefix queries and documents differently get their own
+    document-side generator (sharing the loaded model); otherwise this is
+    the query-time generator.
+    """
+    global _document_embedding_generator
+    if _document_embedding_generator is None:
+        model = settings.EMBEDDING_MODEL
+        if instruction_prefix(model, "document") == instruction_prefix(model, "query"):
+            return get_embedding_generator()
+
+        _document_embedding_generator = create_embedding_generator(input_type="document")
+        if settings.EMBEDDING_CACHE_ENABLED:
+            from app.ingestion.embedders.cache import (
+                CachedEmbeddingGenerator,
+                get_query_embedding_cache,
+            )
+
+            _document_embedding_generator = CachedEmbeddingGenerator(
+                _document_embedding_generator, get_query_embedding_cache()
+            )
+    return _document_embedding_generator
+
+
+async def close_embedding_generator() -> None:
+    """Flush pending query embeddings and stop the coalescing dispatcher."""
+    embedder = getattr(_embedding_generator, "embedder", _embedding_generator)
+    if hasattr(embedder, "close"):
+        await embedder.close()
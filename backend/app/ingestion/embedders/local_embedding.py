@@ -0,0 +1,166 @@
+"""Local CPU embedding generation with sentence-transformers."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from app.config import settings
+
+LOCAL_MODEL_PREFIX = "local/"
+
+# Dimensions of common small models, so collections can be sized without
+# loading the model.
+KNOWN_DIMENSIONS = {
+    "BAAI/bge-small-en-v1.5": 384,
+    "BAAI/bge-base-en-v1.5": 768,
+    "intfloat/e5-small-v2": 384,
+    "intfloat/multilingual-e5-small": 384,
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+}
+
+# (query, document) instructions the models were trained with.
+BGE_QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
+KNOWN_PREFIXES = {
+    "BAAI/bge-small-en-v1.5": (BGE_QUERY_INSTRUCTION, ""),
+    "BAAI/bge-base-en-v1.5": (BGE_QUERY_INSTRUCTION, ""),
+    "intfloat/e5-small-v2": ("query: ", "passage: "),
+    "intfloat/multilingual-e5-small": ("query: ", "passage: "),
+}
+
+
+def is_local_model(model: str) -> bool:
+    """Whether an EMBEDDING_MODEL value selects the local backend."""
+    return model.startswith(LOCAL_MODEL_PREFIX)
+
+
+def embedding_dimension(model: str | None = None) -> int:
+    """
+    Vector size produced by an embedding model.
+
+    Local models report their own size; remote models use
+    EMBEDDING_DIMENSION.
+    """
+    model = model or settings.EMBEDDING_MODEL
+    if not is_local_model(model):
+        return settings.EMBEDDING_DIMENSION
+
+    name = model[len(LOCAL_MODEL_PREFIX) :]
+    if name in KNOWN_DIMENSIONS:
+        return KNOWN_DIMENSIONS[name]
+    return LocalEmbeddingGenerator(model).dimension
+
+
+def instruction_prefix(model: str, input_type: str) -> str:
+    """
+    Text prepended to queries or documents before a model encodes them.
+
+    EMBEDDING_LOCAL_QUERY_PREFIX / EMBEDDING_LOCAL_DOCUMENT_PREFIX override
+    the defaults for known models; remote models never get a prefix.
+
+    Args:
+        model: EMBEDDING_MODEL value
+        input_type: query or document
+    """
+    if not is_local_model(model):
+        return ""
+
+    if input_type == "query":
+        configured = settings.EMBEDDING_LOCAL_QUERY_PREFIX
+    else:
+        configured = settings.EMBEDDING_LOCAL_DOCUMENT_PREFIX
+    if configured is not None:
+        return configured
+
+    query, document = KNOWN_PREFIXES.get(model[len(LOCAL_MODEL_PREFIX) :], ("", ""))
+    return query if input_type == "query" else document
+
+
+@cache
+def load_encoder(model_name: str, device: str | None, backend: str):
+    """Load a SentenceTransformer once per process, shared by query and document generators."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device, backend=backend)
+
+
+class LocalEmbeddingGenerator:
+    """
+    Generate embeddings on CPU with a sentence-transformers model.
+
+    Selected with ``EMBEDDING_MODEL=local/<huggingface model>``, e.g.
+    ``local/BAAI/bge-small-en-v1.5``. The model is loaded on first use and
+    encoding runs in a single-thread executor, so the event loop stays free
+    and concurrent batches do not oversubscribe torch's thread pool.
+
+    Models trained with instructions (e5, bge) need different prefixes for
+    queries and documents, so the query and ingestion paths each create
+    their own generator with the matching ``input_type``.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        backend: str | None = None,
+        device: str | None = None,
+        batch_size: int | None = None,
+        input_type: str = "document",
+    ):
+        """
+        Initialize local embedding generator.
+
+        Args:
+            model: ``local/``-prefixed model name (default: EMBEDDING_MODEL)
+            backend: sentence-transformers backend, torch or onnx
+            device: Torch device (default: sentence-transformers' choice)
+            batch_size: Texts per forward pass
+            input_type: query or document, selecting the instruction prefix
+        """
+        self.model = model or settings.EMBEDDING_MODEL
+        self.model_name = self.model.removeprefix(LOCAL_MODEL_PREFIX)
+        self.prefix = instruction_prefix(self.model, input_type)
+        # Prefixed and plain vectors of the same text differ, so cache them apart.
+        self.cache_key = f"{self.model}|{self.prefix}" if self.prefix else self.model
+        self.backend = backend or settings.EMBEDDING_LOCAL_BACKEND
+        self.device = device or settings.EMBEDDING_LOCAL_DEVICE
+        self.batch_size = batch_size or settings.EMBEDDING_LOCAL_BATCH_SIZE
+        self._encoder = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+
+    @property
+    def encoder(self):
+        """SentenceTransformer model, loaded on first access."""
+        if self._encoder is None:
+            self._encoder = load_encoder(self.model_name, self.device, self.backend)
+        return self._encoder
+
+    @property
+    def dimension(self) -> int:
+        """Embedding vector size."""
+        if self._encoder is None and self.model_name in KNOWN_DIMENSIONS:
+            return KNOWN_DIMENSIONS[self.model_name]
+        return self.encoder.get_sentence_embedding_dimension()
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for a list of texts."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, texts)
+
+    async def generate_single(self, text: str) -> list[float]:
+        """Generate embedding for a single text."""
+        result = await self.generate([text])
+        return result[0]
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        """Encode texts to L2-normalized vectors."""
+        if self.prefix:
+            texts = [self.prefix + text for text in texts]
+        vectors = self.encoder.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
@@ -1,36 +1,101 @@
 """Mock embedding generator for testing without API costs."""
 
-import random
+import hashlib
+import re
+from functools import lru_cache
+
+import numpy as np
 
 from app.config import settings
+from app.ingestion.embedders.local_embedding import embedding_dimension
+
+_TOKEN = re.compile(r"\w+")
+
+
+def stable_seed(text: str) -> int:
+    """64-bit seed from a text digest, identical across processes and runs."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=65536)
+def _token_vector(token: str, dimension: int) -> np.ndarray:
+    """Fixed random projection of one token."""
+    return np.random.default_rng(stable_seed(token)).standard_normal(dimension, dtype=np.float32)
 
 
 class MockEmbeddingGenerator:
-    """Generate mock embeddings for testing purposes."""
+    """
+    Generate deterministic mock embeddings for tests and offline load tests.
 
-    def __init__(self):
-        """Initialize mock embedding generator."""
-        self.dimension = settings.EMBEDDING_DIMENSION
+    ``random`` mode gives every distinct text an independent random unit
+    vector. ``semantic`` mode sums hashed random projections of the text's
+    words (a bag-of-words sketch), so texts sharing most of their words get
+    similar vectors. Vectors depend only on the text, never on process
+    state, and the global ``random`` module is left untouched.
+    """
+
+    def __init__(self, dimension: int | None = None, mode: str | None = None):
+        """
+        Initialize mock embedding generator.
+
+        Args:
+            dimension: Vector size (default: the configured model's size)
+            mode: random or semantic (default: MOCK_EMBEDDING_MODE)
+        """
+        self.dimension = dimension or embedding_dimension()
+        self.mode = mode or settings.MOCK_EMBEDDING_MODE
+        if self.mode not in ("random", "semantic"):
+            raise ValueError(f"Unknown mock embedding mode: {self.mode}")
+        self.model = f"mock-{self.mode}"
 
     async def generate(self, texts: list[str]) -> list[list[float]]:
         """Generate mock embeddings for a list of texts."""
-        return [self._generate_single_vector(text) for text in texts]
+        return self.embed(texts).tolist()
 
     async def generate_single(self, text: str) -> list[float]:
         """Generate mock embedding for a single text."""
-        return self._generate_single_vector(text)
+        return self.embed([text])[0].tolist()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into an ``(n, dimension)`` float32 array of unit vectors."""
+        if self.mode == "semantic":
+            vectors = self._bag_of_words(texts)
+        else:
+            vectors = self._random(texts)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _random(self, texts: list[str]) -> np.ndarray:
+        """One independent Gaussian vector per text, seeded by its digest."""
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(stable_seed(text))
+            rng.standard_normal(dtype=np.float32, out=vectors[i])
+        return vectors
 
-    def _generate_single_vector(self, text: str) -> list[float]:
-        """Generate a deterministic pseudo-random vector based on text content."""
-        random.seed(hash(text))
-        vector = [random.uniform(-1, 1) for _ in range(self.dimension)]
+    def _bag_of_words(self, texts: list[str]) -> np.ndarray:
+        """Log-scaled word counts projected through per-word random vectors."""
+        vocabulary: dict[str, int] = {}
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
 
-        # Normalize vector
-        magnitude = sum(v * v for v in vector) ** 0.5
-        if magnitude > 0:
-            vector = [v / magnitude for v in vector]
+        counts = np.zeros((len(texts), max(1, len(vocabulary))), dtype=np.float32)
+        np.add.at(counts, (rows, cols), 1.0)
+        projections = np.stack(
+            [_token_vector(token, self.dimension) for token in vocabulary]
+            or [np.zeros(self.dimension, dtype=np.float32)]
+        )
+        vectors = np.log1p(counts) @ projections
 
-        return vector
+        # Texts without words still get a stable, distinct vector.
+        empty = ~counts.any(axis=1)
+        if empty.any():
+            vectors[empty] = self._random([t for t, e in zip(texts, empty) if e])
+        return vectors
 
 
 def get_embedding_generator():
@@ -0,0 +1,244 @@
+"""Token-aware batching scheduler for embedding requests."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+
+import openai
+
+from app.config import settings
+from app.services.metrics import metrics
+from app.services.tokenizer import count_tokens_batch
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class _PendingText:
+    """A text waiting to be embedded."""
+
+    text: str
+    tokens: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an embedding API error is worth retrying."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Read a Retry-After hint (in seconds) from an API error, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class EmbeddingScheduler:
+    """
+    Pack texts from many callers into bounded embedding requests.
+
+    Texts are queued and a single dispatcher groups them into requests
+    capped by item count and token count, waiting up to ``max_wait_ms`` for
+    more texts when the queue runs dry. At most ``max_concurrency``
+    requests are in flight, and rate-limit or server errors are retried
+    with exponential backoff and full jitter.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        max_batch_size: int = settings.EMBEDDING_MAX_BATCH_SIZE,
+        max_batch_tokens: int = settings.EMBEDDING_MAX_BATCH_TOKENS,
+        max_concurrency: int = settings.EMBEDDING_MAX_CONCURRENCY,
+        max_retries: int = settings.EMBEDDING_MAX_RETRIES,
+        max_wait_ms: float = settings.EMBEDDING_BATCH_WAIT_MS,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        token_counter=None,
+        metrics_prefix: str = "embedding",
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            embedder: Generator with async ``generate(texts)``
+            max_batch_size: Maximum texts per request
+            max_batch_tokens: Maximum total tokens per request
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per request after the first attempt
+            max_wait_ms: How long a partial batch waits for more texts
+            base_delay: First backoff delay in seconds
+            max_delay: Backoff ceiling in seconds
+            token_counter: Callable mapping texts to token counts
+            metrics_prefix: Prefix of the recorded metric names
+        """
+        self.embedder = embedder
+        self.model = getattr(embedder, "model", None)
+        self.cache_key = getattr(embedder, "cache_key", self.model)
+        self.dimension = embedder.dimension
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.max_wait = max_wait_ms / 1000
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.token_counter = token_counter or (
+            lambda texts: count_tokens_batch(texts, self.model)
+        )
+        self.max_concurrency = max_concurrency
+        self.metrics_prefix = metrics_prefix
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._bind_loop(None)
+
+    def _bind_loop(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        """Create the queue and dispatcher state for an event loop."""
+        self._loop = loop
+        self._queue: asyncio.Queue[_PendingText] = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._carry: _PendingText | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, batched together with texts from other callers."""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A shared instance may outlive the loop it first ran on.
+            self._bind_loop(loop)
+        self._ensure_dispatcher()
+        pending = [
+            _PendingText(text=text, tokens=tokens, future=loop.create_future())
+            for text, tokens in zip(texts, self.token_counter(texts))
+        ]
+        for item in pending:
+            self._queue.put_nowait(item)
+
+        return list(await asyncio.gather(*(item.future for item in pending)))
+
+    async def generate_single(self, text: str) -> list[float]:
+        """Embed a single text."""
+        result = await self.generate([text])
+        return result[0]
+
+    async def close(self) -> None:
+        """Wait for in-flight requests and stop the dispatcher."""
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    def _ensure_dispatcher(self) -> None:
+        """Start the dispatcher task on first use."""
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _next_batch(self) -> list[_PendingText]:
+        """Collect the next request's worth of texts."""
+        first = self._carry or await self._queue.get()
+        self._carry = None
+        batch = [first]
+        tokens = first.tokens
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+
+            if tokens + item.tokens > self.max_batch_tokens:
+                self._carry = item
+                break
+            batch.append(item)
+            tokens += item.tokens
+
+        return batch
+
+    async def _dispatch(self) -> None:
+        """Form batches and send them under the concurrency cap."""
+        while True:
+            # Take a slot first so batches keep filling while all slots are busy.
+            await self._semaphore.acquire()
+            try:
+                batch = await self._next_batch()
+            except BaseException:
+                self._semaphore.release()
+                raise
+            task = asyncio.create_task(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: list[_PendingText]) -> None:
+        """Send one request, retrying transient failures, and resolve futures."""
+        try:
+            now = time.perf_counter()
+            for item in batch:
+                metrics.observe(
+                    f"{self.metrics_prefix}.queue_delay_ms", (now - item.enqueued_at) * 1000
+                )
+            metrics.record(f"{self.metrics_prefix}.batch_size", len(batch))
+
+            vectors = await self._generate_with_retry([item.text for item in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Embedding API returned {len(vectors)} vectors for {len(batch)} texts"
+                )
+
+            for item, vector in zip(batch, vectors):
+                if not item.future.done():
+                    item.future.set_result(vector)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+        finally:
+            self._semaphore.release()
+
+    async def _generate_with_retry(self, texts: list[str]) -> list[list[float]]:
+        """Call the wrapped generator with exponential backoff on transient errors."""
+        attempt = 0
+        while True:
+            try:
+                with metrics.timer(f"{self.metrics_prefix}.request_ms"):
+                    return await self.embedder.generate(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    metrics.increment(f"{self.metrics_prefix}.failures")
+                    raise
+
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+                hint = retry_after_seconds(e)
+                if hint is not None:
+                    delay = max(delay, min(hint, self.max_delay))
+
+                metrics.increment(f"{self.metrics_prefix}.retries")
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,152 @@
+"""Ingestion manifest for incremental knowledge-base refreshes."""
+
+import hashlib
+import json
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import UUID, uuid5
+
+POINT_ID_NAMESPACE = UUID("6f1c7d9e-3b7a-5f43-9a51-2d8c4e0b7a10")
+
+
+def compute_file_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_point_id(doc_hash: str, chunk_index: int) -> str:
+    """Derive a deterministic Qdrant point ID from document hash and chunk index."""
+    return str(uuid5(POINT_ID_NAMESPACE, f"{doc_hash}:{chunk_index}"))
+
+
+def normalize_path(file_path: str) -> str:
+    """Normalize a file path for use as a manifest key."""
+    return str(Path(file_path).resolve())
+
+
+class IngestionManifest:
+    """
+    Record of ingested documents keyed by file path.
+
+    Each entry stores the document's content hash, the pipeline fingerprint
+    (chunking and embedding settings) it was ingested with, and the point IDs
+    it produced, so unchanged files can be skipped and stale points removed.
+    Documents that dropped near-duplicate chunks also list the documents
+    holding the kept copies, so they can be invalidated when those change.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, fingerprint: str = ""):
+        """
+        Initialize manifest, loading it from disk if it exists.
+
+        Args:
+            path: JSON file backing the manifest
+            fingerprint: Pipeline settings that invalidate entries when changed
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.documents: dict[str, dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load manifest entries from disk."""
+        if not os.path.exists(self.path):
+            self.documents = {}
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.documents = data.get("documents", {})
+
+    def save(self) -> None:
+        """Atomically write manifest entries to disk."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "documents": self.documents}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, file_path: str) -> dict | None:
+        """Get the manifest entry for a file."""
+        return self.documents.get(normalize_path(file_path))
+
+    def is_unchanged(self, file_path: str, content_hash: str) -> bool:
+        """Check whether a file was already ingested with this content and settings."""
+        entry = self.get(file_path)
+        return (
+            entry is not None
+            and entry.get("content_hash") == content_hash
+            and entry.get("fingerprint") == self.fingerprint
+            and not entry.get("invalidated")
+        )
+
+    def record(
+        self,
+        file_path: str,
+        content_hash: str,
+        point_ids: list[str],
+        depends_on: list[str] | None = None,
+    ) -> None:
+        """Record a successfully ingested file."""
+        entry = {
+            "content_hash": content_hash,
+            "fingerprint": self.fingerprint,
+            "point_ids": point_ids,
+            "ingested_at": datetime.now(UTC).isoformat(),
+        }
+        if depends_on:
+            entry["depends_on"] = depends_on
+        self.documents[normalize_path(file_path)] = entry
+
+    def dependents_of(self, file_path: str) -> list[str]:
+        """Paths of entries whose dropped chunks are stored by ``file_path``."""
+        path = normalize_path(file_path)
+        return [
+            dependent
+            for dependent, entry in self.documents.items()
+            if path in entry.get("depends_on", ())
+        ]
+
+    def invalidate(self, file_path: str) -> None:
+        """Mark an entry for re-ingestion even though its file is unchanged."""
+        entry = self.get(file_path)
+        if entry is not None:
+            entry["invalidated"] = True
+
+    def invalidated_paths(self) -> list[str]:
+        """Paths of entries marked for re-ingestion."""
+        return [path for path, entry in self.documents.items() if entry.get("invalidated")]
+
+    def remove(self, file_path: str) -> dict | None:
+        """Remove and return the manifest entry for a file."""
+        return self.documents.pop(normalize_path(file_path), None)
+
+    def paths_under(self, directory: str, recursive: bool = True) -> list[str]:
+        """List manifest paths inside a directory."""
+        root = Path(normalize_path(directory))
+        paths = []
+        for path in self.documents:
+            parent = Path(path).parent
+            if parent == root or (recursive and root in parent.parents):
+                paths.append(path)
+        return paths
+
+    def referenced_point_ids(self, exclude: str | None = None) -> set[str]:
+        """Point IDs referenced by entries other than ``exclude``."""
+        excluded = normalize_path(exclude) if exclude else None
+        return {
+            point_id
+            for path, entry in self.documents.items()
+            if path != excluded
+            for point_id in entry.get("point_ids", [])
+        }
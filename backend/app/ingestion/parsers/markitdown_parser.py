@@ -1,7 +1,5 @@
 """Document parsing using MarkItDown library."""
 
-from markitdown import MarkItDown
-
 
 class DocumentParser:
     """Document parser supporting multiple formats."""
@@ -24,6 +22,8 @@ class DocumentParser:
     def parse(file_path: str) -> str | None:
         """Parse document and return text content."""
         try:
+            from markitdown import MarkItDown
+
             md = MarkItDown()
             result = md.convert(file_path)
             return result.text_content
@@ -1,6 +1,7 @@
 """Ingestion pipeline orchestrator for document processing."""
 
 import asyncio
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Literal
@@ -8,19 +9,45 @@ from typing import Literal
 from qdrant_client.http.models import PointStruct
 
 from app.config import settings
-from app.ingestion.chunkers.chunker import RecursiveChunker, SemanticChunker
-from app.ingestion.embedders.embedding import EmbeddingGenerator
+from app.ingestion.chunkers.chunker import create_chunker
+from app.ingestion.embedders.cache import CachedEmbeddingGenerator, get_embedding_cache
+from app.ingestion.embedders.embedding import create_embedding_generator
+from app.ingestion.embedders.local_embedding import instruction_prefix
+from app.ingestion.embedders.scheduler import EmbeddingScheduler
+from app.ingestion.manifest import (
+    IngestionManifest,
+    compute_file_hash,
+    make_point_id,
+    normalize_path,
+)
 from app.ingestion.parsers.markitdown_parser import DocumentParser
+from app.ingestion.stages import DocumentJob, StageStats
+from app.ingestion.workers import create_process_pool, parse_and_chunk
 from app.rag.qdrant_client import QdrantManager
+from app.services.metrics import metrics
+from app.services.simhash import SimHashIndex, parse_signature
+from app.services.tokenizer import encoding_name
 
 
-def get_embedding_generator(use_mock: bool = False):
+def get_embedding_generator(use_mock: bool = False, use_cache: bool | None = None):
     """Factory function to get embedding generator."""
     if use_mock:
         from app.ingestion.embedders.mock_embedding import MockEmbeddingGenerator
 
         return MockEmbeddingGenerator()
-    return EmbeddingGenerator()
+
+    embedder = EmbeddingScheduler(create_embedding_generator())
+
+    if use_cache is None:
+        use_cache = settings.EMBEDDING_CACHE_ENABLED
+    if use_cache:
+        return CachedEmbeddingGenerator(embedder, get_embedding_cache())
+    return embedder
+
+
+def manifest_path_for(collection_name: str) -> str:
+    """Default manifest file for a physical collection."""
+    return os.path.join(settings.INGESTION_MANIFEST_DIR, f"{collection_name}.json")
 
 
 class IngestionResult:
@@ -33,12 +60,27 @@ class IngestionResult:
         failed: int = 0,
         total_chunks: int = 0,
         errors: list[str] | None = None,
+        skipped: int = 0,
+        deleted: int = 0,
+        embedding_cache_hits: int = 0,
+        embedding_cache_misses: int = 0,
+        stages: dict | None = None,
+        duplicate_chunks: int = 0,
+        points_upserted: int = 0,
     ):
         self.total_documents = total_documents
         self.successful = successful
         self.failed = failed
         self.total_chunks = total_chunks
         self.errors = errors or []
+        self.skipped = skipped
+        self.deleted = deleted
+        self.embedding_cache_hits = embedding_cache_hits
+        self.embedding_cache_misses = embedding_cache_misses
+        self.stages = stages or {}
+        self.duplicate_chunks = duplicate_chunks
+        # Distinct point IDs written; identical content at several paths shares points.
+        self.points_upserted = points_upserted
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -48,6 +90,13 @@ class IngestionResult:
             "failed": self.failed,
             "total_chunks": self.total_chunks,
             "errors": self.errors,
+            "skipped": self.skipped,
+            "deleted": self.deleted,
+            "embedding_cache_hits": self.embedding_cache_hits,
+            "embedding_cache_misses": self.embedding_cache_misses,
+            "stages": self.stages,
+            "duplicate_chunks": self.duplicate_chunks,
+            "points_upserted": self.points_upserted,
         }
 
 
@@ -57,34 +106,92 @@ class IngestionPipeline:
     def __init__(
         self,
         chunk_strategy: Literal["semantic", "recursive"] = "semantic",
-        collection_name: str = "knowledge_base",
+        collection_name: str = settings.KNOWLEDGE_BASE_COLLECTION,
         use_mock_embeddings: bool = False,
+        manifest_path: str | None = None,
+        force: bool = False,
+        use_embedding_cache: bool | None = None,
+        workers: int | None = None,
+        skip_near_duplicates: bool | None = None,
     ):
         """
         Initialize ingestion pipeline.
 
         Args:
             chunk_strategy: Chunking strategy (semantic or recursive)
-            collection_name: Qdrant collection name
+            collection_name: Qdrant collection name or alias
             use_mock_embeddings: Use mock embeddings for testing
+            manifest_path: Manifest file (default: one per physical collection in INGESTION_MANIFEST_DIR)
+            force: Re-ingest documents even if the manifest says they are unchanged
+            use_embedding_cache: Consult the embedding cache (default: EMBEDDING_CACHE_ENABLED)
+            workers: Parse/chunk processes (default: INGESTION_WORKERS; 0 runs in-process)
+            skip_near_duplicates: Drop chunks near-duplicating another document's
+                chunks (default: INGESTION_SKIP_NEAR_DUPLICATES)
         """
         self.parser = DocumentParser()
-        self.embedder = get_embedding_generator(use_mock_embeddings)
+        self.embedder = get_embedding_generator(use_mock_embeddings, use_embedding_cache)
         self.qdrant = QdrantManager()
         self.collection_name = collection_name
-
-        if chunk_strategy == "semantic":
-            self.chunker = SemanticChunker(
-                model_name="all-MiniLM-L6-v2",
-                chunk_size=settings.CHUNK_SIZE,
-                similarity_threshold=settings.CHUNK_SIMILARITY_THRESHOLD,
-            )
-        else:
-            self.chunker = RecursiveChunker(
-                chunk_size=settings.CHUNK_SIZE,
-                chunk_overlap=settings.CHUNK_OVERLAP,
-                separators=["\n\n", "\n", ". ", " ", ""],
-            )
+        self.chunk_strategy = chunk_strategy
+        self.force = force
+        if skip_near_duplicates is None:
+            skip_near_duplicates = settings.INGESTION_SKIP_NEAR_DUPLICATES
+        self.skip_near_duplicates = skip_near_duplicates
+        self._duplicate_index = None
+        # Content hash each document touched by this pipeline now has in the
+        # collection; None once it was pruned or failed to re-ingest.
+        self._ingested_hashes: dict[str, str | None] = {}
+
+        if workers is None:
+            workers = settings.INGESTION_WORKERS
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self._executor = None
+        self._chunker = None
+
+        fingerprint = ":".join(
+            [
+                chunk_strategy,
+                str(settings.CHUNK_SIZE),
+                str(settings.CHUNK_OVERLAP),
+                str(settings.CHUNK_SIMILARITY_THRESHOLD),
+                str(settings.CHUNK_BREAKPOINT_PERCENTILE),
+                f"mock-{settings.MOCK_EMBEDDING_MODE}"
+                if use_mock_embeddings
+                else settings.EMBEDDING_MODEL
+                + instruction_prefix(settings.EMBEDDING_MODEL, "document"),
+                str(self.embedder.dimension),
+                # Chunk annotations are counted with the LLM's tokenizer.
+                encoding_name(settings.LLM_MODEL_PRIMARY),
+                f"near-dup-{settings.NEAR_DUPLICATE_MAX_DISTANCE}"
+                if skip_near_duplicates
+                else "all-chunks",
+            ]
+        )
+        if manifest_path is None:
+            # Manifests follow the physical collection so they stay valid across alias swaps.
+            physical = QdrantManager.resolve_alias(collection_name) or collection_name
+            manifest_path = manifest_path_for(physical)
+        self.manifest = IngestionManifest(manifest_path, fingerprint=fingerprint)
+
+    @property
+    def chunker(self):
+        """In-process chunker, created on first use."""
+        if self._chunker is None:
+            self._chunker = create_chunker(self.chunk_strategy)
+        return self._chunker
+
+    async def _parse_and_chunk(self, file_path: str) -> dict:
+        """Parse and chunk a document off the event loop."""
+        if self.workers <= 0:
+            return await asyncio.to_thread(parse_and_chunk, file_path, self.chunker)
+
+        if self._executor is None:
+            self._executor = create_process_pool(self.chunk_strategy, self.workers)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, parse_and_chunk, file_path)
 
     async def ingest_document(
         self,
@@ -101,59 +208,9 @@ class IngestionPipeline:
         Returns:
             Dict with ingestion result
         """
-        try:
-            if not self.parser.is_supported(file_path):
-                return {
-                    "success": False,
-                    "file_path": file_path,
-                    "error": "Unsupported file format",
-                }
-
-            text_content = self.parser.parse(file_path)
-            if not text_content:
-                return {
-                    "success": False,
-                    "file_path": file_path,
-                    "error": "Failed to parse document",
-                }
-
-            file_metadata = self.parser.extract_metadata(file_path)
-
-            chunks = self.chunker.chunk(text_content)
-            if not chunks:
-                return {
-                    "success": False,
-                    "file_path": file_path,
-                    "error": "No chunks generated",
-                }
-
-            embeddings = await self.embedder.generate(chunks)
-
-            points = self._create_qdrant_points(
-                chunks=chunks,
-                embeddings=embeddings,
-                file_metadata=file_metadata,
-                additional_metadata=additional_metadata,
-            )
-
-            await self.qdrant.upsert_documents(
-                collection_name=self.collection_name,
-                points=points,
-            )
-
-            return {
-                "success": True,
-                "file_path": file_path,
-                "chunks_processed": len(chunks),
-                "points_upserted": len(points),
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "file_path": file_path,
-                "error": str(e),
-            }
+        results, _ = await self._run_stages([file_path], 1, additional_metadata)
+        await self._reingest_invalidated(1, additional_metadata)
+        return results[0]
 
     async def ingest_batch(
         self,
@@ -166,38 +223,401 @@ class IngestionPipeline:
 
         Args:
             file_paths: List of file paths to ingest
-            batch_size: Number of concurrent ingestions
+            batch_size: Number of documents parsed concurrently
             additional_metadata: Additional metadata to add to all documents
 
         Returns:
             IngestionResult with statistics
         """
         result = IngestionResult(total_documents=len(file_paths))
+        hits_before = getattr(self.embedder, "hits", 0)
+        misses_before = getattr(self.embedder, "misses", 0)
+
+        results, stages = await self._run_stages(file_paths, batch_size, additional_metadata)
+        reingested = await self._reingest_invalidated(batch_size, additional_metadata)
+        result.total_documents += len(reingested)
+
+        point_ids: dict[str, list[str]] = {}
+        for res in results + reingested:
+            if res.get("skipped"):
+                result.skipped += 1
+            elif res.get("success"):
+                result.successful += 1
+                result.total_chunks += res.get("chunks_processed", 0)
+                result.duplicate_chunks += res.get("duplicate_chunks", 0)
+                point_ids[normalize_path(res["file_path"])] = res.get("point_ids", [])
+            else:
+                result.failed += 1
+                result.errors.append(
+                    f"{res.get('file_path')}: {res.get('error', 'Unknown error')}"
+                )
+
+        result.points_upserted = len({pid for ids in point_ids.values() for pid in ids})
+        result.embedding_cache_hits = getattr(self.embedder, "hits", 0) - hits_before
+        result.embedding_cache_misses = getattr(self.embedder, "misses", 0) - misses_before
+        result.stages = {name: stage.to_dict() for name, stage in stages.items()}
+
+        self.save_manifest()
+
+        return result
+
+    async def _run_stages(
+        self,
+        file_paths: list[str],
+        parse_concurrency: int,
+        additional_metadata: dict | None,
+    ) -> tuple[list[dict], dict[str, StageStats]]:
+        """
+        Run documents through the parse, embed and upsert stages.
+
+        Stages are connected by bounded queues, so at most a few documents'
+        chunks and vectors are held in memory however large the corpus is.
+        Chunks are embedded in groups as soon as a document is parsed, and
+        points from different documents are upserted together.
+
+        Returns:
+            Per-document result dicts (in input order) and per-stage stats
+        """
+        results: list[dict | None] = [None] * len(file_paths)
+        stages = {
+            "parse": StageStats("parse", "documents"),
+            "embed": StageStats("embed", "chunks"),
+            "upsert": StageStats("upsert", "points"),
+        }
+
+        paths: asyncio.Queue = asyncio.Queue()
+        for index, file_path in enumerate(file_paths):
+            paths.put_nowait((index, file_path))
 
-        semaphore = asyncio.Semaphore(batch_size)
+        parsed: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
 
-        async def ingest_with_limit(file_path: str):
-            async with semaphore:
-                return await self.ingest_document(file_path, additional_metadata)
+        parse_workers = max(1, min(parse_concurrency, len(file_paths)))
+        embed_workers = max(1, settings.EMBEDDING_MAX_CONCURRENCY)
 
-        tasks = [ingest_with_limit(fp) for fp in file_paths]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        duplicate_index = None
+        if self.skip_near_duplicates:
+            if self._duplicate_index is None:
+                # Scrolling a large collection is slow; keep it off the event loop.
+                self._duplicate_index = await asyncio.to_thread(self._load_duplicate_index)
+            duplicate_index = self._duplicate_index
 
+        parse_tasks = [
+            asyncio.create_task(
+                self._parse_stage(paths, parsed, results, stages["parse"], duplicate_index)
+            )
+            for _ in range(parse_workers)
+        ]
+        embed_tasks = [
+            asyncio.create_task(
+                self._embed_stage(parsed, embedded, results, stages["embed"], additional_metadata)
+            )
+            for _ in range(embed_workers)
+        ]
+        upsert_task = asyncio.create_task(self._upsert_stage(embedded, results, stages["upsert"]))
+
+        async def drain() -> None:
+            """Close each stage once the stage feeding it has finished."""
+            await asyncio.gather(*parse_tasks)
+            for _ in embed_tasks:
+                await parsed.put(None)
+            await asyncio.gather(*embed_tasks)
+            await embedded.put(None)
+            await upsert_task
+
+        tasks = [asyncio.create_task(drain()), *parse_tasks, *embed_tasks, upsert_task]
+        try:
+            # A crashed stage would leave the others blocked on full queues.
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        results = [
+            res or {"success": False, "file_path": fp, "error": "Not processed"}
+            for res, fp in zip(results, file_paths)
+        ]
         for res in results:
-            if isinstance(res, Exception):
-                result.failed += 1
-                result.errors.append(f"Exception: {str(res)}")
-            elif isinstance(res, dict):
-                if res.get("success"):
-                    result.successful += 1
-                    result.total_chunks += res.get("chunks_processed", 0)
-                else:
-                    result.failed += 1
-                    result.errors.append(
-                        f"{res.get('file_path')}: {res.get('error', 'Unknown error')}"
+            path = normalize_path(res["file_path"])
+            if not res.get("success") and path in self._ingested_hashes:
+                # Partially replaced; chunks deduplicated against it may be gone.
+                self._ingested_hashes[path] = None
+                self._invalidate_dependents(path)
+
+        await self._delete_abandoned_points(results)
+
+        return results, stages
+
+    async def _delete_abandoned_points(self, results: list[dict]) -> None:
+        """
+        Delete points upserted for documents that failed part-way.
+
+        The manifest never recorded them, so nothing else would remove them.
+        Points it does reference (an earlier version with the same content,
+        or identical content at another path) are kept.
+        """
+        abandoned = {
+            point_id
+            for res in results
+            if not res.get("success")
+            for point_id in res.get("point_ids", ())
+        }
+        orphans = sorted(abandoned - self.manifest.referenced_point_ids())
+        if not orphans:
+            return
+
+        try:
+            await self.qdrant.delete_points(
+                collection_name=self.collection_name,
+                point_ids=orphans,
+            )
+        except Exception:
+            metrics.increment("ingestion.orphan_cleanup_failures")
+
+    async def _reingest_invalidated(
+        self,
+        parse_concurrency: int,
+        additional_metadata: dict | None,
+    ) -> list[dict]:
+        """
+        Re-ingest documents whose dropped near-duplicate chunks lost their kept copy.
+
+        A re-ingested document can invalidate others in turn, so this repeats
+        until none are left, trying each document at most once per call.
+
+        Returns:
+            Per-document result dicts of the re-ingested documents
+        """
+        attempted: set[str] = set()
+        results: list[dict] = []
+        while True:
+            paths = [
+                path
+                for path in self.manifest.invalidated_paths()
+                if path not in attempted and os.path.exists(path)
+            ]
+            if not paths:
+                return results
+
+            attempted.update(paths)
+            batch, _ = await self._run_stages(paths, parse_concurrency, additional_metadata)
+            results.extend(batch)
+
+    async def _parse_stage(
+        self,
+        paths: asyncio.Queue,
+        parsed: asyncio.Queue,
+        results: list,
+        stats: StageStats,
+        duplicate_index: SimHashIndex | None = None,
+    ) -> None:
+        """Hash, skip-check, parse and chunk documents, dropping near duplicates if indexed."""
+        while True:
+            try:
+                index, file_path = paths.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                if not self.parser.is_supported(file_path):
+                    results[index] = {
+                        "success": False,
+                        "file_path": file_path,
+                        "error": "Unsupported file format",
+                    }
+                    continue
+
+                with stats.busy():
+                    content_hash = await asyncio.to_thread(compute_file_hash, file_path)
+                    if not self.force and self.manifest.is_unchanged(file_path, content_hash):
+                        results[index] = {
+                            "success": True,
+                            "skipped": True,
+                            "file_path": file_path,
+                            "chunks_processed": 0,
+                            "points_upserted": 0,
+                        }
+                        continue
+
+                    self._ingested_hashes[normalize_path(file_path)] = content_hash
+                    parsed_doc = await self._parse_and_chunk(file_path)
+
+                if "error" in parsed_doc:
+                    results[index] = {
+                        "success": False,
+                        "file_path": file_path,
+                        "error": parsed_doc["error"],
+                    }
+                    continue
+
+                job = DocumentJob(
+                    index=index,
+                    file_path=file_path,
+                    content_hash=content_hash,
+                    chunks=parsed_doc["chunks"],
+                    file_metadata=self.parser.extract_metadata(file_path),
+                    annotations=parsed_doc["annotations"],
+                )
+                if duplicate_index is not None:
+                    self._drop_near_duplicates(job, duplicate_index)
+                    if not job.chunks:
+                        results[index] = await self._finalize_document(job)
+                        continue
+            except Exception as e:
+                results[index] = {"success": False, "file_path": file_path, "error": str(e)}
+                continue
+
+            await parsed.put(job)
+
+    async def _embed_stage(
+        self,
+        parsed: asyncio.Queue,
+        embedded: asyncio.Queue,
+        results: list,
+        stats: StageStats,
+        additional_metadata: dict | None,
+    ) -> None:
+        """Embed each document's chunks in groups and pass points downstream."""
+        group_size = settings.EMBEDDING_MAX_BATCH_SIZE
+
+        while True:
+            job = await parsed.get()
+            if job is None:
+                return
+
+            source_path = normalize_path(job.file_path)
+            try:
+                for start in range(0, len(job.chunks), group_size):
+                    if job.error is not None:
+                        break
+                    group = job.chunks[start : start + group_size]
+                    with stats.busy(len(group)):
+                        embeddings = await self.embedder.generate(group)
+
+                    points = self._create_qdrant_points(
+                        chunks=group,
+                        embeddings=embeddings,
+                        file_metadata=job.file_metadata,
+                        annotations=job.annotations[start : start + group_size],
+                        additional_metadata=additional_metadata,
+                        doc_hash=job.content_hash,
+                        source_path=source_path,
+                        start_index=start,
                     )
+                    job.point_ids.extend(str(point.id) for point in points)
+                    job.pending_points += len(points)
+                    if start + group_size >= len(job.chunks):
+                        job.embedded = True
+                    await embedded.put((job, points))
+            except Exception as e:
+                job.error = str(e)
+                results[job.index] = {
+                    "success": False,
+                    "file_path": job.file_path,
+                    "error": str(e),
+                    "point_ids": job.point_ids,
+                }
 
-        return result
+    async def _upsert_stage(
+        self,
+        embedded: asyncio.Queue,
+        results: list,
+        stats: StageStats,
+    ) -> None:
+        """Upsert points in batches spanning documents and finalize finished documents."""
+        batch_size = settings.INGESTION_UPSERT_BATCH_SIZE
+        buffer: list[tuple[DocumentJob, list[PointStruct]]] = []
+        buffered = 0
+
+        while True:
+            item = await embedded.get()
+            if item is not None:
+                buffer.append(item)
+                buffered += len(item[1])
+
+            # Flush when full, or when nothing else is waiting so points are not held back.
+            if buffer and (item is None or buffered >= batch_size or embedded.empty()):
+                await self._flush_points(buffer, results, stats)
+                buffer, buffered = [], 0
+
+            if item is None:
+                return
+
+    async def _flush_points(
+        self,
+        buffer: list[tuple[DocumentJob, list[PointStruct]]],
+        results: list,
+        stats: StageStats,
+    ) -> None:
+        """Upsert buffered points and finalize documents whose points are all stored."""
+        # Groups of documents that already failed are dropped, not stored.
+        for job, group in buffer:
+            if job.error is not None:
+                job.pending_points -= len(group)
+        buffer = [(job, group) for job, group in buffer if job.error is None]
+        if not buffer:
+            return
+
+        points = [point for _, group in buffer for point in group]
+        try:
+            with stats.busy(len(points)):
+                await self.qdrant.upsert_documents(
+                    collection_name=self.collection_name,
+                    points=points,
+                )
+        except Exception as e:
+            for job, _ in buffer:
+                if job.error is None:
+                    job.error = str(e)
+                    results[job.index] = {
+                        "success": False,
+                        "file_path": job.file_path,
+                        "error": str(e),
+                        "point_ids": job.point_ids,
+                    }
+            return
+
+        for job, group in buffer:
+            job.pending_points -= len(group)
+            if job.embedded and job.pending_points == 0 and job.error is None:
+                results[job.index] = await self._finalize_document(job)
+
+    async def _finalize_document(self, job: DocumentJob) -> dict:
+        """Remove a document's stale points and record it in the manifest."""
+        try:
+            previous = self.manifest.get(job.file_path)
+            stale_ids = self._stale_point_ids(job.file_path, keep=set(job.point_ids))
+            if stale_ids:
+                await self.qdrant.delete_points(
+                    collection_name=self.collection_name,
+                    point_ids=stale_ids,
+                )
+            self.manifest.record(
+                job.file_path, job.content_hash, job.point_ids, sorted(job.depends_on)
+            )
+            # Removed or rechunked points may be the kept copies of other documents' chunks.
+            if previous and (stale_ids or previous.get("fingerprint") != self.manifest.fingerprint):
+                self._invalidate_dependents(job.file_path)
+        except Exception as e:
+            return {
+                "success": False,
+                "file_path": job.file_path,
+                "error": str(e),
+                "point_ids": job.point_ids,
+            }
+
+        return {
+            "success": True,
+            "file_path": job.file_path,
+            "chunks_processed": len(job.chunks),
+            "points_upserted": len(job.point_ids),
+            "point_ids": job.point_ids,
+            "points_deleted": len(stale_ids),
+            "duplicate_chunks": job.duplicate_chunks,
+        }
 
     async def ingest_directory(
         self,
@@ -206,6 +626,7 @@ class IngestionPipeline:
         batch_size: int = 10,
         file_extensions: list[str] | None = None,
         additional_metadata: dict | None = None,
+        prune_deleted: bool = True,
     ) -> IngestionResult:
         """
         Ingest all documents from a directory.
@@ -216,6 +637,7 @@ class IngestionPipeline:
             batch_size: Number of concurrent ingestions
             file_extensions: List of file extensions to process (default: all supported)
             additional_metadata: Additional metadata to add to all documents
+            prune_deleted: Remove points of previously ingested files that no longer exist
 
         Returns:
             IngestionResult with statistics
@@ -240,42 +662,181 @@ class IngestionPipeline:
                     if self.parser.is_supported(str(file_path)):
                         file_paths.append(str(file_path))
 
+        deleted = 0
+        if prune_deleted:
+            deleted = await self.prune_deleted(directory_path, file_paths, recursive)
+
         if not file_paths:
             return IngestionResult(
                 total_documents=0,
+                deleted=deleted,
                 errors=[f"No supported documents found in {directory_path}"],
             )
 
-        return await self.ingest_batch(
+        result = await self.ingest_batch(
             file_paths=file_paths,
             batch_size=batch_size,
             additional_metadata=additional_metadata,
         )
+        result.deleted = deleted
+
+        return result
+
+    async def prune_deleted(
+        self,
+        directory_path: str,
+        current_files: list[str],
+        recursive: bool = False,
+    ) -> int:
+        """
+        Remove points for manifest entries under a directory whose files are gone.
+
+        Only files that no longer exist on disk are pruned. Files left out of
+        the scan by an extension filter or the recursion scope keep their
+        points.
+
+        Args:
+            directory_path: Directory that was scanned
+            current_files: Files found in the scan
+            recursive: Whether the scan included subdirectories
+
+        Returns:
+            Number of documents removed
+        """
+        current = {normalize_path(fp) for fp in current_files}
+        removed = 0
+
+        for path in self.manifest.paths_under(directory_path, recursive=recursive):
+            if path in current or os.path.exists(path):
+                continue
+
+            stale_ids = self._stale_point_ids(path, keep=set())
+            if stale_ids:
+                await self.qdrant.delete_points(
+                    collection_name=self.collection_name,
+                    point_ids=stale_ids,
+                )
+            self._ingested_hashes[path] = None
+            self._invalidate_dependents(path)
+            self.manifest.remove(path)
+            removed += 1
+
+        if removed:
+            self.save_manifest()
+
+        return removed
+
+    async def close(self) -> None:
+        """Wait for pending embedding requests and stop background workers."""
+        embedder = getattr(self.embedder, "embedder", self.embedder)
+        if isinstance(embedder, EmbeddingScheduler):
+            await embedder.close()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def save_manifest(self) -> None:
+        """Persist the ingestion manifest."""
+        self.manifest.save()
+
+    def _load_duplicate_index(self) -> SimHashIndex:
+        """SimHash index of the chunks already stored in the collection."""
+        index = SimHashIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE)
+        physical = QdrantManager.resolve_alias(self.collection_name) or self.collection_name
+        if QdrantManager.get_client().collection_exists(physical):
+            fields = ["simhash", "source_path", "doc_hash"]
+            for payload in QdrantManager.scroll_payloads(physical, fields):
+                if payload.get("simhash"):
+                    owner = (payload.get("source_path"), payload.get("doc_hash"), True)
+                    index.add(parse_signature(payload["simhash"]), owner)
+        return index
+
+    def _drop_near_duplicates(self, job: DocumentJob, index: SimHashIndex) -> None:
+        """
+        Remove chunks that near-duplicate a chunk of another document.
+
+        ``index`` starts with the signatures already in the collection. Kept
+        chunks are added to it, so later documents in the run are
+        checked against them too. A document's own chunks never count, so
+        re-ingesting it is unaffected by its previous version, and neither
+        do stored chunks of documents this pipeline has since replaced,
+        pruned or failed to re-ingest. The documents holding the kept copies
+        are collected in ``job.depends_on``.
+        """
+        source_path = normalize_path(job.file_path)
+
+        def ignore(owner: tuple[str | None, str | None, bool]) -> bool:
+            path, doc_hash, stored = owner
+            if path == source_path:
+                return True
+            if path not in self._ingested_hashes:
+                return False
+            return stored or self._ingested_hashes[path] != doc_hash
+
+        chunks, annotations = [], []
+        for chunk, annotation in zip(job.chunks, job.annotations):
+            signature = parse_signature(annotation["simhash"])
+            owner = index.find(signature, ignore)
+            if owner is not None:
+                job.duplicate_chunks += 1
+                if owner[0]:
+                    job.depends_on.add(owner[0])
+                continue
+            index.add(signature, (source_path, job.content_hash, False))
+            chunks.append(chunk)
+            annotations.append(annotation)
+        job.chunks, job.annotations = chunks, annotations
+
+    def _invalidate_dependents(self, file_path: str) -> None:
+        """Mark documents whose dropped chunks ``file_path`` stored for re-ingestion."""
+        for dependent in self.manifest.dependents_of(file_path):
+            self.manifest.invalidate(dependent)
+
+    def _stale_point_ids(self, file_path: str, keep: set[str]) -> list[str]:
+        """Point IDs previously recorded for a file that are no longer needed."""
+        entry = self.manifest.get(file_path)
+        if not entry:
+            return []
+
+        # Identical content at another path shares point IDs; keep those.
+        shared = self.manifest.referenced_point_ids(exclude=file_path)
+        return [pid for pid in entry.get("point_ids", []) if pid not in keep and pid not in shared]
 
     def _create_qdrant_points(
         self,
         chunks: list[str],
         embeddings: list[list[float]],
         file_metadata: dict,
+        annotations: list[dict] | None = None,
         additional_metadata: dict | None = None,
+        doc_hash: str = "",
+        source_path: str | None = None,
+        start_index: int = 0,
     ) -> list[PointStruct]:
         """
         Create Qdrant points from chunks and embeddings.
 
+        Point IDs are derived from the document hash and chunk index, so
+        re-ingesting the same content overwrites points instead of
+        duplicating them.
+
         Args:
             chunks: List of text chunks
             embeddings: List of embedding vectors
             file_metadata: File-level metadata
+            annotations: Per-chunk sentence offsets and token counts
             additional_metadata: Additional metadata to add
+            doc_hash: Content hash of the source document
+            source_path: Normalized path of the source document
+            start_index: Chunk index of the first chunk in ``chunks``
 
         Returns:
             List of Qdrant PointStruct objects
         """
-        from uuid import uuid4
-
         points = []
 
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings), start=start_index):
             metadata = {
                 "text": chunk,
                 "chunk_index": i,
@@ -284,12 +845,16 @@ class IngestionPipeline:
                 "file_name": file_metadata.get("file_name"),
                 "file_extension": file_metadata.get("file_extension"),
                 "file_size": file_metadata.get("file_size"),
+                "doc_hash": doc_hash,
+                "source_path": source_path,
             }
+            if annotations:
+                metadata.update(annotations[i - start_index])
 
             if additional_metadata:
                 metadata.update(additional_metadata)
 
-            point_id = str(uuid4())
+            point_id = make_point_id(doc_hash, i)
 
             points.append(
                 PointStruct(
@@ -304,7 +869,7 @@ class IngestionPipeline:
 
 async def get_ingestion_pipeline(
     chunk_strategy: Literal["semantic", "recursive"] = "semantic",
-    collection_name: str = "knowledge_base",
+    collection_name: str = settings.KNOWLEDGE_BASE_COLLECTION,
 ) -> IngestionPipeline:
     """Factory function to create ingestion pipeline instance."""
     return IngestionPipeline(
@@ -0,0 +1,65 @@
+"""Bookkeeping for the staged ingestion pipeline."""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class DocumentJob:
+    """A document moving through the parse, embed and upsert stages."""
+
+    index: int
+    file_path: str
+    content_hash: str
+    chunks: list[str]
+    file_metadata: dict
+    annotations: list[dict] = field(default_factory=list)
+    duplicate_chunks: int = 0
+    depends_on: set[str] = field(default_factory=set)
+    point_ids: list[str] = field(default_factory=list)
+    pending_points: int = 0
+    embedded: bool = False
+    error: str | None = None
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str, unit: str):
+        """Initialize empty counters."""
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @contextmanager
+    def busy(self, items: int = 1):
+        """Time a unit of work and count the items it handled."""
+        start = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = start
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.busy_seconds += end - start
+            self.items += items
+            self.finished_at = end
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        wall = (
+            self.finished_at - self.started_at
+            if self.started_at is not None and self.finished_at is not None
+            else 0.0
+        )
+        return {
+            "unit": self.unit,
+            "items": self.items,
+            "busy_s": round(self.busy_seconds, 3),
+            "wall_s": round(wall, 3),
+            "per_second": round(self.items / wall, 1) if wall > 0 else 0.0,
+        }
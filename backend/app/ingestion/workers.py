@@ -0,0 +1,83 @@
+"""Process-pool workers for CPU-bound parsing and chunking."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.ingestion.chunkers.chunker import create_chunker
+from app.ingestion.parsers.markitdown_parser import DocumentParser
+from app.rag.context_compress import annotate_sentences
+from app.services.simhash import format_signature, simhash
+
+_chunker = None
+
+
+def _init_worker(chunk_strategy: str, torch_threads: int) -> None:
+    """Build the chunker once per worker process."""
+    global _chunker
+
+    # Workers run side by side; keep each one's torch pool small.
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if chunk_strategy == "semantic":
+        from app.rag.reranker import configure_torch_threads
+
+        configure_torch_threads(torch_threads)
+
+    _chunker = create_chunker(chunk_strategy)
+
+
+def parse_and_chunk(file_path: str, chunker=None) -> dict:
+    """
+    Parse a document, split it into chunks and annotate each chunk.
+
+    Annotations hold each chunk's sentence offsets and token counts (see
+    ``annotate_sentences``), so query-time compression need not re-split
+    or re-count the text, and its SimHash signature for near-duplicate
+    detection.
+
+    Args:
+        file_path: Path to document file
+        chunker: Chunker to use (default: the worker's chunker)
+
+    Returns:
+        Dict with ``chunks`` and ``annotations`` on success or ``error`` on failure
+    """
+    text_content = DocumentParser.parse(file_path)
+    if not text_content:
+        return {"error": "Failed to parse document"}
+
+    chunks = (chunker or _chunker).chunk(text_content)
+    if not chunks:
+        return {"error": "No chunks generated"}
+
+    return {
+        "chunks": chunks,
+        "annotations": [
+            {
+                **annotate_sentences(chunk, settings.LLM_MODEL_PRIMARY),
+                "simhash": format_signature(simhash(chunk)),
+            }
+            for chunk in chunks
+        ],
+    }
+
+
+def create_process_pool(chunk_strategy: str, max_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool for parse_and_chunk.
+
+    Workers are spawned rather than forked so they never inherit torch or
+    event-loop state from the parent.
+
+    Args:
+        chunk_strategy: Chunking strategy each worker loads
+        max_workers: Number of worker processes
+    """
+    torch_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(chunk_strategy, torch_threads),
+    )
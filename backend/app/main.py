@@ -14,6 +14,8 @@ from app.config import settings
 from app.dependencies import engine
 from app.models.database import Base
 from app.models.schemas import ErrorResponse, HealthCheckResponse
+from app.services.connection_manager import manager as connection_manager
+from app.services.metrics import metrics
 
 
 @asynccontextmanager
@@ -21,8 +23,15 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     try:
         await init_database()
+        await connection_manager.start()
+        if settings.WARMUP_ON_STARTUP:
+            await warm_up_models()
         yield
     finally:
+        await connection_manager.stop()
+        from app.ingestion.embedders.embedding import close_embedding_generator
+
+        await close_embedding_generator()
         await close_database()
 
 
@@ -32,6 +41,13 @@ async def init_database():
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_up_models():
+    """Load ML models and create clients before serving traffic."""
+    from app.rag.pipeline import get_rag_pipeline
+
+    await get_rag_pipeline().warm_up()
+
+
 async def close_database():
     """Close database connections."""
     await engine.dispose()
@@ -163,6 +179,12 @@ async def health_check():
     )
 
 
+@app.get("/metrics", response_model=dict)
+async def get_metrics():
+    """In-process metrics for this worker."""
+    return metrics.snapshot()
+
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
 
@@ -175,5 +197,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
         log_level="info" if settings.DEBUG else "warning",
     )
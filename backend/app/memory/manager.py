@@ -3,7 +3,7 @@
 
 from app.memory.long_term import LongTermMemory
 from app.memory.short_term import ShortTermMemory
-from app.memory.summarizer import ConversationSummarizer
+from app.memory.summarizer import get_conversation_summarizer
 
 
 class MemoryManager:
@@ -15,7 +15,7 @@ class MemoryManager:
         """Initialize memory manager with database session."""
         self.short_term = ShortTermMemory()
         self.long_term = LongTermMemory(db_session)
-        self.summarizer = ConversationSummarizer()
+        self.summarizer = get_conversation_summarizer()
 
     async def get_session(self, session_id: str) -> dict | None:
         """Get session from short-term memory."""
@@ -30,9 +30,6 @@ class RedisManager:
             cls._instance = None
 
 
-redis_client = RedisManager.get_client()
-
-
 class ShortTermMemory:
     """Short-term memory using Redis for session storage."""
 
@@ -43,7 +40,7 @@ class ShortTermMemory:
     async def get_session(session_id: str) -> dict | None:
         """Retrieve session data from Redis."""
         key = f"{ShortTermMemory.SESSION_PREFIX}{session_id}"
-        return await redis_client.get(key)
+        return await RedisManager.get_client().get(key)
 
     @staticmethod
     async def save_session(session_id: str, data: dict) -> None:
@@ -52,7 +49,7 @@ class ShortTermMemory:
 
         key = f"{ShortTermMemory.SESSION_PREFIX}{session_id}"
         value = json.dumps(data)
-        await redis_client.setex(key, ShortTermMemory.SESSION_TTL, value)
+        await RedisManager.get_client().setex(key, ShortTermMemory.SESSION_TTL, value)
 
     @staticmethod
     async def add_message(session_id: str, message: dict) -> None:
@@ -69,10 +66,10 @@ class ShortTermMemory:
     async def delete_session(session_id: str) -> None:
         """Delete session from Redis."""
         key = f"{ShortTermMemory.SESSION_PREFIX}{session_id}"
-        await redis_client.delete(key)
+        await RedisManager.get_client().delete(key)
 
     @staticmethod
     async def increment_message_count(session_id: str) -> int:
         """Increment message count for session."""
         key = f"{ShortTermMemory.SESSION_PREFIX}{session_id}:count"
-        return await redis_client.incr(key)
+        return await RedisManager.get_client().incr(key)
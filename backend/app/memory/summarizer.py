@@ -1,7 +1,5 @@
 """Conversation summarizer using LLM via OpenRouter."""
 
-from langchain_openai import ChatOpenAI
-
 from app.config import settings
 
 
@@ -10,6 +8,8 @@ class ConversationSummarizer:
 
     def __init__(self):
         """Initialize conversation summarizer."""
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(
             model=settings.LLM_MODEL_PRIMARY,
             temperature=0.3,
@@ -70,4 +70,12 @@ Summary (2-3 sentences max):
         return "\n".join(formatted)
 
 
-conversation_summarizer = ConversationSummarizer()
+_conversation_summarizer: ConversationSummarizer | None = None
+
+
+def get_conversation_summarizer() -> ConversationSummarizer:
+    """Get or create the shared conversation summarizer."""
+    global _conversation_summarizer
+    if _conversation_summarizer is None:
+        _conversation_summarizer = ConversationSummarizer()
+    return _conversation_summarizer
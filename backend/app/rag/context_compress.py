@@ -1,6 +1,90 @@
 """Context compression for working memory management."""
 
+import re
+
+import numpy as np
+
 from app.config import settings
+from app.services.metrics import metrics
+from app.services.tokenizer import count_tokens, count_tokens_batch, encoding_name
+
+# Sentence ends (followed by whitespace) and line breaks, so markdown list
+# items and headings become their own units.
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """Start/end character offsets of the sentences in a text, whitespace trimmed."""
+    spans = []
+    start = 0
+    for match in [*_SENTENCE_BREAK.finditer(text), None]:
+        end = match.start() if match else len(text)
+        segment = text[start:end]
+        if segment.strip():
+            lead = len(segment) - len(segment.lstrip())
+            spans.append((start + lead, start + len(segment.rstrip())))
+        if match:
+            start = match.end()
+    return spans
+
+
+def annotate_sentences(text: str, model: str | None = None) -> dict:
+    """
+    Token count and sentence segmentation of a chunk, as stored in its payload.
+
+    Returns:
+        Dict with ``token_count``, ``sentences`` as ``[start, end, tokens]``
+        triples, and the ``tokenizer`` encoding that counted them
+    """
+    spans = sentence_spans(text)
+    counts = count_tokens_batch([text[start:end] for start, end in spans], model)
+    return {
+        "token_count": count_tokens(text, model),
+        "sentences": [[start, end, tokens] for (start, end), tokens in zip(spans, counts)],
+        "tokenizer": encoding_name(model),
+    }
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    vectors: np.ndarray,
+    costs: list[int],
+    budget: int,
+    diversity: float,
+) -> list[int]:
+    """
+    Greedy Maximal Marginal Relevance selection under a token budget.
+
+    Each step takes the candidate maximizing
+    ``(1 - diversity) * sim(query) - diversity * max sim(selected)`` among
+    those that still fit, until nothing fits.
+
+    Args:
+        query_vector: Unit query embedding
+        vectors: Unit candidate embeddings, one row per candidate
+        costs: Token cost of each candidate
+        budget: Total tokens available
+        diversity: Weight of the redundancy penalty, 0 to 1
+
+    Returns:
+        Indices of the selected candidates in selection order
+    """
+    relevance = vectors @ query_vector
+    redundancy = np.zeros(len(costs), dtype=np.float32)
+    available = np.ones(len(costs), dtype=bool)
+    cost = np.asarray(costs)
+
+    selected = []
+    while True:
+        available &= cost <= budget
+        if not available.any():
+            return selected
+        score = (1 - diversity) * relevance - diversity * redundancy
+        best = int(np.argmax(np.where(available, score, -np.inf)))
+        selected.append(best)
+        available[best] = False
+        budget -= costs[best]
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
 
 
 class ContextCompressor:
@@ -9,44 +93,159 @@ class ContextCompressor:
     def __init__(
         self,
         token_budget: int = settings.CONTEXT_TOKEN_BUDGET,
+        mode: str | None = None,
+        diversity: float | None = None,
+        tokenizer_model: str | None = None,
+        max_sentences: int | None = None,
     ):
-        """Initialize context compressor."""
+        """
+        Initialize context compressor.
+
+        Args:
+            token_budget: Maximum tokens for query plus context
+            mode: extractive (keyword heuristics) or mmr (embedding similarity
+                with Maximal Marginal Relevance; default: CONTEXT_COMPRESSION_MODE)
+            diversity: MMR redundancy weight (default: CONTEXT_MMR_DIVERSITY)
+            tokenizer_model: Model whose tokenizer measures the budget
+                (default: LLM_MODEL_PRIMARY)
+            max_sentences: Most sentences MMR embeds per call
+                (default: CONTEXT_MMR_MAX_SENTENCES)
+        """
         self.token_budget = token_budget
+        self.mode = mode or settings.CONTEXT_COMPRESSION_MODE
+        if self.mode not in ("extractive", "mmr"):
+            raise ValueError(f"Unknown context compression mode: {self.mode}")
+        self.diversity = settings.CONTEXT_MMR_DIVERSITY if diversity is None else diversity
+        self.tokenizer_model = tokenizer_model or settings.LLM_MODEL_PRIMARY
+        self.max_sentences = (
+            settings.CONTEXT_MMR_MAX_SENTENCES if max_sentences is None else max_sentences
+        )
+
+    async def async_compress(
+        self,
+        documents: list[str | dict],
+        query: str = "",
+    ) -> dict:
+        """Compress documents with the configured mode."""
+        if self.mode == "mmr" and query:
+            return await self.compress_mmr(documents, query)
+        return self.compress(documents, query)
+
+    async def compress_mmr(
+        self,
+        documents: list[str | dict],
+        query: str,
+    ) -> dict:
+        """
+        Fill the token budget with the query's most relevant, least redundant sentences.
+
+        Sentences are embedded as documents, the query as a query, and
+        sentences are picked greedily by MMR. Only the first ``max_sentences`` sentences
+        that fit the budget are candidates, taken in the given (reranked)
+        document order. Kept sentences are returned in their original order,
+        grouped by document. If embedding fails, extractive compression is
+        used instead.
+        """
+        docs = self._annotate(documents)
+        query_tokens = count_tokens(query, self.tokenizer_model)
+        total_tokens = query_tokens + sum(doc["token_count"] for doc in docs)
+        if total_tokens <= self.token_budget:
+            return {
+                "context": "\n\n".join(doc["text"] for doc in docs),
+                "compressed": False,
+                "tokens_used": total_tokens,
+                "tokens_budget": self.token_budget,
+            }
+
+        # Each kept sentence also costs roughly one separator token.
+        available = self.token_budget - query_tokens
+        sentences = [
+            (doc_index, doc["text"][start:end], tokens)
+            for doc_index, doc in enumerate(docs)
+            for start, end, tokens in doc["sentences"]
+            if tokens + 1 <= available
+        ][: self.max_sentences]
+
+        from app.ingestion.embedders.embedding import (
+            get_document_embedding_generator,
+            get_embedding_generator,
+        )
+
+        try:
+            query_vector = await get_embedding_generator().generate_single(query)
+            sentence_vectors = await get_document_embedding_generator().generate(
+                [text for _, text, _ in sentences]
+            )
+            embeddings = np.asarray([query_vector, *sentence_vectors], dtype=np.float32)
+        except Exception:
+            metrics.increment("context_compress.mmr_fallbacks")
+            return self.compress(docs, query)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+        costs = [tokens + 1 for _, _, tokens in sentences]
+        selected = mmr_select(embeddings[0], embeddings[1:], costs, available, self.diversity)
+
+        kept: dict[int, list[str]] = {}
+        for index in sorted(selected):
+            doc_index, text, _ = sentences[index]
+            kept.setdefault(doc_index, []).append(text)
+
+        return {
+            "context": "\n\n".join(" ".join(kept[doc_index]) for doc_index in sorted(kept)),
+            "compressed": True,
+            "tokens_used": query_tokens + sum(costs[index] for index in selected),
+            "tokens_budget": self.token_budget,
+        }
 
     def compress(
         self,
-        documents: list[str],
+        documents: list[str | dict],
         query: str = "",
     ) -> dict:
         """Compress documents within token budget using extractive compression."""
-        total_tokens = self._estimate_tokens(documents + [query])
+        docs = self._annotate(documents)
+        query_tokens = count_tokens(query, self.tokenizer_model)
+        total_tokens = query_tokens + sum(doc["token_count"] for doc in docs)
 
         if total_tokens <= self.token_budget:
             return {
-                "context": "\n\n".join(documents),
+                "context": "\n\n".join(doc["text"] for doc in docs),
                 "compressed": False,
                 "tokens_used": total_tokens,
                 "tokens_budget": self.token_budget,
             }
 
-        sorted_docs = self._sort_by_relevance(documents, query)
-        compressed_docs = self._extractive_compression(
-            sorted_docs, self.token_budget - len(query) // 4
+        sorted_docs = self._sort_by_relevance(docs, query)
+        compressed_docs, compressed_tokens = self._extractive_compression(
+            sorted_docs, self.token_budget - query_tokens
         )
 
         return {
             "context": "\n\n".join(compressed_docs),
             "compressed": True,
-            "tokens_used": len(query) // 4 + self._estimate_tokens(compressed_docs),
+            "tokens_used": query_tokens + compressed_tokens,
             "tokens_budget": self.token_budget,
         }
 
-    def _estimate_tokens(self, texts: list[str]) -> int:
-        """Estimate token count (rough approximation: 4 chars per token)."""
-        total_chars = sum(len(text) for text in texts)
-        return total_chars // 4
+    def _annotate(self, documents: list[str | dict]) -> list[dict]:
+        """
+        Text, token count and sentence spans of each document.
 
-    def _sort_by_relevance(self, documents: list[str], query: str) -> list[str]:
+        Documents are plain texts or retrieved payloads. Payloads annotated at
+        ingestion with the same tokenizer are used as-is; anything else is
+        segmented and counted here.
+        """
+        tokenizer = encoding_name(self.tokenizer_model)
+        annotated = []
+        for doc in documents:
+            if isinstance(doc, dict) and doc.get("tokenizer") == tokenizer and "sentences" in doc:
+                annotated.append(doc)
+                continue
+            text = doc["text"] if isinstance(doc, dict) else doc
+            annotated.append({"text": text, **annotate_sentences(text, self.tokenizer_model)})
+        return annotated
+
+    def _sort_by_relevance(self, documents: list[dict], query: str) -> list[dict]:
         """Sort documents by relevance to query (keyword matching)."""
         if not query:
             return documents
@@ -55,7 +254,7 @@ class ContextCompressor:
 
         scored = []
         for doc in documents:
-            doc_lower = doc.lower()
+            doc_lower = doc["text"].lower()
             matches = sum(1 for keyword in query_keywords if keyword in doc_lower)
             scored.append((doc, matches))
 
@@ -63,32 +262,34 @@ class ContextCompressor:
 
     def _extractive_compression(
         self,
-        documents: list[str],
+        documents: list[dict],
         max_tokens: int,
-    ) -> list[str]:
-        """Extractive compression to keep most relevant content."""
+    ) -> tuple[list[str], int]:
+        """
+        Extractive compression to keep most relevant content.
+
+        Returns:
+            Compressed documents and their token count, summed from the
+            sentence annotations (plus one separator token per sentence)
+        """
         compressed = []
         current_tokens = 0
 
         for doc in documents:
-            doc_tokens = self._estimate_tokens([doc])
-
-            if current_tokens + doc_tokens > max_tokens:
+            if current_tokens + doc["token_count"] > max_tokens:
                 break
 
             key_sentences = self._extract_key_sentences(doc)
-            compressed_doc = " ".join(key_sentences)
-            compressed.append(compressed_doc)
-
-            current_tokens += self._estimate_tokens([compressed_doc])
-
-        return compressed
+            compressed.append(" ".join(text for text, _ in key_sentences))
+            current_tokens += sum(tokens + 1 for _, tokens in key_sentences)
 
-    def _extract_key_sentences(self, text: str, max_sentences: int = 3) -> list[str]:
-        """Extract key sentences from document."""
-        import re
+        return compressed, current_tokens
 
-        sentences = [s.strip() for s in re.split(r"(?<=[.!?])", text) if s.strip()]
+    def _extract_key_sentences(
+        self, doc: dict, max_sentences: int = 3
+    ) -> list[tuple[str, int]]:
+        """Extract key sentences and their token counts from an annotated document."""
+        sentences = [(doc["text"][start:end], tokens) for start, end, tokens in doc["sentences"]]
 
         if len(sentences) <= max_sentences:
             return sentences
@@ -104,7 +305,7 @@ class ContextCompressor:
         ]
 
         scored = []
-        for i, sentence in enumerate(sentences):
+        for i, (sentence, tokens) in enumerate(sentences):
             score = 0
             sentence_lower = sentence.lower()
             for keyword in priority_keywords:
@@ -115,7 +316,7 @@ class ContextCompressor:
                 score += 1
 
             if i < len(sentences) - 1:
-                scored.append((sentence, score))
+                scored.append(((sentence, tokens), score))
 
         scored.append((sentences[-1], 1))
 
@@ -0,0 +1,303 @@
+"""In-process vector index loaded from a knowledge-base snapshot.
+
+A snapshot is a directory exported from a Qdrant collection by the
+ingestion CLI:
+
+- ``vectors.npy``: L2-normalized float32 or float16 matrix, memory-mapped;
+  grouped by IVF list when IVF is enabled
+- ``payloads.jsonl`` and ``offsets.npy``: point IDs and payloads, read per hit
+- ``columns.npz``: integer codes per indexed payload field, for filtering
+- ``centroids.npy``, ``order.npy``, ``list_offsets.npy``: optional IVF lists
+  (``order`` maps a vector's position to its payload row)
+- ``meta.json``: dimension, dtype, field vocabularies and export details
+
+Search is a brute-force dot product, or restricted to the ``nprobe``
+nearest IVF lists when the snapshot was exported with ``nlist > 0``. Each
+list is a contiguous slice of the matrix, so probing reads sequentially.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+from qdrant_client import models
+
+from app.config import settings
+from app.rag.qdrant_client import QdrantManager, keyword_index_fields
+
+SNAPSHOT_VERSION = 1
+SCROLL_BATCH_SIZE = 1024
+SCORE_BLOCK_ROWS = 8192
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _train_ivf(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0):
+    """Spherical k-means; returns centroids and each row's list number."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), nlist * 256), replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for i in range(nlist):
+            members = sample[assignment == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+
+    assignment = np.concatenate(
+        [
+            np.argmax(vectors[start : start + SCORE_BLOCK_ROWS] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), SCORE_BLOCK_ROWS)
+        ]
+    )
+    return centroids.astype(np.float32), assignment
+
+
+def export_snapshot(
+    collection_name: str,
+    path: str,
+    dtype: str = "float32",
+    nlist: int = 0,
+    fields: list[str] | None = None,
+) -> dict:
+    """
+    Export a Qdrant collection (or alias) to a local index snapshot.
+
+    The snapshot is written next to ``path`` and moved into place once
+    complete, so a running process never sees a partial snapshot.
+
+    Args:
+        collection_name: Collection or alias to export
+        path: Snapshot directory
+        dtype: Vector storage type, float32 or float16
+        nlist: IVF lists to train (0: brute-force search only)
+        fields: Payload fields to index for filtering (default: language
+            plus QDRANT_KEYWORD_INDEXES)
+
+    Returns:
+        Snapshot metadata
+    """
+    if dtype not in ("float32", "float16"):
+        raise ValueError(f"Unsupported snapshot dtype: {dtype}")
+
+    fields = list(dict.fromkeys(["language"] + (fields or keyword_index_fields())))
+    client = QdrantManager.get_client()
+
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    blocks = []
+    offsets = [0]
+    codes: dict[str, list[int]] = {field: [] for field in fields}
+    vocab: dict[str, dict] = {field: {} for field in fields}
+
+    with open(os.path.join(tmp_path, "payloads.jsonl"), "wb") as f:
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=SCROLL_BATCH_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                blocks.append(np.asarray([p.vector for p in points], dtype=np.float32))
+            for point in points:
+                payload = point.payload or {}
+                line = json.dumps({"id": point.id, "payload": payload}).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+                for field in fields:
+                    value = payload.get(field)
+                    if value is None or isinstance(value, (list, dict)):
+                        codes[field].append(-1)
+                    else:
+                        codes[field].append(vocab[field].setdefault(value, len(vocab[field])))
+            if offset is None:
+                break
+
+    from app.ingestion.embedders.local_embedding import embedding_dimension
+
+    dimension = embedding_dimension()
+    vectors = (
+        _normalize(np.concatenate(blocks)) if blocks else np.zeros((0, dimension), np.float32)
+    )
+    del blocks
+    np.save(os.path.join(tmp_path, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    np.savez(
+        os.path.join(tmp_path, "columns.npz"),
+        **{field: np.asarray(values, dtype=np.int32) for field, values in codes.items()},
+    )
+
+    nlist = min(nlist, len(vectors))
+    if nlist > 0:
+        centroids, assignment = _train_ivf(vectors, nlist)
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        list_offsets = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        vectors = vectors[order]
+        np.save(os.path.join(tmp_path, "centroids.npy"), centroids)
+        np.save(os.path.join(tmp_path, "order.npy"), order)
+        np.save(os.path.join(tmp_path, "list_offsets.npy"), list_offsets.astype(np.int64))
+    np.save(os.path.join(tmp_path, "vectors.npy"), vectors.astype(dtype))
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "collection": QdrantManager.resolve_alias(collection_name) or collection_name,
+        "count": int(len(vectors)),
+        "dimension": int(vectors.shape[1]),
+        "dtype": dtype,
+        "nlist": int(nlist),
+        "model": settings.EMBEDDING_MODEL,
+        "fields": {field: list(values) for field, values in vocab.items()},
+        "created_at": datetime.now().isoformat(),
+    }
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return meta
+
+
+class LocalVectorIndex:
+    """Memory-mapped, read-only vector index with the QdrantManager.search interface."""
+
+    def __init__(self, path: str, nprobe: int = 8):
+        """
+        Load a snapshot.
+
+        Args:
+            path: Snapshot directory written by export_snapshot
+            nprobe: IVF lists searched per query (ignored without IVF)
+        """
+        self.path = path
+        self.nprobe = nprobe
+
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {path}: {self.meta.get('version')}")
+
+        self.count = self.meta["count"]
+        mmap_mode = "r" if self.count else None
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.payloads = (
+            np.memmap(os.path.join(path, "payloads.jsonl"), dtype=np.uint8, mode="r")
+            if self.count
+            else None
+        )
+        with np.load(os.path.join(path, "columns.npz")) as columns:
+            self.columns = {field: columns[field] for field in columns.files}
+        self.codes = {
+            field: {value: code for code, value in enumerate(values)}
+            for field, values in self.meta["fields"].items()
+        }
+
+        self.centroids = None
+        self.order = None
+        if self.meta.get("nlist"):
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.order = np.load(os.path.join(path, "order.npy"))
+            self.list_offsets = np.load(os.path.join(path, "list_offsets.npy"))
+
+    def search(
+        self,
+        query_vector: list[float],
+        limit: int = 5,
+        score_threshold: float | None = None,
+        filters: dict | None = None,
+        language: str = "en",
+    ) -> list[models.ScoredPoint]:
+        """Search the snapshot with the same filter semantics as build_filter."""
+        if not self.count:
+            return []
+
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        mask = self._filter_mask({"language": language, **(filters or {})})
+
+        rows, scores = [], []
+        for start, end in self._probe(query):
+            positions = np.arange(start, end)
+            block_rows = positions if self.order is None else self.order[positions]
+            keep = mask[block_rows]
+            if keep.any():
+                rows.append(block_rows[keep])
+                scores.append(self._score(start, end, query)[keep])
+        if not rows:
+            return []
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for i in top:
+            score = float(scores[i])
+            if score_threshold is not None and score < score_threshold:
+                break
+            record = self._record(int(rows[i]))
+            results.append(
+                models.ScoredPoint(
+                    id=record["id"], version=0, score=score, payload=record["payload"]
+                )
+            )
+        return results
+
+    def _probe(self, query: np.ndarray) -> list[tuple[int, int]]:
+        """Vector slices to scan: the nearest IVF lists, or the whole matrix."""
+        if self.centroids is None or self.nprobe >= len(self.centroids):
+            return [(0, self.count)]
+        probe = np.argpartition(-(self.centroids @ query), self.nprobe - 1)[: self.nprobe]
+        return [(int(self.list_offsets[i]), int(self.list_offsets[i + 1])) for i in sorted(probe)]
+
+    def _filter_mask(self, conditions: dict) -> np.ndarray:
+        """Boolean row mask for exact-match conditions; list values match any."""
+        mask = np.ones(self.count, dtype=bool)
+        for field, value in conditions.items():
+            if field not in self.columns:
+                raise ValueError(f"Field '{field}' is not indexed in snapshot {self.path}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            wanted = [self.codes[field][v] for v in values if v in self.codes[field]]
+            mask &= np.isin(self.columns[field], wanted)
+        return mask
+
+    def _score(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        """Dot products for a slice of vectors, upcasting float16 blocks."""
+        if self.vectors.dtype == np.float32:
+            return self.vectors[start:end] @ query
+        return np.concatenate(
+            [
+                self.vectors[i : min(i + SCORE_BLOCK_ROWS, end)].astype(np.float32) @ query
+                for i in range(start, end, SCORE_BLOCK_ROWS)
+            ]
+        )
+
+    def _record(self, row: int) -> dict:
+        """Point ID and payload of a row."""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return json.loads(self.payloads[start:end].tobytes())
+
+
+_local_index = None
+
+
+def get_local_index() -> LocalVectorIndex:
+    """Get or load the shared local index from LOCAL_INDEX_PATH."""
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalVectorIndex(settings.LOCAL_INDEX_PATH, settings.LOCAL_INDEX_NPROBE)
+    return _local_index
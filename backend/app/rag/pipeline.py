@@ -1,10 +1,13 @@
 """Main RAG pipeline orchestrator."""
 
+import asyncio
+
 from app.config import settings
 from app.rag.context_compress import ContextCompressor
 from app.rag.query_transform import QueryTransformer
-from app.rag.reranker import BGEReranker
+from app.rag.reranker import configure_torch_threads, get_reranker
 from app.rag.retriever import DenseRetriever
+from app.services.simhash import collapse_near_duplicates
 
 
 class RAGPipeline:
@@ -14,9 +17,26 @@ class RAGPipeline:
         """Initialize RAG pipeline components."""
         self.query_transformer = QueryTransformer()
         self.retriever = DenseRetriever()
-        self.reranker = BGEReranker(top_n=settings.RERANK_TOP_N)
+        self.reranker = get_reranker()
         self.compressor = ContextCompressor(token_budget=settings.CONTEXT_TOKEN_BUDGET)
 
+    async def warm_up(self) -> None:
+        """Load models and create clients ahead of the first request."""
+        from app.ingestion.embedders.embedding import get_embedding_generator
+        from app.rag.qdrant_client import QdrantManager
+
+        if settings.TORCH_NUM_THREADS:
+            configure_torch_threads(settings.TORCH_NUM_THREADS)
+
+        if settings.VECTOR_STORE_BACKEND == "local":
+            from app.rag.local_index import get_local_index
+
+            get_local_index()
+        else:
+            QdrantManager.get_client()
+        get_embedding_generator()
+        await asyncio.to_thread(self.reranker.warm_up)
+
     async def run(
         self,
         query: str,
@@ -25,22 +45,23 @@ class RAGPipeline:
     ) -> dict:
         """Execute full RAG pipeline."""
         transform_result = await self.query_transformer.transform(query)
-        transformed_query = transform_result["rewitten"]
+        transformed_query = transform_result["rewritten"]
 
-        docs = await self.retriever.dense_search(transformed_query)
-        reranked_docs = await self.reranker.async_rerank(transformed_query, docs)
+        queries = self._retrieval_queries(transform_result)
+        docs = _to_documents(await self.retriever.multi_search(queries))
+        candidates = _collapse(docs)
+        reranked_docs = await self.reranker.async_rerank(transformed_query, candidates)
 
-        context_result = self.compressor.compress(
-            [doc["text"] for doc in reranked_docs],
-            query,
-        )
+        context_result = await self.compressor.async_compress(reranked_docs, query)
 
         return {
             "query": query,
             "transformed_query": transformed_query,
+            "sub_queries": queries[1:],
             "intent": transform_result["intent"],
             "language": transform_result["language"],
             "retrieved_count": len(docs),
+            "candidate_count": len(candidates),
             "reranked_count": len(reranked_docs),
             "context": context_result["context"],
             "compressed": context_result["compressed"],
@@ -48,6 +69,7 @@ class RAGPipeline:
                 {
                     "text": doc["text"],
                     "score": doc["rerank_score"],
+                    "file_name": doc.get("file_name"),
                 }
                 for doc in reranked_docs[:5]
             ],
@@ -55,6 +77,23 @@ class RAGPipeline:
             "token_budget": settings.CONTEXT_TOKEN_BUDGET,
         }
 
+    async def retrieve(
+        self,
+        query: str,
+        session_id: str | None = None,
+        top_k: int | None = None,
+    ) -> dict:
+        """Run the pipeline and shape the result for the retrieve_knowledge tool."""
+        result = await self.run(query, session_id, conversation_history=[])
+        sources = result["sources"][:top_k] if top_k else result["sources"]
+
+        return {
+            "documents": sources,
+            "context": result["context"],
+            "metadata": sources,
+            "confidence": min(1.0, max(0.0, sources[0]["score"])) if sources else 0.0,
+        }
+
     async def retrieve_context(
         self,
         query: str,
@@ -63,11 +102,52 @@ class RAGPipeline:
         """Simple retrieval for context without full pipeline."""
         docs = await self.reranker.async_rerank(
             query,
-            await self.retriever.dense_search(query),
+            _collapse(_to_documents(await self.retriever.dense_search(query))),
         )
 
         context = "\n\n".join([doc["text"] for doc in docs[:3]])
         return context
 
+    def _retrieval_queries(self, transform_result: dict) -> list[str]:
+        """Rewritten query plus decomposed sub-queries, deduplicated."""
+        queries = [transform_result["rewritten"]]
+        if settings.RETRIEVAL_MULTI_QUERY:
+            sub_queries = transform_result.get("sub_queries") or []
+            queries.extend(sub_queries[: settings.RETRIEVAL_MAX_SUB_QUERIES])
+        return list(dict.fromkeys(q for q in queries if q))
+
+
+def _to_documents(points: list) -> list[dict]:
+    """Convert scored points to reranker documents (payload plus ID and score)."""
+    return [
+        {**(point.payload or {}), "id": str(point.id), "score": point.score}
+        for point in points
+    ]
+
+
+def _collapse(documents: list[dict]) -> list[dict]:
+    """Keep the best-scoring chunk of each near-duplicate group, if enabled."""
+    if not settings.RETRIEVAL_COLLAPSE_NEAR_DUPLICATES:
+        return documents
+    return collapse_near_duplicates(documents, settings.NEAR_DUPLICATE_MAX_DISTANCE)
+
+
+_rag_pipeline: RAGPipeline | None = None
+
+
+def get_rag_pipeline() -> RAGPipeline:
+    """Get or create the shared RAG pipeline instance."""
+    global _rag_pipeline
+    if _rag_pipeline is None:
+        _rag_pipeline = RAGPipeline()
+    return _rag_pipeline
+
+
+def preload_models() -> None:
+    """
+    Load model weights in the current process before workers are forked.
 
-rag_pipeline = RAGPipeline()
+    Only weights are loaded: network clients must be created per worker,
+    and no inference is run so torch thread pools are not started pre-fork.
+    """
+    get_reranker().load()
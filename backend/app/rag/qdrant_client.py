@@ -1,5 +1,6 @@
 """Qdrant client initialization and collection setup."""
 
+import re
 
 from qdrant_client import QdrantClient, models
 from qdrant_client.http.models import Distance, Filter, VectorParams
@@ -21,37 +22,253 @@ class QdrantManager:
 
     @classmethod
     async def initialize_collections(cls) -> None:
-        """Initialize Qdrant collections for knowledge base and summaries."""
+        """
+        Initialize Qdrant collections for knowledge base and summaries.
+
+        The knowledge base is created as ``<name>_v1`` behind an alias named
+        ``KNOWLEDGE_BASE_COLLECTION``. A pre-existing plain collection with
+        that name is left in place and keeps working until the first rebuild.
+        """
+        from app.ingestion.embedders.local_embedding import embedding_dimension
+
         client = cls.get_client()
 
         collections = client.get_collections()
 
         existing_collections = {c.name for c in collections.collections} if collections else set()
 
-        if "knowledge_base" not in existing_collections:
-            client.create_collection(
-                collection_name="knowledge_base",
-                vectors_config=VectorParams(
-                    size=settings.EMBEDDING_DIMENSION,
-                    distance=Distance.COSINE,
-                ),
-            )
+        knowledge_base = settings.KNOWLEDGE_BASE_COLLECTION
+        if knowledge_base not in existing_collections and not cls.resolve_alias(knowledge_base):
+            version = versioned_name(knowledge_base, 1)
+            if version not in existing_collections:
+                await cls.create_collection(version)
+            await cls.swap_alias(knowledge_base, version)
 
         if "conversation_summaries" not in existing_collections:
             client.create_collection(
                 collection_name="conversation_summaries",
                 vectors_config=VectorParams(
-                    size=settings.EMBEDDING_DIMENSION,
+                    size=embedding_dimension(),
                     distance=Distance.COSINE,
                 ),
             )
 
+    @classmethod
+    async def create_collection(cls, collection_name: str) -> None:
+        """Create a knowledge-base style collection with tuned storage and indexes."""
+        from app.ingestion.embedders.local_embedding import embedding_dimension
+
+        client = cls.get_client()
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(
+                size=embedding_dimension(),
+                distance=Distance.COSINE,
+                on_disk=settings.QDRANT_VECTORS_ON_DISK,
+            ),
+            hnsw_config=models.HnswConfigDiff(
+                m=settings.QDRANT_HNSW_M,
+                ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            ),
+            quantization_config=quantization_config(),
+        )
+        await cls.ensure_payload_indexes(collection_name, keyword_index_fields())
+
+    @classmethod
+    async def ensure_payload_indexes(cls, collection_name: str, fields: list[str]) -> list[str]:
+        """
+        Create keyword payload indexes that do not exist yet.
+
+        Returns:
+            Fields that were newly indexed
+        """
+        client = cls.get_client()
+        existing = client.get_collection(collection_name).payload_schema or {}
+
+        created = []
+        for field_name in fields:
+            if field_name in existing:
+                continue
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=models.PayloadSchemaType.KEYWORD,
+            )
+            created.append(field_name)
+        return created
+
+    @classmethod
+    async def apply_collection_config(cls, collection_name: str) -> list[str]:
+        """
+        Bring an existing collection in line with the configured tuning.
+
+        Vector storage, HNSW and quantization changes are applied in place;
+        Qdrant rebuilds segments in the background while search keeps
+        working. Missing payload indexes are created.
+
+        Returns:
+            Fields that were newly indexed
+        """
+        client = cls.get_client()
+        client.update_collection(
+            collection_name=collection_name,
+            vectors_config={"": models.VectorParamsDiff(on_disk=settings.QDRANT_VECTORS_ON_DISK)},
+            hnsw_config=models.HnswConfigDiff(
+                m=settings.QDRANT_HNSW_M,
+                ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            ),
+            quantization_config=quantization_config() or models.Disabled.DISABLED,
+        )
+        return await cls.ensure_payload_indexes(collection_name, keyword_index_fields())
+
+    @classmethod
+    async def count_points(cls, collection_name: str) -> int:
+        """Exact number of points in a collection."""
+        client = cls.get_client()
+        return client.count(collection_name=collection_name, exact=True).count
+
+    @classmethod
+    def vector_size(cls, collection_name: str) -> int | None:
+        """Vector size of a collection or alias, or None if it does not exist."""
+        client = cls.get_client()
+        name = cls.resolve_alias(collection_name) or collection_name
+        if not client.collection_exists(name):
+            return None
+        return client.get_collection(name).config.params.vectors.size
+
+    @classmethod
+    def resolve_alias(cls, alias: str) -> str | None:
+        """Collection an alias points to, or None if the alias does not exist."""
+        client = cls.get_client()
+        for description in client.get_aliases().aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+        return None
+
+    @classmethod
+    async def list_versions(cls, base_name: str) -> list[tuple[int, str]]:
+        """Versioned collections (``<base>_v<N>``) sorted by version."""
+        client = cls.get_client()
+        pattern = re.compile(rf"^{re.escape(base_name)}_v(\d+)$")
+        versions = []
+        for collection in client.get_collections().collections:
+            match = pattern.match(collection.name)
+            if match:
+                versions.append((int(match.group(1)), collection.name))
+        return sorted(versions)
+
+    @classmethod
+    async def next_version(cls, base_name: str) -> str:
+        """Name for the next versioned collection."""
+        versions = await cls.list_versions(base_name)
+        return versioned_name(base_name, versions[-1][0] + 1 if versions else 1)
+
+    @classmethod
+    async def swap_alias(cls, alias: str, collection_name: str) -> str | None:
+        """
+        Atomically point an alias at a collection.
+
+        A plain collection named like the alias (pre-versioning layout) is
+        dropped first, since Qdrant cannot hold both; queries fail only for
+        the moment between the drop and the alias switch.
+
+        Returns:
+            Collection the alias pointed to before, if any
+        """
+        client = cls.get_client()
+        previous = cls.resolve_alias(alias)
+
+        if previous is None and client.collection_exists(alias):
+            client.delete_collection(alias)
+
+        operations = []
+        if previous is not None:
+            operations.append(
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias))
+            )
+        operations.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias)
+            )
+        )
+        client.update_collection_aliases(change_aliases_operations=operations)
+
+        return previous
+
+    @classmethod
+    async def rollback_alias(cls, alias: str) -> str | None:
+        """
+        Point an alias back at the newest version older than its current one.
+
+        Returns:
+            Collection the alias now points to, or None if there is nothing to roll back to
+        """
+        current = cls.resolve_alias(alias)
+        versions = await cls.list_versions(alias)
+        current_version = next((v for v, name in versions if name == current), None)
+        if current_version is None:
+            return None
+
+        older = [name for v, name in versions if v < current_version]
+        if not older:
+            return None
+
+        await cls.swap_alias(alias, older[-1])
+        return older[-1]
+
+    @classmethod
+    async def garbage_collect_versions(cls, alias: str, keep: int) -> list[str]:
+        """
+        Delete old versions, keeping the ``keep`` newest and the alias target.
+
+        Returns:
+            Names of deleted collections
+        """
+        client = cls.get_client()
+        current = cls.resolve_alias(alias)
+        versions = await cls.list_versions(alias)
+
+        deleted = []
+        for _, name in versions[: max(0, len(versions) - keep)]:
+            if name == current:
+                continue
+            client.delete_collection(name)
+            deleted.append(name)
+        return deleted
+
     @classmethod
     async def upsert_documents(cls, collection_name: str, points: list[models.PointStruct]) -> None:
         """Upsert documents to Qdrant collection."""
         client = cls.get_client()
         client.upsert(collection_name=collection_name, points=points)
 
+    @classmethod
+    def scroll_payloads(cls, collection_name: str, fields: list[str]):
+        """Yield the selected payload fields of every point in a collection."""
+        client = cls.get_client()
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=1024,
+                offset=offset,
+                with_payload=fields,
+                with_vectors=False,
+            )
+            for point in points:
+                yield point.payload or {}
+            if offset is None:
+                return
+
+    @classmethod
+    async def delete_points(cls, collection_name: str, point_ids: list[str]) -> None:
+        """Delete points from Qdrant collection by ID."""
+        client = cls.get_client()
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=point_ids),
+        )
+
     @classmethod
     async def search(
         cls,
@@ -59,17 +276,16 @@ class QdrantManager:
         query_vector: list[float],
         limit: int = 5,
         score_threshold: float | None = None,
+        filters: dict | None = None,
     ) -> list[models.ScoredPoint]:
         """Search documents in Qdrant collection."""
         client = cls.get_client()
-        search_filter = Filter(
-            must=[models.FieldCondition(key="language", match=models.MatchValue(value="en"))]
-        )
 
         results = client.query_points(
             collection_name=collection_name,
             query=query_vector,
-            query_filter=search_filter,
+            query_filter=build_filter(filters),
+            search_params=search_params(),
             limit=limit,
             score_threshold=score_threshold,
         )
@@ -77,4 +293,67 @@ class QdrantManager:
         return results.points
 
 
-qdrant_client = QdrantManager.get_client()
+def versioned_name(base_name: str, version: int) -> str:
+    """Name of a versioned knowledge-base collection."""
+    return f"{base_name}_v{version}"
+
+
+def keyword_index_fields() -> list[str]:
+    """Payload fields configured for keyword indexes."""
+    return [f.strip() for f in settings.QDRANT_KEYWORD_INDEXES.split(",") if f.strip()]
+
+
+def quantization_config() -> models.ScalarQuantization | None:
+    """Configured vector quantization, or None when disabled."""
+    if settings.QDRANT_QUANTIZATION.lower() != "int8":
+        return None
+    return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=0.99,
+            always_ram=True,
+        )
+    )
+
+
+def search_params(hnsw_ef: int | None = None, exact: bool = False) -> models.SearchParams:
+    """
+    Search parameters for the HNSW beam and quantization rescoring.
+
+    Args:
+        hnsw_ef: HNSW beam width (default: QDRANT_HNSW_EF)
+        exact: Brute-force search, bypassing the HNSW index
+
+    Returns:
+        Qdrant search parameters
+    """
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef or settings.QDRANT_HNSW_EF,
+        exact=exact,
+        quantization=models.QuantizationSearchParams(
+            rescore=settings.QDRANT_QUANTIZATION_RESCORE,
+            oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING,
+        ),
+    )
+
+
+def build_filter(filters: dict | None = None, language: str = "en") -> Filter:
+    """
+    Build a payload filter for English chunks plus exact-match field filters.
+
+    Args:
+        filters: Field values to match; a list matches any of its values
+        language: Required ``language`` payload value
+
+    Returns:
+        Qdrant filter
+    """
+    conditions = [models.FieldCondition(key="language", match=models.MatchValue(value=language))]
+    for key, value in (filters or {}).items():
+        match = (
+            models.MatchAny(any=list(value))
+            if isinstance(value, (list, tuple, set))
+            else models.MatchValue(value=value)
+        )
+        conditions.append(models.FieldCondition(key=key, match=match))
+    return Filter(must=conditions)
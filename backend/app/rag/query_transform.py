@@ -1,16 +1,20 @@
 """Query transformation using LangChain LLM."""
 
-
-from langchain_openai import ChatOpenAI
+import re
 
 from app.config import settings
 
+# Leading "1.", "2)", "-" or "*" of an LLM-produced list item.
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*\u2022])\s*")
+
 
 class QueryTransformer:
     """Transform user queries using LLM-based techniques."""
 
     def __init__(self):
         """Initialize query transformer."""
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(
             model=settings.LLM_MODEL_PRIMARY,
             temperature=0.3,
@@ -79,10 +83,11 @@ Original query: {query}
 Sub-queries (list each on a new line):
 """
             response = await self.llm.ainvoke(prompt)
+            lines = response.content.strip().split("\n")
             sub_queries = [
-                line.strip()
-                for line in response.content.strip().split("\n")
-                if line.strip()
+                sub_query
+                for sub_query in (_LIST_MARKER.sub("", line).strip() for line in lines)
+                if sub_query
             ]
             return sub_queries if sub_queries else None
         return None
@@ -1,18 +1,51 @@
 """Cross-encoder reranker using HuggingFace."""
 
-
-import torch
-from sentence_transformers import CrossEncoder
+from app.config import settings
 
 
 class BGEReranker:
-    """Reranker using BAAI/bge-reranker-v2-m3 cross-encoder."""
+    """
+    Reranker using BAAI/bge-reranker-v2-m3 cross-encoder.
+
+    torch and sentence-transformers are imported, and the model weights
+    loaded, on first use (or an explicit ``load()``), not at import time.
+    """
 
     def __init__(self, model_name: str = "BAAI/bge-reranker-v2-m3", top_n: int = 5):
         """Initialize BGE reranker."""
-        self.model = CrossEncoder(model_name)
+        self.model_name = model_name
         self.top_n = top_n
-        self.model.eval()
+        self._model = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the cross-encoder weights are in memory."""
+        return self._model is not None
+
+    @property
+    def model(self):
+        """Cross-encoder model, loaded on first access."""
+        if self._model is None:
+            self.load()
+        return self._model
+
+    def load(self) -> None:
+        """Import the ML stack and load the cross-encoder weights."""
+        if self._model is not None:
+            return
+
+        from sentence_transformers import CrossEncoder
+
+        # safetensors only avoids unpickling the checkpoint. The weights end up in
+        # ordinary torch tensors; workers share them because they are loaded in the
+        # gunicorn master before fork (copy-on-write, see gunicorn.conf.py).
+        model = CrossEncoder(self.model_name, model_kwargs={"use_safetensors": True})
+        model.eval()
+        self._model = model
+
+    def warm_up(self) -> None:
+        """Load the model and run one prediction so first requests are fast."""
+        self.rerank("warm up", [{"text": "warm up"}], top_k=1)
 
     def rerank(
         self,
@@ -27,6 +60,8 @@ class BGEReranker:
         if not documents:
             return []
 
+        import torch
+
         pairs = [[query, doc["text"]] for doc in documents]
 
         with torch.no_grad():
@@ -49,3 +84,24 @@ class BGEReranker:
     ) -> list[dict]:
         """Async wrapper for reranking."""
         return self.rerank(query, documents, top_k)
+
+
+_reranker: BGEReranker | None = None
+
+
+def get_reranker() -> BGEReranker:
+    """Get or create the shared reranker instance."""
+    global _reranker
+    if _reranker is None:
+        _reranker = BGEReranker(
+            model_name=settings.RERANKER_MODEL,
+            top_n=settings.RERANK_TOP_N,
+        )
+    return _reranker
+
+
+def configure_torch_threads(num_threads: int) -> None:
+    """Limit torch intra-op threads for this process."""
+    import torch
+
+    torch.set_num_threads(num_threads)
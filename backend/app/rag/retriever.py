@@ -4,8 +4,39 @@ from qdrant_client import models
 from qdrant_client.http.models import Filter
 
 from app.config import settings
-from app.ingestion.embedders.embedding import embedding_generator
-from app.rag.qdrant_client import QdrantManager
+from app.ingestion.embedders.embedding import get_embedding_generator
+from app.rag.local_index import get_local_index
+from app.rag.qdrant_client import QdrantManager, build_filter, search_params
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[models.ScoredPoint]],
+    k: int = 60,
+    limit: int | None = None,
+) -> list[models.ScoredPoint]:
+    """
+    Fuse ranked result lists with Reciprocal Rank Fusion.
+
+    Points found by several lists are merged by ID; each contributes
+    ``1 / (k + rank)`` per list. The fused score replaces the point's score.
+
+    Args:
+        result_lists: Ranked results, one list per query
+        k: RRF damping constant
+        limit: Maximum number of fused results
+
+    Returns:
+        Deduplicated points ordered by fused score
+    """
+    fused: dict = {}
+    points: dict = {}
+    for results in result_lists:
+        for rank, point in enumerate(results, start=1):
+            fused[point.id] = fused.get(point.id, 0.0) + 1.0 / (k + rank)
+            points.setdefault(point.id, point)
+
+    ranked = sorted(fused, key=fused.get, reverse=True)[:limit]
+    return [points[point_id].model_copy(update={"score": fused[point_id]}) for point_id in ranked]
 
 
 class DenseRetriever:
@@ -18,20 +49,50 @@ class DenseRetriever:
     async def dense_search(
         self,
         query: str,
-        collection_name: str = "knowledge_base",
+        collection_name: str = settings.KNOWLEDGE_BASE_COLLECTION,
         filters: dict | None = None,
     ) -> list[models.ScoredPoint]:
         """Execute dense search using semantic vectors."""
-        query_vector = await embedding_generator.generate_single(query)
+        query_vector = await get_embedding_generator().generate_single(query)
 
-        qdrant_filter = Filter(
-            must=[models.FieldCondition(key="language", match=models.MatchValue(value="en"))]
-        )
+        if settings.VECTOR_STORE_BACKEND == "local":
+            return get_local_index().search(query_vector, limit=self.k, filters=filters)
+
+        qdrant_filter = build_filter(filters)
 
         dense_results = await self._dense_search(query_vector, collection_name, qdrant_filter)
 
         return dense_results
 
+    async def multi_search(
+        self,
+        queries: list[str],
+        collection_name: str = settings.KNOWLEDGE_BASE_COLLECTION,
+        filters: dict | None = None,
+    ) -> list[models.ScoredPoint]:
+        """
+        Search several queries at once and fuse their results with RRF.
+
+        All queries are embedded in one batched call and searched in one
+        ``query_batch_points`` request.
+        """
+        if len(queries) == 1:
+            return await self.dense_search(queries[0], collection_name, filters)
+
+        query_vectors = await get_embedding_generator().generate(queries)
+
+        if settings.VECTOR_STORE_BACKEND == "local":
+            index = get_local_index()
+            result_lists = [
+                index.search(vector, limit=self.k, filters=filters) for vector in query_vectors
+            ]
+        else:
+            result_lists = await self._batch_search(
+                query_vectors, collection_name, build_filter(filters)
+            )
+
+        return reciprocal_rank_fusion(result_lists, k=settings.RRF_K, limit=self.k)
+
     async def _dense_search(
         self,
         query_vector: list[float],
@@ -45,7 +106,33 @@ class DenseRetriever:
             collection_name=collection_name,
             query=query_vector,
             query_filter=filter,
+            search_params=search_params(),
             limit=self.k,
         )
 
         return results.points
+
+    async def _batch_search(
+        self,
+        query_vectors: list[list[float]],
+        collection_name: str,
+        filter: Filter,
+    ) -> list[list[models.ScoredPoint]]:
+        """Several dense searches in a single Qdrant request."""
+        client = QdrantManager.get_client()
+
+        responses = client.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=vector,
+                    filter=filter,
+                    params=search_params(),
+                    limit=self.k,
+                    with_payload=True,
+                )
+                for vector in query_vectors
+            ],
+        )
+
+        return [response.points for response in responses]
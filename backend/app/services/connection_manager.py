@@ -0,0 +1,394 @@
+"""WebSocket connection manager with optional Redis pub/sub fan-out."""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from uuid import uuid4
+
+from fastapi import WebSocket
+
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundChannel:
+    """
+    Per-socket outbound queue drained by a dedicated writer task.
+
+    Producers enqueue without awaiting the client, so a slow socket never
+    stalls the agent. Progress frames (``thought``) are coalesced: a newer
+    one replaces one still waiting in the queue, they are sent at most once
+    per throttle interval, and they are dropped once a regular message is
+    queued behind them.
+    """
+
+    PROGRESS_TYPES = frozenset({"thought"})
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        throttle_ms: int = settings.WS_PROGRESS_THROTTLE_MS,
+        max_queue_size: int = settings.WS_OUTBOUND_QUEUE_SIZE,
+    ):
+        """
+        Initialize outbound channel and start its writer task.
+
+        Args:
+            websocket: Accepted WebSocket connection
+            throttle_ms: Minimum interval between progress frames
+            max_queue_size: Queue length at which progress frames are shed
+        """
+        self.websocket = websocket
+        self.throttle = throttle_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.closed = False
+
+        self._queue: deque[dict] = deque()
+        self._ready = asyncio.Event()
+        self._last_progress_at = 0.0
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def _is_progress(self, message: dict) -> bool:
+        return message.get("type") in self.PROGRESS_TYPES
+
+    def send(self, message: dict) -> None:
+        """Queue a message for delivery without waiting for the client."""
+        if self.closed:
+            return
+
+        if self._is_progress(message) and self._queue and self._is_progress(self._queue[-1]):
+            self._queue[-1] = message
+            metrics.increment("ws_outbound.coalesced")
+        else:
+            if len(self._queue) >= self.max_queue_size:
+                self._shed_progress()
+            self._queue.append(message)
+
+        self._ready.set()
+
+    def _shed_progress(self) -> None:
+        """Drop queued progress frames when the client falls far behind."""
+        kept = deque(m for m in self._queue if not self._is_progress(m))
+        metrics.increment("ws_outbound.dropped", len(self._queue) - len(kept))
+        self._queue = kept
+
+    async def _writer(self) -> None:
+        """Send queued messages in order until the socket fails or closes."""
+        try:
+            while True:
+                await self._ready.wait()
+
+                while self._queue:
+                    message = self._queue[0]
+
+                    if self._is_progress(message):
+                        if len(self._queue) > 1:
+                            self._queue.popleft()
+                            metrics.increment("ws_outbound.coalesced")
+                            continue
+
+                        wait = self._last_progress_at + self.throttle - time.monotonic()
+                        if wait > 0:
+                            await asyncio.sleep(wait)
+                            continue
+
+                        self._last_progress_at = time.monotonic()
+
+                    self._queue.popleft()
+                    await self.websocket.send_text(json.dumps(message, separators=(",", ":")))
+
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True
+
+    async def close(self, drain_timeout: float = 1.0) -> None:
+        """Stop the writer, giving queued messages a moment to flush."""
+        if self._queue and not self.closed:
+            deadline = time.monotonic() + drain_timeout
+            while self._queue and not self.closed and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        self.closed = True
+        self._writer_task.cancel()
+
+
+class ConnectionManager:
+    """
+    Manage WebSocket connections across workers.
+
+    Sockets are held locally per worker; a session may have several sockets
+    (e.g. multiple tabs). When fan-out is enabled, each worker registers the
+    sessions it holds in Redis and listens on its own channel, so
+    ``send_message`` from any worker reaches every socket of the session.
+    Cross-worker messages are buffered briefly and published in batches.
+
+    Registrations expire after ``REGISTRY_TTL`` unless refreshed; a
+    heartbeat task re-registers the worker's sessions well before that, so
+    long-lived sockets stay routable. If the subscription fails, the
+    listener resubscribes with exponential backoff.
+    """
+
+    CHANNEL_PREFIX = "ws:worker:"
+    REGISTRY_PREFIX = "ws:session:"
+    REGISTRY_TTL = settings.PDPA_SESSION_TTL_MINUTES * 60
+    LISTEN_RETRY_DELAY = 0.5
+    LISTEN_MAX_RETRY_DELAY = 30.0
+
+    def __init__(
+        self,
+        fanout_enabled: bool = settings.WS_FANOUT_ENABLED,
+        batch_interval_ms: int = settings.WS_FANOUT_BATCH_MS,
+        max_batch_size: int = settings.WS_FANOUT_MAX_BATCH,
+        route_cache_ms: int = settings.WS_FANOUT_ROUTE_CACHE_MS,
+    ):
+        """
+        Initialize connection manager.
+
+        Args:
+            fanout_enabled: Route messages between workers through Redis
+            batch_interval_ms: How long to buffer cross-worker messages
+            max_batch_size: Flush a worker's buffer early once it holds this many
+            route_cache_ms: How long a session's worker list is cached
+        """
+        self.worker_id = uuid4().hex
+        self.fanout_enabled = fanout_enabled
+        self.batch_interval = batch_interval_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.route_cache = route_cache_ms / 1000
+        self.active_connections: dict[str, dict[WebSocket, OutboundChannel]] = {}
+
+        self._pending: dict[str, list[dict]] = {}
+        self._routes: dict[str, tuple[float, set[str]]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._listener_task: asyncio.Task | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._pubsub = None
+
+    @property
+    def channel(self) -> str:
+        """Pub/sub channel this worker listens on."""
+        return f"{self.CHANNEL_PREFIX}{self.worker_id}"
+
+    def _redis(self):
+        from app.memory.short_term import RedisManager
+
+        return RedisManager.get_client()
+
+    async def start(self) -> None:
+        """Subscribe to this worker's channel when fan-out is enabled."""
+        if not self.fanout_enabled or self._listener_task is not None:
+            return
+
+        # Fresh ID per process: the manager may have been created in a
+        # preloading parent and inherited by several forked workers.
+        self.worker_id = uuid4().hex
+        self._pubsub = self._redis().pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._listener_task = asyncio.create_task(self._listen())
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        """Flush pending publishes and stop listening."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        await self._flush()
+
+        for task in (self._listener_task, self._heartbeat_task):
+            if task is not None:
+                task.cancel()
+        self._listener_task = self._heartbeat_task = None
+
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def connect(self, session_id: str, websocket: WebSocket):
+        """Accept a WebSocket connection."""
+        await websocket.accept()
+        self.active_connections.setdefault(session_id, {})[websocket] = OutboundChannel(websocket)
+
+        if self.fanout_enabled:
+            await self._register([session_id])
+
+    async def _register(self, session_ids: list[str]) -> None:
+        """Record this worker as a holder of sessions and reset their expiry."""
+        async with self._redis().pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                key = f"{self.REGISTRY_PREFIX}{session_id}"
+                pipe.sadd(key, self.worker_id)
+                pipe.expire(key, self.REGISTRY_TTL)
+            await pipe.execute()
+
+    async def _heartbeat(self) -> None:
+        """Refresh registrations of held sessions before they expire."""
+        while True:
+            await asyncio.sleep(self.REGISTRY_TTL / 3)
+            if self.active_connections:
+                try:
+                    await self._register(list(self.active_connections))
+                except Exception:
+                    metrics.increment("ws_fanout.heartbeat_failures")
+
+    async def disconnect(self, session_id: str, websocket: WebSocket | None = None):
+        """Remove a WebSocket connection (or all of a session's connections)."""
+        sockets = self.active_connections.get(session_id)
+        if sockets is None:
+            return
+
+        targets = list(sockets) if websocket is None else [websocket]
+        for target in targets:
+            channel = sockets.pop(target, None)
+            if channel is not None:
+                await channel.close()
+
+        if not sockets:
+            del self.active_connections[session_id]
+            if self.fanout_enabled:
+                await self._redis().srem(f"{self.REGISTRY_PREFIX}{session_id}", self.worker_id)
+
+    async def send_message(
+        self,
+        session_id: str,
+        message: dict,
+    ):
+        """Send a message to every socket of a session, on any worker."""
+        await self._deliver_local(session_id, message)
+
+        if not self.fanout_enabled:
+            return
+
+        for worker_id in await self._session_workers(session_id):
+            if worker_id != self.worker_id:
+                self._enqueue(worker_id, {"session_id": session_id, "message": message})
+
+    async def _session_workers(self, session_id: str) -> set[str]:
+        """Workers holding a session's sockets, cached for ``route_cache``."""
+        now = time.monotonic()
+        cached = self._routes.get(session_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        workers = await self._redis().smembers(f"{self.REGISTRY_PREFIX}{session_id}")
+        if self.route_cache > 0:
+            if len(self._routes) > 10_000:
+                self._routes = {k: v for k, v in self._routes.items() if v[0] > now}
+            self._routes[session_id] = (now + self.route_cache, workers)
+        return workers
+
+    async def send_personal(self, session_id: str, websocket: WebSocket, message: dict):
+        """Send a message to one socket, ordered after its queued events."""
+        channel = self.active_connections.get(session_id, {}).get(websocket)
+        if channel is None:
+            await websocket.send_json(message)
+        else:
+            channel.send(message)
+
+    async def _deliver_local(self, session_id: str, message: dict) -> None:
+        """Queue to sockets held by this worker, dropping ones that failed."""
+        for websocket, channel in list(self.active_connections.get(session_id, {}).items()):
+            if channel.closed:
+                await self.disconnect(session_id, websocket)
+            else:
+                channel.send(message)
+
+    def _enqueue(self, worker_id: str, envelope: dict) -> None:
+        """Buffer a message for another worker and schedule a flush."""
+        batch = self._pending.setdefault(worker_id, [])
+        batch.append(envelope)
+
+        if len(batch) >= self.max_batch_size:
+            self._track(asyncio.create_task(self._flush()))
+        elif self._flush_task is None:
+            self._flush_task = self._track(asyncio.create_task(self._flush_later()))
+
+    def _track(self, task: asyncio.Task) -> asyncio.Task:
+        """Keep a flush task referenced until it finishes."""
+        self._in_flight.add(task)
+        task.add_done_callback(self._flush_done)
+        return task
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        """Forget a finished flush task and count publish failures."""
+        self._in_flight.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            metrics.increment("ws_fanout.publish_failures")
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_interval)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        """Publish buffered messages in batches of at most ``max_batch_size`` per worker."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        async with self._redis().pipeline(transaction=False) as pipe:
+            for worker_id, messages in pending.items():
+                for start in range(0, len(messages), self.max_batch_size):
+                    batch = messages[start : start + self.max_batch_size]
+                    pipe.publish(f"{self.CHANNEL_PREFIX}{worker_id}", json.dumps(batch))
+                    metrics.record("ws_fanout.batch_size", len(batch))
+            await pipe.execute()
+
+    async def _listen(self) -> None:
+        """Deliver batches published to this worker by its peers, resubscribing on failure."""
+        delay = self.LISTEN_RETRY_DELAY
+        while True:
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self._redis().pubsub()
+                    await self._pubsub.subscribe(self.channel)
+
+                async for item in self._pubsub.listen():
+                    delay = self.LISTEN_RETRY_DELAY
+                    if item.get("type") == "message":
+                        await self._deliver_batch(item["data"])
+                raise ConnectionError("subscription ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Fan-out listener failed; resubscribing in %.1fs", delay)
+                metrics.increment("ws_fanout.listener_restarts")
+
+            pubsub, self._pubsub = self._pubsub, None
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.LISTEN_MAX_RETRY_DELAY)
+
+    async def _deliver_batch(self, data: str) -> None:
+        """Deliver one published batch, skipping envelopes that cannot be delivered."""
+        try:
+            envelopes = json.loads(data)
+            if not isinstance(envelopes, list):
+                raise ValueError("batch is not a list")
+        except (TypeError, ValueError):
+            logger.warning("Dropping malformed fan-out batch: %.200r", data)
+            metrics.increment("ws_fanout.dropped_messages")
+            return
+
+        for envelope in envelopes:
+            try:
+                await self._deliver_local(envelope["session_id"], envelope["message"])
+            except Exception:
+                logger.exception("Dropping undeliverable fan-out message: %.200r", envelope)
+                metrics.increment("ws_fanout.dropped_messages")
+
+
+manager = ConnectionManager()
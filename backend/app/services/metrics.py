@@ -0,0 +1,122 @@
+"""Lightweight in-process metrics registry."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class Histogram:
+    """Running statistics and bucket counts for an observed value."""
+
+    SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+
+    def __init__(self, name: str, buckets: tuple[float, ...] = SIZE_BUCKETS):
+        """Initialize an empty histogram."""
+        self.name = name
+        self.bounds = buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def _bucket_dict(self) -> dict:
+        buckets = {f"le_{bound}": n for bound, n in zip(self.bounds, self.buckets)}
+        buckets["le_inf"] = self.buckets[-1]
+        return buckets
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "buckets": self._bucket_dict(),
+        }
+
+
+class TimingMetric(Histogram):
+    """Running statistics for a latency-style measurement in milliseconds."""
+
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, name: str):
+        """Initialize an empty timing metric."""
+        super().__init__(name, self.BUCKETS_MS)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": self._bucket_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Registry of named counters, timing metrics and value histograms."""
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self.counters: dict[str, int] = {}
+        self.timings: dict[str, TimingMetric] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """Record a timing observation in milliseconds."""
+        if name not in self.timings:
+            self.timings[name] = TimingMetric(name)
+        self.timings[name].observe(value_ms)
+
+    def record(
+        self,
+        name: str,
+        value: float,
+        buckets: tuple[float, ...] = Histogram.SIZE_BUCKETS,
+    ) -> None:
+        """Record a non-latency observation (e.g. a batch size) in a histogram."""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, buckets)
+        self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and record it under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serializable view of all metrics."""
+        return {
+            "counters": dict(self.counters),
+            "timings": {name: metric.to_dict() for name, metric in self.timings.items()},
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        self.counters.clear()
+        self.timings.clear()
+        self.histograms.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,121 @@
+"""Per-session locking so turns within one session are processed in order."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.config import settings
+from app.services.metrics import metrics
+
+
+class SessionLockTimeoutError(Exception):
+    """Raised when a session lock cannot be acquired in time."""
+
+
+class SessionLockManager:
+    """
+    Keyed async lock serializing work per session.
+
+    A process-local ``asyncio.Lock`` per session orders turns inside one worker,
+    and an optional Redis lock extends the guarantee across workers. Different
+    sessions never contend with each other.
+    """
+
+    LOCK_PREFIX = "session_lock:"
+
+    def __init__(
+        self,
+        distributed: bool = settings.SESSION_LOCK_DISTRIBUTED,
+        lock_timeout: float = settings.SESSION_LOCK_TIMEOUT_SECONDS,
+        wait_timeout: float = settings.SESSION_LOCK_WAIT_SECONDS,
+    ):
+        """
+        Initialize session lock manager.
+
+        Args:
+            distributed: Also take a Redis lock so other workers are excluded
+            lock_timeout: Expiry of the Redis lock in seconds
+            wait_timeout: Maximum time to wait for the lock in seconds
+        """
+        self.distributed = distributed
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._holders: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def acquire(self, session_id: str) -> AsyncIterator[None]:
+        """Hold the lock for ``session_id`` for the duration of the block."""
+        start = time.perf_counter()
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._holders[session_id] = self._holders.get(session_id, 0) + 1
+
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout=self.wait_timeout)
+            except TimeoutError:
+                self._record_timeout(start)
+                raise SessionLockTimeoutError(
+                    f"Timed out waiting for session lock: {session_id}"
+                ) from None
+
+            try:
+                redis_lock = await self._acquire_distributed(session_id, start)
+                metrics.observe("session_lock.wait_ms", (time.perf_counter() - start) * 1000)
+
+                try:
+                    yield
+                finally:
+                    if redis_lock is not None:
+                        await self._release_distributed(redis_lock)
+            finally:
+                lock.release()
+        finally:
+            self._holders[session_id] -= 1
+            if self._holders[session_id] == 0:
+                del self._holders[session_id]
+                del self._locks[session_id]
+
+    async def _acquire_distributed(self, session_id: str, start: float):
+        """Acquire the cross-worker Redis lock if enabled."""
+        if not self.distributed:
+            return None
+
+        from app.memory.short_term import RedisManager
+
+        remaining = max(self.wait_timeout - (time.perf_counter() - start), 0.0)
+        redis_lock = RedisManager.get_client().lock(
+            f"{self.LOCK_PREFIX}{session_id}",
+            timeout=self.lock_timeout,
+            blocking_timeout=remaining,
+        )
+
+        if not await redis_lock.acquire():
+            self._record_timeout(start)
+            raise SessionLockTimeoutError(
+                f"Timed out waiting for distributed session lock: {session_id}"
+            )
+
+        return redis_lock
+
+    def _record_timeout(self, start: float) -> None:
+        """Count a timed-out wait and include its duration in the wait metric."""
+        metrics.observe("session_lock.wait_ms", (time.perf_counter() - start) * 1000)
+        metrics.increment("session_lock.timeouts")
+
+    async def _release_distributed(self, redis_lock) -> None:
+        """Release the Redis lock, ignoring locks that already expired."""
+        from redis.exceptions import LockError
+
+        try:
+            await redis_lock.release()
+        except LockError:
+            metrics.increment("session_lock.expired")
+
+    def is_locked(self, session_id: str) -> bool:
+        """Check whether a session currently has a holder or waiter locally."""
+        return session_id in self._locks
+
+
+session_locks = SessionLockManager()
@@ -0,0 +1,116 @@
+"""SimHash signatures for near-duplicate text detection."""
+
+import hashlib
+import re
+from collections.abc import Callable, Hashable
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+SIGNATURE_BITS = 64
+SHINGLE_SIZE = 3
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of a text over word 3-shingles.
+
+    Case, punctuation and whitespace are ignored, so the same paragraph
+    extracted from PDF, DOCX or HTML gets the same or a nearly equal
+    signature.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    shingles = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles
+    )
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+
+def format_signature(signature: int) -> str:
+    """Hex form stored in payloads (Qdrant integers are signed 64-bit)."""
+    return f"{signature:016x}"
+
+
+def parse_signature(value: str) -> int:
+    """Inverse of format_signature."""
+    return int(value, 16)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two signatures."""
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Find signatures within a Hamming distance using band lookups.
+
+    Signatures are split into ``max_distance + 1`` bands; two signatures
+    differing in at most ``max_distance`` bits share at least one band
+    exactly, so only signatures sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int):
+        """
+        Initialize index.
+
+        Args:
+            max_distance: Largest Hamming distance that counts as a near duplicate
+        """
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-SIGNATURE_BITS // self.bands)
+        self._buckets: dict[tuple[int, int], list[tuple[int, Hashable]]] = {}
+
+    def _keys(self, signature: int) -> list[tuple[int, int]]:
+        """Bucket key of each band of a signature."""
+        mask = (1 << self.band_bits) - 1
+        return [(band, (signature >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def add(self, signature: int, owner: Hashable) -> None:
+        """Add a signature belonging to ``owner`` (e.g. a source document)."""
+        for key in self._keys(signature):
+            self._buckets.setdefault(key, []).append((signature, owner))
+
+    def find(
+        self,
+        signature: int,
+        ignore: Callable[[Hashable], bool] | None = None,
+    ) -> Hashable | None:
+        """Owner of a near-duplicate signature, skipping owners ``ignore`` rejects."""
+        for key in self._keys(signature):
+            for candidate, owner in self._buckets.get(key, ()):
+                if ignore is not None and ignore(owner):
+                    continue
+                if hamming_distance(signature, candidate) <= self.max_distance:
+                    return owner
+        return None
+
+
+def collapse_near_duplicates(documents: list[dict], max_distance: int) -> list[dict]:
+    """
+    Drop documents whose ``simhash`` is near that of an earlier document.
+
+    Documents are kept in order, so with score-ordered input each group of
+    near duplicates is represented by its best-scoring member. Documents
+    without a signature are always kept.
+    """
+    index = SimHashIndex(max_distance)
+    kept = []
+    for i, doc in enumerate(documents):
+        value = doc.get("simhash")
+        if value is None:
+            kept.append(doc)
+            continue
+        signature = parse_signature(value)
+        if index.find(signature) is None:
+            index.add(signature, str(i))
+            kept.append(doc)
+    return kept
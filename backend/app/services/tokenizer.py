@@ -0,0 +1,101 @@
+"""Shared token counting with cached tiktoken encoders."""
+
+from functools import lru_cache
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str | None = None):
+    """
+    Get the tiktoken encoding for a model, cached per model name.
+
+    Falls back to ``cl100k_base`` for unknown models. Returns None when
+    tiktoken is not installed or its encoding files cannot be loaded, in
+    which case callers use the 4-characters-per-token estimate.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model.split("/")[-1])
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        return None
+
+
+def encoding_name(model: str | None = None) -> str:
+    """Name of the encoding count_tokens uses for a model, or ``estimate``."""
+    encoding = get_encoding(model)
+    return encoding.name if encoding is not None else "estimate"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (4 characters per token, rounded up)."""
+    return -(-len(text) // 4)
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Count tokens in a text."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode_ordinary(text))
+
+
+def count_tokens_batch(texts: list[str], model: str | None = None) -> list[int]:
+    """Count tokens for many texts, encoding them in parallel when possible."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return [estimate_tokens(text) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def split_by_tokens(
+    text: str,
+    max_tokens: int,
+    overlap: int = 0,
+    model: str | None = None,
+) -> list[str]:
+    """
+    Split text into windows of at most ``max_tokens`` tokens.
+
+    Consecutive windows share ``overlap`` tokens. The window always advances
+    by at least one token, so the split terminates for any overlap.
+    """
+    if not text:
+        return []
+
+    encoding = get_encoding(model)
+    if encoding is None:
+        # Same 4-characters-per-token approximation as estimate_tokens.
+        return [
+            text[start:end]
+            for start, end in _windows(len(text), max_tokens * 4, overlap * 4)
+        ]
+
+    tokens = encoding.encode_ordinary(text)
+    return [
+        encoding.decode(tokens[start:end])
+        for start, end in _windows(len(tokens), max_tokens, overlap)
+    ]
+
+
+def _windows(length: int, size: int, overlap: int) -> list[tuple[int, int]]:
+    """Start/end offsets of overlapping windows covering ``length`` items."""
+    size = max(1, size)
+    step = max(1, size - overlap)
+    windows = []
+    start = 0
+    while True:
+        end = min(start + size, length)
+        windows.append((start, end))
+        if end >= length:
+            return windows
+        start += step
@@ -0,0 +1,19 @@
+"""Gunicorn worker class carrying the app's uvicorn settings."""
+
+from uvicorn_worker import UvicornWorker
+
+from app.config import settings
+
+
+class AppUvicornWorker(UvicornWorker):
+    """
+    UvicornWorker with the server options ``python -m app.main`` also sets.
+
+    Gunicorn builds the uvicorn config from ``CONFIG_KWARGS``, so options
+    passed to ``uvicorn.run`` in the entrypoint must be repeated here.
+    """
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "ws_per_message_deflate": settings.WS_PER_MESSAGE_DEFLATE,
+    }
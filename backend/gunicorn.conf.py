@@ -0,0 +1,53 @@
+"""Gunicorn configuration for multi-worker deployments.
+
+Launch with:
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+With ``preload_app`` the application is imported and the reranker weights
+are loaded once in the master process, then shared copy-on-write with every
+forked worker, so per-worker RSS stays roughly flat as workers are added.
+Each worker still creates its own network clients and warms up in the
+FastAPI lifespan.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+worker_class = "app.worker.AppUvicornWorker"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Split cores between workers so torch intra-op pools do not oversubscribe.
+torch_threads = int(os.environ.get("TORCH_NUM_THREADS") or 0) or max(
+    1, multiprocessing.cpu_count() // workers
+)
+os.environ.setdefault("TORCH_NUM_THREADS", str(torch_threads))
+os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+os.environ.setdefault("MKL_NUM_THREADS", str(torch_threads))
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def when_ready(server):
+    """Load model weights in the master before any worker is forked."""
+    if not preload_app:
+        return
+
+    from app.rag.pipeline import preload_models
+
+    preload_models()
+    # Keep the collector from touching (and un-sharing) preloaded objects.
+    gc.freeze()
+    server.log.info("Preloaded models in master (pid %s)", os.getpid())
+
+
+def post_fork(server, worker):
+    """Pin torch intra-op threads for each worker."""
+    from app.rag.reranker import configure_torch_threads
+
+    configure_torch_threads(torch_threads)
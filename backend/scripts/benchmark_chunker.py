@@ -0,0 +1,204 @@
+"""Chunker benchmark over a sample corpus.
+
+Parses every supported document under a directory once, then times each
+chunking strategy over the parsed texts and reports throughput and the
+token-size distribution of the chunks it produced.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings
+from app.ingestion.chunkers.chunker import RecursiveChunker, SemanticChunker
+from app.ingestion.parsers.markitdown_parser import DocumentParser
+from app.services.tokenizer import count_tokens_batch
+
+DEFAULT_CORPUS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "docs"))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunking throughput and chunk-size distribution",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Both strategies over the repository docs
+  python scripts/benchmark_chunker.py
+
+  # Semantic chunking with percentile breakpoints
+  python scripts/benchmark_chunker.py --strategies semantic --breakpoint-percentile 90
+
+  # Custom corpus and chunk size, JSON output
+  python scripts/benchmark_chunker.py --input-dir ./documents --chunk-size 256 --json
+        """,
+    )
+    parser.add_argument(
+        "--input-dir",
+        type=str,
+        default=DEFAULT_CORPUS,
+        help="Directory of sample documents (default: repository docs/)",
+    )
+    parser.add_argument(
+        "--strategies",
+        type=str,
+        default="semantic,recursive",
+        help="Comma-separated strategies to run (default: semantic,recursive)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.CHUNK_SIZE,
+        help=f"Maximum chunk size in tokens (default: {settings.CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=settings.CHUNK_OVERLAP,
+        help=f"Chunk overlap in tokens (default: {settings.CHUNK_OVERLAP})",
+    )
+    parser.add_argument(
+        "--similarity-threshold",
+        type=float,
+        default=settings.CHUNK_SIMILARITY_THRESHOLD,
+        help="Semantic split threshold (default: CHUNK_SIMILARITY_THRESHOLD)",
+    )
+    parser.add_argument(
+        "--breakpoint-percentile",
+        type=float,
+        default=settings.CHUNK_BREAKPOINT_PERCENTILE,
+        help="Semantic percentile breakpoints instead of the threshold",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="Timed passes over the corpus; the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON",
+    )
+    return parser.parse_args()
+
+
+def load_corpus(directory: str) -> list[str]:
+    """Parse all supported documents under a directory."""
+    texts = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if DocumentParser.is_supported(path):
+                text = DocumentParser.parse(path)
+                if text:
+                    texts.append(text)
+    return texts
+
+
+def build_chunker(strategy: str, args):
+    """Create a chunker from CLI options."""
+    if strategy == "semantic":
+        return SemanticChunker(
+            chunk_size=args.chunk_size,
+            similarity_threshold=args.similarity_threshold,
+            chunk_overlap=args.chunk_overlap,
+            breakpoint_percentile=args.breakpoint_percentile,
+            tokenizer_model=settings.EMBEDDING_MODEL,
+        )
+    return RecursiveChunker(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        tokenizer_model=settings.EMBEDDING_MODEL,
+    )
+
+
+def percentile(values: list[int], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_strategy(strategy: str, texts: list[str], args) -> dict:
+    """Time one strategy over the corpus."""
+    chunker = build_chunker(strategy, args)
+    chunker.chunk(texts[0])  # warm up model and tokenizer
+
+    best_s = None
+    chunks: list[str] = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        chunks = [chunk for text in texts for chunk in chunker.chunk(text)]
+        elapsed = time.perf_counter() - start
+        best_s = elapsed if best_s is None else min(best_s, elapsed)
+
+    sizes = count_tokens_batch(chunks, settings.EMBEDDING_MODEL) or [0]
+    return {
+        "strategy": strategy,
+        "documents": len(texts),
+        "chunks": len(chunks),
+        "seconds": round(best_s, 3),
+        "chunks_per_s": round(len(chunks) / best_s, 1) if best_s else 0.0,
+        "docs_per_s": round(len(texts) / best_s, 1) if best_s else 0.0,
+        "tokens": {
+            "min": min(sizes),
+            "p50": percentile(sizes, 50),
+            "p95": percentile(sizes, 95),
+            "max": max(sizes),
+            "mean": round(statistics.fmean(sizes), 1),
+            "over_limit": sum(1 for size in sizes if size > args.chunk_size),
+        },
+    }
+
+
+def print_results(results: list[dict], args):
+    """Print a comparison table."""
+    print("=" * 80)
+    print("CHUNKER BENCHMARK")
+    print("=" * 80)
+    print(f"Corpus: {args.input_dir}")
+    print(f"Chunk size: {args.chunk_size} tokens, overlap: {args.chunk_overlap}")
+    header = (
+        f"{'strategy':<11}{'docs':>6}{'chunks':>8}{'chunks/s':>10}"
+        f"{'min':>6}{'p50':>6}{'p95':>6}{'max':>6}{'over':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        t = r["tokens"]
+        print(
+            f"{r['strategy']:<11}{r['documents']:>6}{r['chunks']:>8}{r['chunks_per_s']:>10.1f}"
+            f"{t['min']:>6}{t['p50']:>6}{t['p95']:>6}{t['max']:>6}{t['over_limit']:>6}"
+        )
+    print("-" * len(header))
+    print("Chunk sizes in tokens; 'over' counts chunks above the chunk size.")
+    print("=" * 80)
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    texts = load_corpus(args.input_dir)
+    if not texts:
+        print(f"No supported documents found in {args.input_dir}")
+        sys.exit(1)
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    results = [run_strategy(strategy, texts, args) for strategy in strategies]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Retrieval quality and cost across reduced embedding dimensions.
+
+Embeds the sample corpus and the labeled query set once at the largest
+requested size, then truncates and renormalizes the vectors to each
+smaller size (what text-embedding-3 returns for a smaller ``dimensions``).
+Every size gets its own scratch collection, and the report compares
+recall@k, MRR and NDCG, overlap with the full-size ranking, search
+latency and raw vector memory.
+
+Relevance is judged per document, as in ``benchmark_retrieval.py``.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import Distance, VectorParams
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmark_retrieval import (
+    DEFAULT_QUERIES,
+    load_queries,
+    parse_list,
+    percentile,
+    score_ranking,
+    write_results,
+)
+
+from app.config import settings
+from app.ingestion.chunkers.chunker import RecursiveChunker
+from app.ingestion.embedders.local_embedding import is_local_model
+from app.rag.qdrant_client import QdrantManager, search_params
+
+DEFAULT_CORPUS = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compare retrieval quality, latency and memory across embedding dimensions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default sizes against the configured Qdrant server
+  python scripts/benchmark_dimensions.py
+
+  # Custom sizes with text-embedding-3-large, CSV output
+  EMBEDDING_MODEL=text-embedding-3-large python scripts/benchmark_dimensions.py --dimensions 256,1024,3072 --output dims.csv
+
+  # Offline smoke test in an in-memory Qdrant
+  python scripts/benchmark_dimensions.py --mock-embeddings --in-memory
+        """,
+    )
+    parser.add_argument(
+        "--queries",
+        type=str,
+        default=DEFAULT_QUERIES,
+        help="Labeled query set, JSON lines (default: data/eval/retrieval_queries.jsonl)",
+    )
+    parser.add_argument(
+        "--corpus",
+        type=str,
+        default=DEFAULT_CORPUS,
+        help="Directory of markdown/text documents to embed (default: data)",
+    )
+    parser.add_argument(
+        "--dimensions",
+        type=str,
+        default="256,512,1024,1536",
+        help="Comma-separated vector sizes; the largest is the reference (default: 256,512,1024,1536)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=10,
+        help="Ranking depth for quality metrics (default: 10)",
+    )
+    parser.add_argument(
+        "--no-embed-timing",
+        action="store_true",
+        help="Skip timing query embedding at each size (saves API calls)",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Search an in-memory Qdrant instead of QDRANT_URL",
+    )
+    parser.add_argument(
+        "--mock-embeddings",
+        action="store_true",
+        help="Use mock embeddings (pipeline smoke test; quality numbers are meaningless)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write results to a .json or .csv file",
+    )
+    return parser.parse_args()
+
+
+def load_corpus(directory: str) -> tuple[list[str], list[str]]:
+    """Chunk every markdown/text file, returning chunk texts and their file names."""
+    chunker = RecursiveChunker(
+        chunk_size=settings.CHUNK_SIZE,
+        chunk_overlap=settings.CHUNK_OVERLAP,
+        tokenizer_model=settings.EMBEDDING_MODEL,
+    )
+    texts, files = [], []
+    for path in sorted(Path(directory).rglob("*")):
+        if path.suffix not in (".md", ".txt"):
+            continue
+        for chunk in chunker.chunk(path.read_text(encoding="utf-8")):
+            texts.append(chunk)
+            files.append(path.name)
+    return texts, files
+
+
+def create_embedder(dimension: int, use_mock: bool, input_type: str = "document"):
+    """Embedding generator producing ``dimension``-size vectors for queries or documents."""
+    if use_mock:
+        from app.ingestion.embedders.mock_embedding import MockEmbeddingGenerator
+
+        return MockEmbeddingGenerator(dimension=dimension, mode="semantic")
+    if is_local_model(settings.EMBEDDING_MODEL):
+        from app.ingestion.embedders.local_embedding import LocalEmbeddingGenerator
+
+        return LocalEmbeddingGenerator(input_type=input_type)
+
+    from app.ingestion.embedders.embedding import EmbeddingGenerator
+
+    return EmbeddingGenerator(dimension=dimension)
+
+
+async def embed(embedder, texts: list[str], batch_size: int = 100) -> np.ndarray:
+    """Embed texts in batches into a float32 matrix."""
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(await embedder.generate(texts[i : i + batch_size]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def truncate(vectors: np.ndarray, dimension: int) -> np.ndarray:
+    """Keep the first ``dimension`` components and renormalize to unit length."""
+    prefix = vectors[:, :dimension]
+    norms = np.linalg.norm(prefix, axis=1, keepdims=True)
+    return prefix / np.where(norms == 0, 1, norms)
+
+
+async def time_query_embedding(queries: list[dict], dimension: int, use_mock: bool) -> list[float]:
+    """Per-query embedding latency in milliseconds when requesting ``dimension``."""
+    embedder = create_embedder(dimension, use_mock, input_type="query")
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        await embedder.generate_single(query["query"])
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def build_collection(client, name: str, vectors: np.ndarray, files: list[str]):
+    """(Re)create a scratch collection holding the corpus at one size."""
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        name, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    client.upload_points(
+        name,
+        points=[
+            models.PointStruct(id=i, vector=vector.tolist(), payload={"file_name": file_name})
+            for i, (vector, file_name) in enumerate(zip(vectors, files))
+        ],
+        wait=True,
+    )
+
+
+def run_searches(client, name: str, query_vectors: np.ndarray, top_k: int):
+    """Search every query, returning ranked point ids, file names and latencies."""
+    ids, files, timings = [], [], []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=name,
+            query=vector.tolist(),
+            search_params=search_params(),
+            limit=top_k,
+            with_payload=True,
+        ).points
+        timings.append((time.perf_counter() - start) * 1000)
+        ids.append([p.id for p in points])
+        files.append([p.payload["file_name"] for p in points])
+    return ids, files, timings
+
+
+async def run_benchmark(args, queries: list[dict]) -> list[dict]:
+    """Evaluate every dimension against the largest one."""
+    dimensions = sorted({int(d) for d in parse_list(args.dimensions)}, reverse=True)
+    reference = dimensions[0]
+
+    texts, files = load_corpus(args.corpus)
+    if not texts:
+        print(f"No documents found in {args.corpus}")
+        sys.exit(1)
+    print(f"Embedding {len(texts)} chunks and {len(queries)} queries at {reference} dimensions...")
+
+    embedder = create_embedder(reference, args.mock_embeddings)
+    query_embedder = create_embedder(reference, args.mock_embeddings, input_type="query")
+    chunk_vectors = await embed(embedder, texts)
+    query_vectors = await embed(query_embedder, [q["query"] for q in queries])
+    if chunk_vectors.shape[1] < reference:
+        print(f"The embedding model produces only {chunk_vectors.shape[1]} dimensions")
+        sys.exit(1)
+
+    client = QdrantClient(":memory:") if args.in_memory else QdrantManager.get_client()
+    rows, reference_ids = [], None
+    for dimension in dimensions:
+        name = f"dimension_bench_{dimension}"
+        build_collection(client, name, truncate(chunk_vectors, dimension), files)
+        try:
+            ids, rankings, search_ms = run_searches(
+                client, name, truncate(query_vectors, dimension), args.top_k
+            )
+        finally:
+            client.delete_collection(name)
+
+        if reference_ids is None:
+            reference_ids = ids
+        overlap = [
+            len(set(a) & set(b)) / len(b) if b else 1.0 for a, b in zip(ids, reference_ids)
+        ]
+        scores = [
+            score_ranking(ranking, set(query["relevant"]), args.top_k)
+            for query, ranking in zip(queries, rankings)
+        ]
+        embed_ms = []
+        if not args.no_embed_timing:
+            embed_ms = await time_query_embedding(queries, dimension, args.mock_embeddings)
+        rows.append(
+            {
+                "dimension": dimension,
+                "recall": round(sum(s["recall"] for s in scores) / len(scores), 4),
+                "mrr": round(sum(s["rr"] for s in scores) / len(scores), 4),
+                "ndcg": round(sum(s["ndcg"] for s in scores) / len(scores), 4),
+                "overlap": round(sum(overlap) / len(overlap), 4),
+                "embed_p50_ms": round(percentile(embed_ms, 50), 2) if embed_ms else 0.0,
+                "embed_p95_ms": round(percentile(embed_ms, 95), 2) if embed_ms else 0.0,
+                "search_p50_ms": round(percentile(search_ms, 50), 2),
+                "search_p95_ms": round(percentile(search_ms, 95), 2),
+                "vector_mb": round(len(texts) * dimension * 4 / 2**20, 3),
+                "mb_per_million": round(1_000_000 * dimension * 4 / 2**20),
+            }
+        )
+    return rows
+
+
+def print_results(rows: list[dict], args, query_count: int):
+    """Print a comparison table."""
+    print("=" * 80)
+    print("EMBEDDING DIMENSION BENCHMARK")
+    print("=" * 80)
+    model = "mock" if args.mock_embeddings else settings.EMBEDDING_MODEL
+    print(f"Model: {model}, queries: {query_count}, k: {args.top_k}")
+    header = (
+        f"{'dim':>6}{'recall':>8}{'mrr':>7}{'ndcg':>7}{'overlap':>9}"
+        f"{'embed p50/p95':>15}{'search p50/p95':>16}{'MB/1M vec':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['dimension']:>6}{r['recall']:>8.3f}{r['mrr']:>7.3f}{r['ndcg']:>7.3f}"
+            f"{r['overlap']:>9.3f}"
+            f"{r['embed_p50_ms']:>8.1f}/{r['embed_p95_ms']:<6.1f}"
+            f"{r['search_p50_ms']:>8.2f}/{r['search_p95_ms']:<7.2f}"
+            f"{r['mb_per_million']:>11}"
+        )
+    print("-" * len(header))
+    print("Overlap: share of the full-size top-k also returned at this size.")
+    print("MB/1M vec: raw float32 vector storage per million chunks, before index overhead.")
+    print("=" * 80)
+
+
+async def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    queries = load_queries(args.queries)
+    if not queries:
+        print(f"No queries in {args.queries}")
+        sys.exit(1)
+
+    rows = await run_benchmark(args, queries)
+
+    print_results(rows, args, len(queries))
+    if args.output:
+        write_results(rows, args.output)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,388 @@
+"""Retrieval quality-vs-latency benchmark over a labeled query set.
+
+Embeds each labeled query once, then sweeps retrieval top-k, HNSW ``ef``
+and rerank top-n against a Qdrant collection. For every combination it
+reports recall@k, MRR and NDCG of the final ranking next to p50/p95
+latency of the embed, search and rerank stages.
+
+Relevance is judged per document: a retrieved chunk is relevant when its
+``file_name`` payload is one of the query's ``relevant`` files.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings
+from app.rag.qdrant_client import QdrantManager, build_filter, search_params
+
+DEFAULT_QUERIES = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "eval", "retrieval_queries.jsonl")
+)
+
+# support_QnA.md section -> sample corpus files (backend/data) that answer it.
+SECTION_FILES = {
+    "Account & Security": ["privacy_policy.md", "terms_of_service.md"],
+    "Business Hours": ["02_business_hours.md"],
+    "Services": ["03_services_overview.md"],
+    "Pricing & Payments": ["01_pricing.md"],
+    "Shipping & Delivery": ["05_shipping_delivery.md", "shipping_policy.md"],
+    "Returns & Refunds": ["04_returns_refunds.md", "return_policy.md"],
+    "Product Information": ["product_catalog.md"],
+    "Technical Support": ["03_services_overview.md", "product_catalog.md"],
+    "Contact Us": ["02_business_hours.md"],
+    "Escalation": ["03_services_overview.md"],
+}
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Sweep retrieval parameters and report quality and per-stage latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # (Re)generate the labeled query set from the support Q&A
+  python scripts/benchmark_retrieval.py --seed ../support_QnA.md
+
+  # Default sweep against the live knowledge base
+  python scripts/benchmark_retrieval.py
+
+  # Custom sweep including an exact-search baseline, CSV output
+  python scripts/benchmark_retrieval.py --top-k 20,50 --hnsw-ef 32,128,exact --rerank-top-n 3,5 --output results.csv
+
+  # Build a scratch collection from the sample documents first
+  python scripts/benchmark_retrieval.py --ingest data --collection retrieval_bench
+        """,
+    )
+    parser.add_argument(
+        "--queries",
+        type=str,
+        default=DEFAULT_QUERIES,
+        help="Labeled query set, JSON lines (default: data/eval/retrieval_queries.jsonl)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=str,
+        default=None,
+        help="Write the query set from a support Q&A markdown file and exit",
+    )
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=settings.KNOWLEDGE_BASE_COLLECTION,
+        help=f"Collection or alias to search (default: {settings.KNOWLEDGE_BASE_COLLECTION})",
+    )
+    parser.add_argument(
+        "--ingest",
+        type=str,
+        default=None,
+        help="Ingest this directory into the collection before benchmarking",
+    )
+    parser.add_argument(
+        "--chunk-strategy",
+        type=str,
+        choices=["semantic", "recursive"],
+        default="semantic",
+        help="Chunking strategy for --ingest (default: semantic)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=str,
+        default=f"10,20,{settings.RETRIEVAL_TOP_K}",
+        help=f"Comma-separated retrieval depths (default: 10,20,{settings.RETRIEVAL_TOP_K})",
+    )
+    parser.add_argument(
+        "--hnsw-ef",
+        type=str,
+        default=f"32,64,{settings.QDRANT_HNSW_EF},256",
+        help="Comma-separated HNSW ef values; 'exact' for brute force",
+    )
+    parser.add_argument(
+        "--rerank-top-n",
+        type=str,
+        default=f"3,{settings.RERANK_TOP_N},10",
+        help=f"Comma-separated rerank cut-offs (default: 3,{settings.RERANK_TOP_N},10)",
+    )
+    parser.add_argument(
+        "--no-rerank",
+        action="store_true",
+        help="Score the dense ranking directly, cut at each top-n",
+    )
+    parser.add_argument(
+        "--mock-embeddings",
+        action="store_true",
+        help="Use mock embeddings (pipeline smoke test; quality numbers are meaningless)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write results to a .json or .csv file",
+    )
+    return parser.parse_args()
+
+
+def seed_queries(qna_path: str, output_path: str) -> int:
+    """
+    Build the labeled query set from the support Q&A markdown.
+
+    Each ``Q:`` line becomes a query labeled with the corpus files mapped
+    to its section in SECTION_FILES.
+
+    Returns:
+        Number of queries written
+    """
+    with open(qna_path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+
+    section = None
+    records = []
+    for line in lines:
+        if line in SECTION_FILES:
+            section = line
+        elif line.startswith("Q:") and section:
+            records.append(
+                {
+                    "query": line[2:].strip(),
+                    "section": section,
+                    "relevant": SECTION_FILES[section],
+                }
+            )
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return len(records)
+
+
+def load_queries(path: str) -> list[dict]:
+    """Load a JSON-lines query set."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parse_list(value: str) -> list[str]:
+    """Split a comma-separated option."""
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def relevance_ranks(ranked_files: list[str], relevant: set[str]) -> list[int]:
+    """1-based ranks at which a not-yet-seen relevant document appears."""
+    seen = set()
+    ranks = []
+    for rank, name in enumerate(ranked_files, start=1):
+        if name in relevant and name not in seen:
+            seen.add(name)
+            ranks.append(rank)
+    return ranks
+
+
+def score_ranking(ranked_files: list[str], relevant: set[str], k: int) -> dict:
+    """Recall@k, reciprocal rank and NDCG@k with binary, per-document gains."""
+    ranks = relevance_ranks(ranked_files[:k], relevant)
+    dcg = sum(1.0 / math.log2(rank + 1) for rank in ranks)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return {
+        "recall": len(ranks) / len(relevant) if relevant else 0.0,
+        "rr": 1.0 / ranks[0] if ranks else 0.0,
+        "ndcg": dcg / ideal if ideal else 0.0,
+    }
+
+
+async def ingest(directory: str, collection_name: str, chunk_strategy: str, use_mock: bool):
+    """Ingest a directory into the benchmark collection."""
+    from app.ingestion.pipeline import IngestionPipeline
+
+    client = QdrantManager.get_client()
+    if not client.collection_exists(collection_name):
+        await QdrantManager.create_collection(collection_name)
+
+    pipeline = IngestionPipeline(
+        chunk_strategy=chunk_strategy,
+        collection_name=collection_name,
+        use_mock_embeddings=use_mock,
+    )
+    try:
+        result = await pipeline.ingest_directory(directory, recursive=True)
+    finally:
+        await pipeline.close()
+    print(f"Ingested {result.successful} files ({result.total_chunks} chunks) into {collection_name}")
+    for error in result.errors:
+        print(f"  - {error}")
+
+
+async def embed_queries(queries: list[dict], use_mock: bool) -> tuple[list[list[float]], list[float]]:
+    """Embed every query once, timing each call in milliseconds."""
+    if use_mock:
+        from app.ingestion.embedders.mock_embedding import MockEmbeddingGenerator
+
+        embedder = MockEmbeddingGenerator()
+    else:
+        from app.ingestion.embedders.embedding import create_embedding_generator
+
+        # Uncached and unbatched on purpose: the benchmark measures the model.
+        embedder = create_embedding_generator(input_type="query")
+
+    vectors, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        vectors.append(await embedder.generate_single(query["query"]))
+        timings.append((time.perf_counter() - start) * 1000)
+    return vectors, timings
+
+
+def search(collection_name: str, vector: list[float], top_k: int, ef: str):
+    """Dense search with an explicit HNSW beam (or exact search)."""
+    exact = ef == "exact"
+    return QdrantManager.get_client().query_points(
+        collection_name=collection_name,
+        query=vector,
+        query_filter=build_filter(),
+        search_params=search_params(hnsw_ef=None if exact else int(ef), exact=exact),
+        limit=top_k,
+        with_payload=True,
+    ).points
+
+
+def run_sweep(args, queries: list[dict], vectors: list[list[float]], embed_ms: list[float]):
+    """Evaluate every (top_k, ef, top_n) combination."""
+    reranker = None
+    if not args.no_rerank:
+        from app.rag.reranker import BGEReranker
+
+        reranker = BGEReranker(model_name=settings.RERANKER_MODEL)
+        reranker.warm_up()
+
+    top_ks = [int(k) for k in parse_list(args.top_k)]
+    efs = parse_list(args.hnsw_ef)
+    top_ns = [int(n) for n in parse_list(args.rerank_top_n)]
+
+    rows = []
+    for top_k in top_ks:
+        for ef in efs:
+            search_ms, rerank_ms = [], []
+            rankings = []
+            for query, vector in zip(queries, vectors):
+                start = time.perf_counter()
+                points = search(args.collection, vector, top_k, ef)
+                search_ms.append((time.perf_counter() - start) * 1000)
+
+                documents = [
+                    {"text": p.payload.get("text", ""), "file_name": p.payload.get("file_name")}
+                    for p in points
+                ]
+                if reranker and documents:
+                    start = time.perf_counter()
+                    documents = reranker.rerank(query["query"], documents, top_k=len(documents))
+                    rerank_ms.append((time.perf_counter() - start) * 1000)
+                rankings.append([doc["file_name"] for doc in documents])
+
+            for top_n in top_ns:
+                if top_n > top_k:
+                    continue
+                scores = [
+                    score_ranking(ranking, set(query["relevant"]), top_n)
+                    for query, ranking in zip(queries, rankings)
+                ]
+                rows.append(
+                    {
+                        "top_k": top_k,
+                        "hnsw_ef": ef,
+                        "top_n": top_n,
+                        "recall": round(sum(s["recall"] for s in scores) / len(scores), 4),
+                        "mrr": round(sum(s["rr"] for s in scores) / len(scores), 4),
+                        "ndcg": round(sum(s["ndcg"] for s in scores) / len(scores), 4),
+                        "embed_p50_ms": round(percentile(embed_ms, 50), 2),
+                        "embed_p95_ms": round(percentile(embed_ms, 95), 2),
+                        "search_p50_ms": round(percentile(search_ms, 50), 2),
+                        "search_p95_ms": round(percentile(search_ms, 95), 2),
+                        "rerank_p50_ms": round(percentile(rerank_ms, 50), 2) if rerank_ms else 0.0,
+                        "rerank_p95_ms": round(percentile(rerank_ms, 95), 2) if rerank_ms else 0.0,
+                    }
+                )
+    return rows
+
+
+def write_results(rows: list[dict], path: str):
+    """Write results as JSON or CSV, by file extension."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, f, indent=2)
+
+
+def print_results(rows: list[dict], args, query_count: int):
+    """Print a comparison table."""
+    print("=" * 80)
+    print("RETRIEVAL BENCHMARK")
+    print("=" * 80)
+    print(f"Collection: {args.collection}, queries: {query_count}")
+    print(f"Reranker: {'off' if args.no_rerank else settings.RERANKER_MODEL}")
+    header = (
+        f"{'top_k':>6}{'ef':>7}{'top_n':>6}{'recall':>8}{'mrr':>7}{'ndcg':>7}"
+        f"{'search p50/p95':>16}{'rerank p50/p95':>17}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['top_k']:>6}{r['hnsw_ef']:>7}{r['top_n']:>6}"
+            f"{r['recall']:>8.3f}{r['mrr']:>7.3f}{r['ndcg']:>7.3f}"
+            f"{r['search_p50_ms']:>8.1f}/{r['search_p95_ms']:<7.1f}"
+            f"{r['rerank_p50_ms']:>8.1f}/{r['rerank_p95_ms']:<8.1f}"
+        )
+    print("-" * len(header))
+    if rows:
+        print(f"Embed p50/p95: {rows[0]['embed_p50_ms']:.1f}/{rows[0]['embed_p95_ms']:.1f} ms")
+    print("Metrics at top_n over per-document relevance; latencies in ms per query.")
+    print("=" * 80)
+
+
+async def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    if args.seed:
+        count = seed_queries(args.seed, args.queries)
+        print(f"Wrote {count} labeled queries to {args.queries}")
+        return
+
+    if args.ingest:
+        await ingest(args.ingest, args.collection, args.chunk_strategy, args.mock_embeddings)
+
+    queries = load_queries(args.queries)
+    if not queries:
+        print(f"No queries in {args.queries}")
+        sys.exit(1)
+
+    vectors, embed_ms = await embed_queries(queries, args.mock_embeddings)
+    rows = run_sweep(args, queries, vectors, embed_ms)
+
+    print_results(rows, args, len(queries))
+    if args.output:
+        write_results(rows, args.output)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,189 @@
+"""Import-time and startup benchmark for the backend.
+
+Runs ``python -X importtime`` on a module (``app.main`` by default) in a
+fresh interpreter, aggregates the per-module report, and optionally times
+the model warm-up step that the FastAPI lifespan performs.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure import time and model warm-up cost",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Import-time report for app.main
+  python scripts/benchmark_startup.py
+
+  # Also time the lifespan warm-up (loads the reranker)
+  python scripts/benchmark_startup.py --warm-up
+
+  # Report for another module, as JSON
+  python scripts/benchmark_startup.py --module app.rag.pipeline --json
+        """,
+    )
+    parser.add_argument(
+        "--module",
+        type=str,
+        default="app.main",
+        help="Module to import (default: app.main)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=25,
+        help="Number of slowest modules to list (default: 25)",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="Fresh-interpreter runs; the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--warm-up",
+        action="store_true",
+        help="Also time RAGPipeline.warm_up() after import",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON",
+    )
+    return parser.parse_args()
+
+
+def run_importtime(module: str, warm_up: bool) -> dict:
+    """Import ``module`` in a fresh interpreter and collect timings."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "import_s = time.perf_counter() - start\n"
+        "warm_s = None\n"
+    )
+    if warm_up:
+        code += (
+            "import asyncio\n"
+            "from app.rag.pipeline import get_rag_pipeline\n"
+            "start = time.perf_counter()\n"
+            "asyncio.run(get_rag_pipeline().warm_up())\n"
+            "warm_s = time.perf_counter() - start\n"
+        )
+    code += "print(f'{import_s} {warm_s}')\n"
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_s = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        errors = [
+            line for line in completed.stderr.splitlines() if not line.startswith("import time:")
+        ]
+        raise RuntimeError("\n".join(errors[-5:]))
+
+    import_s, warm_s = completed.stdout.strip().splitlines()[-1].split()
+    return {
+        "wall_s": wall_s,
+        "import_s": float(import_s),
+        "warm_up_s": None if warm_s == "None" else float(warm_s),
+        "modules": parse_importtime(completed.stderr),
+    }
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse ``-X importtime`` output into per-module records."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return modules
+
+
+def summarize(run: dict, top: int) -> dict:
+    """Build the report for one run."""
+    modules = run["modules"]
+    by_package: dict[str, float] = {}
+    for record in modules:
+        package = record["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + record["self_ms"]
+
+    return {
+        "wall_s": round(run["wall_s"], 3),
+        "import_s": round(run["import_s"], 3),
+        "warm_up_s": None if run["warm_up_s"] is None else round(run["warm_up_s"], 3),
+        "modules_imported": len(modules),
+        "heavy_modules_loaded": sorted(
+            {r["module"] for r in modules}
+            & {"torch", "sentence_transformers", "transformers", "langchain_openai", "qdrant_client"}
+        ),
+        "slowest_modules": sorted(modules, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+        "packages_self_ms": dict(
+            sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ),
+    }
+
+
+def print_report(module: str, report: dict):
+    """Print a human-readable report."""
+    print("=" * 80)
+    print(f"STARTUP BENCHMARK: import {module}")
+    print("=" * 80)
+    print(f"Interpreter wall time: {report['wall_s']:.3f}s")
+    print(f"Import time: {report['import_s']:.3f}s")
+    if report["warm_up_s"] is not None:
+        print(f"Warm-up time: {report['warm_up_s']:.3f}s")
+    print(f"Modules imported: {report['modules_imported']}")
+    print(f"Heavy modules loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}")
+
+    print("\nSlowest modules (cumulative ms):")
+    for record in report["slowest_modules"]:
+        print(f"  {record['cumulative_ms']:10.1f}  {record['module']}")
+
+    print("\nSelf time by top-level package (ms):")
+    for package, self_ms in report["packages_self_ms"].items():
+        print(f"  {self_ms:10.1f}  {package}")
+    print("=" * 80)
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    runs = [run_importtime(args.module, args.warm_up) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["import_s"])
+    report = summarize(best, args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(args.module, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Per-worker memory benchmark for gunicorn with and without model preloading.
+
+Starts gunicorn (``gunicorn.conf.py``) twice, once with ``GUNICORN_PRELOAD``
+off and once on. It waits for every worker to finish its lifespan warm-up,
+then reads ``/proc/<pid>/smaps_rollup`` for each worker. RSS counts shared
+pages in full for every process, so PSS and private memory show how much
+of the model weights are actually shared.
+
+Linux only (requires /proc).
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compare per-worker RSS/PSS with and without preloading",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 4 workers, both modes
+  python scripts/benchmark_worker_memory.py --workers 4
+
+  # Only the preloaded mode, JSON output
+  python scripts/benchmark_worker_memory.py --modes preload --json
+        """,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of gunicorn workers (default: 4)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to bind during the benchmark (default: 8765)",
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        default="no-preload,preload",
+        help="Comma-separated modes to run: no-preload, preload (default: both)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=5.0,
+        help="Seconds to wait after workers are healthy (default: 5)",
+    )
+    parser.add_argument(
+        "--startup-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds to wait for workers to come up (default: 300)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON",
+    )
+    return parser.parse_args()
+
+
+def read_smaps_rollup(pid: int) -> dict:
+    """Read RSS, PSS and private/shared totals (MiB) for a process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+
+    return {
+        "rss_mib": fields.get("Rss", 0) / 1024,
+        "pss_mib": fields.get("Pss", 0) / 1024,
+        "private_mib": (fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024,
+        "shared_mib": (fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024,
+    }
+
+
+def child_pids(pid: int) -> list[int]:
+    """List direct children of a process."""
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_healthy(port: int, master_pid: int, workers: int, timeout: float) -> None:
+    """Wait until all workers are forked and the health endpoint answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if len(child_pids(master_pid)) >= workers:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=2):
+                    return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("Workers did not become healthy in time")
+
+
+def run_mode(mode: str, args) -> dict:
+    """Launch gunicorn in one mode and measure its processes."""
+    env = dict(os.environ)
+    env["GUNICORN_PRELOAD"] = "true" if mode == "preload" else "false"
+    env["GUNICORN_WORKERS"] = str(args.workers)
+    env["GUNICORN_BIND"] = f"127.0.0.1:{args.port}"
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        start = time.monotonic()
+        wait_until_healthy(args.port, process.pid, args.workers, args.startup_timeout)
+        ready_s = time.monotonic() - start
+
+        # Health answers once one worker is up; give the rest time to warm up.
+        time.sleep(args.settle)
+
+        master = read_smaps_rollup(process.pid)
+        workers = [read_smaps_rollup(pid) for pid in child_pids(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "mode": mode,
+        "workers": len(workers),
+        "ready_s": round(ready_s, 2),
+        "master": {k: round(v, 1) for k, v in master.items()},
+        "per_worker_avg": {
+            key: round(sum(w[key] for w in workers) / len(workers), 1) for key in master
+        },
+        "total_pss_mib": round(master["pss_mib"] + sum(w["pss_mib"] for w in workers), 1),
+    }
+
+
+def print_results(results: list[dict]):
+    """Print a comparison table."""
+    print("=" * 80)
+    print("WORKER MEMORY BENCHMARK")
+    print("=" * 80)
+    header = f"{'mode':<12}{'workers':>8}{'RSS/wkr':>10}{'PSS/wkr':>10}{'priv/wkr':>10}{'total PSS':>11}{'ready':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        avg = r["per_worker_avg"]
+        print(
+            f"{r['mode']:<12}{r['workers']:>8}{avg['rss_mib']:>10.1f}{avg['pss_mib']:>10.1f}"
+            f"{avg['private_mib']:>10.1f}{r['total_pss_mib']:>11.1f}{r['ready_s']:>7.1f}s"
+        )
+    print("-" * len(header))
+    print("Memory in MiB. PSS splits shared pages between the processes sharing them.")
+    print("=" * 80)
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    results = [run_mode(mode, args) for mode in modes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
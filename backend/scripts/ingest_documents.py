@@ -8,7 +8,10 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.ingestion.pipeline import IngestionPipeline, IngestionResult
+from app.config import settings
+from app.ingestion.embedders.local_embedding import embedding_dimension
+from app.ingestion.pipeline import IngestionPipeline, IngestionResult, manifest_path_for
+from app.rag.local_index import export_snapshot
 from app.rag.qdrant_client import QdrantManager
 
 
@@ -36,10 +39,28 @@ Examples:
 
   # Ingest with custom collection name
   python -m backend.scripts.ingest_documents --input-dir ./documents --collection custom_kb
+
+  # Re-ingest everything, ignoring the manifest
+  python -m backend.scripts.ingest_documents --input-dir ./documents --force
+
+  # Leave out chunks already present in another document (e.g. PDF and DOCX exports)
+  python -m backend.scripts.ingest_documents --input-dir ./documents --skip-near-duplicates
+
+  # Build a new knowledge base version and switch the alias to it once validated
+  python -m backend.scripts.ingest_documents --input-dir ./documents --rebuild
+
+  # Point the alias back at the previous version
+  python -m backend.scripts.ingest_documents --rollback
+
+  # Ingest, then export a snapshot for the local vector index
+  python -m backend.scripts.ingest_documents --input-dir ./documents --export-snapshot data/snapshots/knowledge_base
+
+  # Export the current knowledge base only, float16 with 64 IVF lists
+  python -m backend.scripts.ingest_documents --export-snapshot data/snapshots/knowledge_base --snapshot-dtype float16 --snapshot-nlist 64
         """,
     )
 
-    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group = parser.add_mutually_exclusive_group()
     input_group.add_argument(
         "--input-files",
         type=str,
@@ -50,12 +71,34 @@ Examples:
         type=str,
         help="Directory path containing documents to ingest",
     )
+    input_group.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Point the collection alias back at the previous version and exit",
+    )
 
     parser.add_argument(
         "--collection",
         type=str,
-        default="knowledge_base",
-        help="Qdrant collection name (default: knowledge_base)",
+        default=settings.KNOWLEDGE_BASE_COLLECTION,
+        help=f"Qdrant collection or alias name (default: {settings.KNOWLEDGE_BASE_COLLECTION})",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ingest into a new <collection>_v<N> and swap the alias to it after validation",
+    )
+    parser.add_argument(
+        "--min-ratio",
+        type=float,
+        default=0.8,
+        help="Rebuild validation: minimum new/current point count ratio (default: 0.8)",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=settings.KNOWLEDGE_BASE_KEEP_VERSIONS,
+        help=f"Versions kept after a rebuild (default: {settings.KNOWLEDGE_BASE_KEEP_VERSIONS})",
     )
     parser.add_argument(
         "--chunk-strategy",
@@ -102,8 +145,64 @@ Examples:
         action="store_true",
         help="Use mock embeddings instead of real API (for testing)",
     )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Ingestion manifest path (default: INGESTION_MANIFEST_DIR/<collection>.json)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-ingest documents even if unchanged since the last run",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for parsing and chunking (default: INGESTION_WORKERS or CPU count; 0: in-process)",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Always call the embedding API instead of reusing cached vectors",
+    )
+    parser.add_argument(
+        "--skip-near-duplicates",
+        action="store_true",
+        help="Skip chunks that near-duplicate another document's (default: INGESTION_SKIP_NEAR_DUPLICATES)",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Keep points of files that were removed from the input directory",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        type=str,
+        default=None,
+        help="Export the collection to a local vector index snapshot directory",
+    )
+    parser.add_argument(
+        "--snapshot-dtype",
+        type=str,
+        choices=["float32", "float16"],
+        default="float32",
+        help="Snapshot vector type; float16 halves memory but scores slower (default: float32)",
+    )
+    parser.add_argument(
+        "--snapshot-nlist",
+        type=int,
+        default=0,
+        help="IVF lists to train for the snapshot (default: 0, brute-force search)",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not (args.input_files or args.input_dir or args.rollback or args.export_snapshot):
+        parser.error(
+            "one of the arguments --input-files --input-dir --rollback --export-snapshot is required"
+        )
+    return args
 
 
 def parse_metadata(metadata_str: str) -> dict | None:
@@ -117,33 +216,20 @@ def parse_metadata(metadata_str: str) -> dict | None:
         print(f"Error parsing metadata JSON: {e}")
         return None
 
-    try:
-        import json
-
-        return json.loads(metadata_str)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing metadata JSON: {e}")
-        return None
-
-    try:
-        import json
-
-        return json.loads(metadata_str)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing metadata JSON: {e}")
-        return None
-
 
 async def ingest_single_file(
     file_path: str,
     pipeline: IngestionPipeline,
+    additional_metadata: dict | None = None,
     verbose: bool = False,
 ) -> dict:
     """Ingest a single document."""
     print(f"Processing: {file_path}")
-    result = await pipeline.ingest_document(file_path)
+    result = await pipeline.ingest_document(file_path, additional_metadata)
 
-    if verbose or not result.get("success"):
+    if result.get("skipped"):
+        print("  Unchanged, skipped")
+    elif verbose or not result.get("success"):
         print(f"  Result: {result.get('success')}")
         if not result.get("success"):
             print(f"  Error: {result.get('error')}")
@@ -158,6 +244,7 @@ async def ingest_files(
     file_paths: list[str],
     pipeline: IngestionPipeline,
     batch_size: int,
+    additional_metadata: dict | None = None,
     verbose: bool = False,
 ) -> IngestionResult:
     """Ingest multiple files."""
@@ -167,6 +254,7 @@ async def ingest_files(
     result = await pipeline.ingest_batch(
         file_paths=file_paths,
         batch_size=batch_size,
+        additional_metadata=additional_metadata,
     )
 
     return result
@@ -178,6 +266,8 @@ async def ingest_directory(
     recursive: bool,
     batch_size: int,
     file_extensions: list[str] | None = None,
+    prune_deleted: bool = True,
+    additional_metadata: dict | None = None,
     verbose: bool = False,
 ) -> IngestionResult:
     """Ingest all documents from a directory."""
@@ -191,11 +281,80 @@ async def ingest_directory(
         recursive=recursive,
         batch_size=batch_size,
         file_extensions=file_extensions,
+        prune_deleted=prune_deleted,
+        additional_metadata=additional_metadata,
     )
 
     return result
 
 
+async def validate_rebuild(
+    alias: str,
+    collection_name: str,
+    result: IngestionResult,
+    min_ratio: float,
+) -> str | None:
+    """
+    Check a freshly built collection before it goes live.
+
+    Returns:
+        Reason the rebuild is rejected, or None if it passes
+    """
+    if result.failed:
+        return f"{result.failed} documents failed"
+
+    new_count = await QdrantManager.count_points(collection_name)
+    if new_count == 0:
+        return "new collection is empty"
+    if new_count != result.points_upserted:
+        return f"expected {result.points_upserted} points, found {new_count}"
+
+    current = QdrantManager.resolve_alias(alias)
+    if current is None and QdrantManager.get_client().collection_exists(alias):
+        current = alias
+    if current is not None:
+        current_count = await QdrantManager.count_points(current)
+        if current_count and new_count < min_ratio * current_count:
+            return (
+                f"new collection has {new_count} points, below {min_ratio:.0%} "
+                f"of the current {current_count}"
+            )
+
+    return None
+
+
+async def promote_rebuild(alias: str, collection_name: str, keep_versions: int) -> None:
+    """Swap the alias to a rebuilt collection and drop old versions."""
+    previous = await QdrantManager.swap_alias(alias, collection_name)
+    print(f"Alias '{alias}' -> {collection_name} (was: {previous or 'none'})")
+
+    for name in await QdrantManager.garbage_collect_versions(alias, keep_versions):
+        manifest = manifest_path_for(name)
+        if os.path.exists(manifest):
+            os.remove(manifest)
+        print(f"Deleted old version: {name}")
+
+
+async def rollback(alias: str) -> None:
+    """Point the alias at the previous version."""
+    current = QdrantManager.resolve_alias(alias)
+    restored = await QdrantManager.rollback_alias(alias)
+    if restored is None:
+        print(f"\n❌ No older version of '{alias}' to roll back to (current: {current}).")
+        sys.exit(1)
+    print(f"\n✅ Alias '{alias}' -> {restored} (was: {current})")
+
+
+def export_local_snapshot(collection_name: str, path: str, dtype: str, nlist: int) -> None:
+    """Export a collection for the local vector index."""
+    meta = export_snapshot(collection_name, path, dtype=dtype, nlist=nlist)
+    print(
+        f"\nSnapshot of {meta['collection']} written to {path}: "
+        f"{meta['count']} vectors, {meta['dtype']}, "
+        f"{'IVF ' + str(meta['nlist']) + ' lists' if meta['nlist'] else 'brute force'}"
+    )
+
+
 def print_summary(result: IngestionResult):
     """Print ingestion summary."""
     print("\n" + "=" * 80)
@@ -204,7 +363,26 @@ def print_summary(result: IngestionResult):
     print(f"Total Documents: {result.total_documents}")
     print(f"Successful: {result.successful}")
     print(f"Failed: {result.failed}")
+    print(f"Skipped (unchanged): {result.skipped}")
+    print(f"Deleted (removed files): {result.deleted}")
     print(f"Total Chunks: {result.total_chunks}")
+    print(f"Points Upserted: {result.points_upserted}")
+    if result.duplicate_chunks:
+        print(f"Skipped Chunks (near duplicates): {result.duplicate_chunks}")
+    if result.embedding_cache_hits or result.embedding_cache_misses:
+        looked_up = result.embedding_cache_hits + result.embedding_cache_misses
+        print(
+            f"Embedding Cache: {result.embedding_cache_hits}/{looked_up} hits "
+            f"({result.embedding_cache_hits / looked_up:.0%})"
+        )
+
+    if result.stages:
+        print("\nStage Throughput:")
+        for name, stage in result.stages.items():
+            print(
+                f"  {name:<8} {stage['items']:>8} {stage['unit']:<10} "
+                f"{stage['per_second']:>10.1f}/s  (busy {stage['busy_s']:.1f}s)"
+            )
 
     if result.errors:
         print("\nErrors:")
@@ -226,23 +404,65 @@ async def main():
     print(f"Collection: {args.collection}")
     print(f"Chunk Strategy: {args.chunk_strategy}")
     print(f"Batch Size: {args.batch_size}")
+    print(f"Parse Workers: {args.workers if args.workers is not None else 'default'}")
     if args.use_mock_embeddings:
         print("Embeddings: MOCK (testing mode)")
     else:
         print("Embeddings: API (requires valid key)")
     print("=" * 80)
 
+    if args.rollback:
+        await rollback(args.collection)
+        return
+
+    if args.export_snapshot and not (args.input_files or args.input_dir):
+        export_local_snapshot(
+            args.collection, args.export_snapshot, args.snapshot_dtype, args.snapshot_nlist
+        )
+        return
+
     if args.init_collections:
         print("\nInitializing Qdrant collections...")
-        QdrantManager.initialize_collections()
+        await QdrantManager.initialize_collections()
         print("Collections initialized.")
 
-    parse_metadata(args.metadata)
+    additional_metadata = parse_metadata(args.metadata)
+    if args.metadata and additional_metadata is None:
+        sys.exit(1)
+
+    collection_name = args.collection
+    if args.rebuild:
+        collection_name = await QdrantManager.next_version(args.collection)
+        await QdrantManager.create_collection(collection_name)
+        print(f"\nRebuilding into new collection: {collection_name}")
+    else:
+        size = QdrantManager.vector_size(collection_name)
+        if size is not None and size != embedding_dimension():
+            print(
+                f"\n❌ '{collection_name}' stores {size}-dimension vectors but the embedding "
+                f"model produces {embedding_dimension()}. Use --rebuild to re-embed into a "
+                "new version."
+            )
+            sys.exit(1)
+
+    if additional_metadata:
+        # Custom metadata is meant for filtering, so index its string fields.
+        indexed = await QdrantManager.ensure_payload_indexes(
+            collection_name,
+            [key for key, value in additional_metadata.items() if isinstance(value, str)],
+        )
+        if indexed:
+            print(f"Indexed metadata fields: {', '.join(indexed)}")
 
     pipeline = IngestionPipeline(
         chunk_strategy=args.chunk_strategy,
-        collection_name=args.collection,
+        collection_name=collection_name,
         use_mock_embeddings=args.use_mock_embeddings,
+        manifest_path=args.manifest,
+        force=args.force or args.rebuild,
+        use_embedding_cache=False if args.no_embedding_cache else None,
+        workers=args.workers,
+        skip_near_duplicates=True if args.skip_near_duplicates else None,
     )
 
     result: IngestionResult = None
@@ -255,15 +475,23 @@ async def main():
                 single_result = await ingest_single_file(
                     file_path=file_paths[0],
                     pipeline=pipeline,
+                    additional_metadata=additional_metadata,
                     verbose=args.verbose,
                 )
+                pipeline.save_manifest()
 
-                if single_result.get("success"):
+                if single_result.get("skipped"):
+                    result = IngestionResult(total_documents=1, skipped=1)
+                elif single_result.get("success"):
                     result = IngestionResult(
                         total_documents=1,
                         successful=1,
                         failed=0,
                         total_chunks=single_result.get("chunks_processed", 0),
+                        duplicate_chunks=single_result.get("duplicate_chunks", 0),
+                        points_upserted=len(set(single_result.get("point_ids", []))),
+                        embedding_cache_hits=getattr(pipeline.embedder, "hits", 0),
+                        embedding_cache_misses=getattr(pipeline.embedder, "misses", 0),
                     )
                 else:
                     result = IngestionResult(
@@ -278,6 +506,7 @@ async def main():
                     file_paths=file_paths,
                     pipeline=pipeline,
                     batch_size=args.batch_size,
+                    additional_metadata=additional_metadata,
                     verbose=args.verbose,
                 )
 
@@ -292,14 +521,35 @@ async def main():
                 recursive=args.recursive,
                 batch_size=args.batch_size,
                 file_extensions=file_extensions,
+                prune_deleted=not args.no_prune,
+                additional_metadata=additional_metadata,
                 verbose=args.verbose,
             )
 
         if result:
             print_summary(result)
 
-            if result.successful > 0:
+            if args.rebuild:
+                reason = await validate_rebuild(
+                    args.collection, collection_name, result, args.min_ratio
+                )
+                if reason:
+                    print(
+                        f"\n❌ Rebuild rejected: {reason}. Alias unchanged; "
+                        f"inspect or delete '{collection_name}'."
+                    )
+                    sys.exit(1)
+                await promote_rebuild(args.collection, collection_name, args.keep_versions)
+
+            if result.successful > 0 or (result.skipped > 0 and result.failed == 0):
                 print("\n✅ Ingestion completed successfully!")
+                if args.export_snapshot:
+                    export_local_snapshot(
+                        args.collection,
+                        args.export_snapshot,
+                        args.snapshot_dtype,
+                        args.snapshot_nlist,
+                    )
             else:
                 print("\n❌ Ingestion completed with errors.")
                 sys.exit(1)
@@ -316,6 +566,8 @@ async def main():
 
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await pipeline.close()
 
 
 if __name__ == "__main__":
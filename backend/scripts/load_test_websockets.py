@@ -0,0 +1,185 @@
+"""Load test: many idle chat WebSockets alongside active HTTP traffic.
+
+Opens a large number of WebSocket chat connections that stay idle, then
+drives concurrent database-backed HTTP requests against the same server.
+With per-message database sessions, idle sockets hold no pooled Postgres
+connections, so HTTP requests keep succeeding with stable latency.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+import websockets
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Hold idle chat WebSockets open while driving HTTP traffic",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 300 idle sockets, 2,000 HTTP requests with 50 in flight
+  python scripts/load_test_websockets.py --base-url http://localhost:8000
+
+  # Heavier run
+  python scripts/load_test_websockets.py --idle-sockets 1000 --http-requests 10000
+        """,
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default="http://localhost:8000",
+        help="Backend base URL (default: http://localhost:8000)",
+    )
+    parser.add_argument(
+        "--idle-sockets",
+        type=int,
+        default=300,
+        help="Number of idle WebSocket connections to hold open (default: 300)",
+    )
+    parser.add_argument(
+        "--http-requests",
+        type=int,
+        default=2000,
+        help="Total HTTP requests to send while sockets are open (default: 2000)",
+    )
+    parser.add_argument(
+        "--http-concurrency",
+        type=int,
+        default=50,
+        help="Concurrent in-flight HTTP requests (default: 50)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Per-request timeout in seconds (default: 10)",
+    )
+    return parser.parse_args()
+
+
+async def create_session(client: httpx.AsyncClient) -> str:
+    """Create a chat session and return its ID."""
+    response = await client.post("/api/v1/auth/session/new")
+    response.raise_for_status()
+    return response.json()["session_id"]
+
+
+async def open_idle_socket(ws_url: str, session_id: str):
+    """Open a chat WebSocket and wait for the connected frame."""
+    connection = await websockets.connect(f"{ws_url}/api/v1/chat/ws?session_id={session_id}")
+    greeting = await connection.recv()
+    if '"connected"' not in greeting:
+        await connection.close()
+        raise RuntimeError(f"Unexpected greeting: {greeting}")
+    return connection
+
+
+async def drive_http(
+    client: httpx.AsyncClient,
+    session_ids: list[str],
+    total: int,
+    concurrency: int,
+) -> tuple[list[float], dict[str, int]]:
+    """Send DB-backed HTTP requests and collect latencies and outcomes."""
+    latencies: list[float] = []
+    outcomes: dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        session_id = session_ids[i % len(session_ids)]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get("/api/v1/auth/me", params={"session_id": session_id})
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, outcomes
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def main():
+    """Main entry point."""
+    args = parse_arguments()
+    ws_url = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    print("=" * 80)
+    print("WEBSOCKET IDLE-CONNECTION LOAD TEST")
+    print("=" * 80)
+    print(f"Target: {args.base_url}")
+    print(f"Idle sockets: {args.idle_sockets}")
+    print(f"HTTP requests: {args.http_requests} (concurrency {args.http_concurrency})")
+    print("=" * 80)
+
+    limits = httpx.Limits(max_connections=args.http_concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        session_ids = await asyncio.gather(
+            *(create_session(client) for _ in range(args.idle_sockets))
+        )
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(open_idle_socket(ws_url, sid) for sid in session_ids),
+            return_exceptions=True,
+        )
+        sockets = [r for r in results if not isinstance(r, Exception)]
+        socket_errors = [r for r in results if isinstance(r, Exception)]
+        print(
+            f"\nOpened {len(sockets)}/{args.idle_sockets} sockets "
+            f"in {(time.perf_counter() - start):.2f}s"
+        )
+        for error in socket_errors[:5]:
+            print(f"  Socket error: {error}")
+
+        try:
+            start = time.perf_counter()
+            latencies, outcomes = await drive_http(
+                client, list(session_ids), args.http_requests, args.http_concurrency
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await asyncio.gather(*(s.close() for s in sockets), return_exceptions=True)
+
+    failures = sum(n for key, n in outcomes.items() if not key.isdigit() or key.startswith("5"))
+
+    print("\n" + "=" * 80)
+    print("RESULTS")
+    print("=" * 80)
+    print(f"Idle sockets held: {len(sockets)}")
+    print(f"HTTP throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"HTTP latency p50: {percentile(latencies, 50):.1f} ms")
+    print(f"HTTP latency p95: {percentile(latencies, 95):.1f} ms")
+    print(f"HTTP latency p99: {percentile(latencies, 99):.1f} ms")
+    print(f"HTTP latency mean: {statistics.fmean(latencies):.1f} ms")
+    print(f"Outcomes: {dict(sorted(outcomes.items()))}")
+    print("=" * 80)
+
+    if socket_errors or failures:
+        print("\n❌ Load test failed: socket errors or HTTP failures while sockets were idle.")
+        sys.exit(1)
+
+    print("\n✅ Idle sockets coexisted with HTTP traffic without errors.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
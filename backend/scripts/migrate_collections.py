@@ -0,0 +1,137 @@
+"""CLI tool for applying collection tuning to existing Qdrant collections.
+
+New collections are created with the configured payload indexes, int8
+scalar quantization, on-disk vectors and HNSW parameters. This tool brings
+collections created before those settings (or before a settings change)
+in line. Qdrant re-optimizes segments in the background; searches keep
+working while it does.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings
+from app.rag.qdrant_client import QdrantManager, keyword_index_fields
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Apply payload indexes, quantization and storage settings to collections",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Show what would change for the live knowledge base
+  python scripts/migrate_collections.py --dry-run
+
+  # Migrate the live knowledge base
+  python scripts/migrate_collections.py
+
+  # Migrate every knowledge base version and the summaries collection
+  python scripts/migrate_collections.py --all-versions --collections knowledge_base,conversation_summaries
+
+  # Also index a custom metadata field used in filters
+  python scripts/migrate_collections.py --extra-indexes department
+        """,
+    )
+    parser.add_argument(
+        "--collections",
+        type=str,
+        default=settings.KNOWLEDGE_BASE_COLLECTION,
+        help=f"Comma-separated collections or aliases (default: {settings.KNOWLEDGE_BASE_COLLECTION})",
+    )
+    parser.add_argument(
+        "--all-versions",
+        action="store_true",
+        help="Also migrate every <name>_v<N> version, not just the alias target",
+    )
+    parser.add_argument(
+        "--extra-indexes",
+        type=str,
+        default=None,
+        help="Comma-separated additional payload fields to index as keywords",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print current and target configuration without changing anything",
+    )
+    return parser.parse_args()
+
+
+async def resolve_targets(names: list[str], all_versions: bool) -> list[str]:
+    """Expand aliases (and optionally their versions) into physical collections."""
+    client = QdrantManager.get_client()
+    targets = []
+    for name in names:
+        physical = QdrantManager.resolve_alias(name)
+        if physical is None and client.collection_exists(name):
+            physical = name
+        if physical:
+            targets.append(physical)
+        if all_versions:
+            targets.extend(version for _, version in await QdrantManager.list_versions(name))
+    return list(dict.fromkeys(targets))
+
+
+def describe(collection_name: str) -> dict:
+    """Current storage, index and quantization settings of a collection."""
+    info = QdrantManager.get_client().get_collection(collection_name)
+    params = info.config.params.vectors
+    quantization = info.config.quantization_config
+    return {
+        "points": info.points_count,
+        "vectors_on_disk": getattr(params, "on_disk", None),
+        "hnsw_m": info.config.hnsw_config.m,
+        "hnsw_ef_construct": info.config.hnsw_config.ef_construct,
+        "quantization": type(quantization).__name__ if quantization else "none",
+        "payload_indexes": sorted((info.payload_schema or {}).keys()),
+    }
+
+
+async def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    names = [n.strip() for n in args.collections.split(",") if n.strip()]
+    targets = await resolve_targets(names, args.all_versions)
+    if not targets:
+        print(f"No collections found for: {', '.join(names)}")
+        sys.exit(1)
+
+    extra = [f.strip() for f in (args.extra_indexes or "").split(",") if f.strip()]
+
+    print("=" * 80)
+    print("COLLECTION MIGRATION")
+    print("=" * 80)
+    print(
+        f"Target: on_disk={settings.QDRANT_VECTORS_ON_DISK}, "
+        f"quantization={settings.QDRANT_QUANTIZATION}, "
+        f"hnsw_m={settings.QDRANT_HNSW_M}, ef_construct={settings.QDRANT_HNSW_EF_CONSTRUCT}"
+    )
+    print(f"Keyword indexes: {', '.join(keyword_index_fields() + extra)}")
+    print("=" * 80)
+
+    for collection_name in targets:
+        print(f"\n{collection_name}")
+        for key, value in describe(collection_name).items():
+            print(f"  {key}: {value}")
+
+        if args.dry_run:
+            continue
+
+        indexed = await QdrantManager.apply_collection_config(collection_name)
+        if extra:
+            indexed += await QdrantManager.ensure_payload_indexes(collection_name, extra)
+        print(f"  -> updated; new indexes: {', '.join(indexed) or 'none'}")
+
+    if args.dry_run:
+        print("\nDry run: no changes made.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""CLI tool for inspecting and pruning the on-disk embedding cache."""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings
+from app.ingestion.embedders.cache import EmbeddingCache
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Inspect and prune the embedding cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Show cache statistics
+  python scripts/prune_embedding_cache.py --stats
+
+  # Drop entries unused for 30 days
+  python scripts/prune_embedding_cache.py --max-age-days 30
+
+  # Drop entries for every model except the configured one
+  python scripts/prune_embedding_cache.py --current-model-only
+
+  # Keep the 200k most recently used entries and reclaim disk space
+  python scripts/prune_embedding_cache.py --max-entries 200000 --vacuum
+        """,
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        default=settings.EMBEDDING_CACHE_PATH,
+        help=f"Cache database file (default: {settings.EMBEDDING_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print cache statistics and exit",
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=None,
+        help="Remove entries not used within this many days",
+    )
+    parser.add_argument(
+        "--current-model-only",
+        action="store_true",
+        help=f"Remove entries for models other than EMBEDDING_MODEL ({settings.EMBEDDING_MODEL})",
+    )
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=None,
+        help="Keep at most this many most recently used entries",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Compact the database file after pruning",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    if not os.path.exists(args.path):
+        print(f"No embedding cache at {args.path}")
+        sys.exit(1)
+
+    cache = EmbeddingCache(args.path)
+
+    if args.stats:
+        print(json.dumps(cache.stats(), indent=2))
+        return
+
+    before = cache.stats()
+    removed = cache.prune(
+        max_age_days=args.max_age_days,
+        keep_models=[settings.EMBEDDING_MODEL] if args.current_model_only else None,
+        max_entries=args.max_entries,
+    )
+    if args.vacuum:
+        cache.vacuum()
+    after = cache.stats()
+    cache.close()
+
+    print("=" * 80)
+    print("EMBEDDING CACHE PRUNE")
+    print("=" * 80)
+    print(f"Cache: {args.path}")
+    print(f"Removed: {removed}")
+    print(f"Entries: {before['entries']} -> {after['entries']}")
+    print(f"Size: {before['size_bytes'] / 1e6:.1f} MB -> {after['size_bytes'] / 1e6:.1f} MB")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
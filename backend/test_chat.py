@@ -22,9 +22,11 @@ load_dotenv()
 from app.agent.support_agent import get_support_agent, AgentContext
 from app.dependencies import get_db, get_memory_manager
 from app.models.schemas import ChatRequest, ChatResponse, SourceCitation
-from app.rag.pipeline import rag_pipeline
+from app.rag.pipeline import get_rag_pipeline
 from app.config import settings
 
+rag_pipeline = get_rag_pipeline()
+
 router = APIRouter(prefix="/chat", tags=["chat"])
 security = HTTPBearer(auto_error=False)
 
@@ -0,0 +1,85 @@
+"""Test chunking strategies."""
+
+import numpy as np
+import pytest
+
+from app.ingestion.chunkers.chunker import RecursiveChunker, SemanticChunker
+from app.services.tokenizer import count_tokens
+
+
+class TopicEncoder:
+    """Sentence encoder stub: sentences mentioning the same topic word are identical."""
+
+    TOPICS = ["refund", "shipping", "warranty"]
+
+    def encode(self, sentences, convert_to_numpy=True, normalize_embeddings=False):
+        vectors = np.zeros((len(sentences), len(self.TOPICS)), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            for j, topic in enumerate(self.TOPICS):
+                if topic in sentence.lower():
+                    vectors[i, j] = 1.0
+        return vectors
+
+
+def make_chunker(**kwargs) -> SemanticChunker:
+    """Build a SemanticChunker around the stub encoder."""
+    chunker = SemanticChunker.__new__(SemanticChunker)
+    chunker.model = TopicEncoder()
+    chunker.chunk_size = kwargs.get("chunk_size", 512)
+    chunker.similarity_threshold = kwargs.get("similarity_threshold", 0.5)
+    chunker.chunk_overlap = kwargs.get("chunk_overlap", 0)
+    chunker.breakpoint_percentile = kwargs.get("breakpoint_percentile")
+    chunker.tokenizer_model = None
+    return chunker
+
+
+@pytest.mark.unit
+def test_semantic_chunker_splits_on_topic_change():
+    """Test that a drop in adjacent similarity starts a new chunk."""
+    text = (
+        "Refund requests take five days. Refund status is emailed. "
+        "Shipping is free over fifty dollars. Shipping takes a week."
+    )
+
+    assert make_chunker().chunk(text) == [
+        "Refund requests take five days. Refund status is emailed.",
+        "Shipping is free over fifty dollars. Shipping takes a week.",
+    ]
+    assert len(make_chunker(breakpoint_percentile=50).chunk(text)) == 2
+
+
+@pytest.mark.unit
+def test_semantic_chunker_enforces_token_limit_with_overlap():
+    """Test that a long run of similar sentences is capped and overlapped."""
+    sentences = [f"Refund rule number {i} applies to every order." for i in range(40)]
+    chunker = make_chunker(chunk_size=60, chunk_overlap=15)
+
+    chunks = chunker.chunk(" ".join(sentences))
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 60 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.split(". ")[-1] in current
+
+
+@pytest.mark.unit
+def test_recursive_chunker_respects_token_limit_and_overlap():
+    """Test that chunks stay within the token limit and consecutive chunks overlap."""
+    paragraphs = [
+        " ".join(f"Sentence {p}.{s} about store policy." for s in range(12)) for p in range(6)
+    ]
+    text = "\n\n".join(paragraphs) + "\n\n" + "x" * 3000
+
+    chunker = RecursiveChunker(chunk_size=40, chunk_overlap=10)
+    chunks = chunker.chunk(text)
+
+    assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+    assert "Sentence 0.0" in chunks[0] and chunks[-1].endswith("x")
+    assert any(a.split(". ")[-1] in b for a, b in zip(chunks, chunks[1:]))
+
+
+@pytest.mark.unit
+def test_recursive_chunker_rejects_overlap_not_smaller_than_size():
+    """Test that an overlap that could never advance is rejected up front."""
+    with pytest.raises(ValueError):
+        RecursiveChunker(chunk_size=50, chunk_overlap=50)
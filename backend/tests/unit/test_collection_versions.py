@@ -0,0 +1,42 @@
+"""Test blue/green knowledge base versions behind a Qdrant alias."""
+
+import pytest
+from qdrant_client import QdrantClient
+
+from app.rag.qdrant_client import QdrantManager
+
+
+@pytest.fixture
+def local_qdrant(monkeypatch):
+    """Route QdrantManager to an in-memory Qdrant."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    return QdrantManager.get_client()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+async def test_rebuild_swap_rollback_and_gc(local_qdrant):
+    """Test that versions are swapped atomically, rolled back and garbage-collected."""
+    # Pre-versioning layout: a plain collection named like the alias.
+    await QdrantManager.create_collection("kb")
+
+    for _ in range(3):
+        version = await QdrantManager.next_version("kb")
+        await QdrantManager.create_collection(version)
+        await QdrantManager.swap_alias("kb", version)
+
+    assert QdrantManager.resolve_alias("kb") == "kb_v3"
+    assert [name for _, name in await QdrantManager.list_versions("kb")] == [
+        "kb_v1",
+        "kb_v2",
+        "kb_v3",
+    ]
+
+    assert await QdrantManager.rollback_alias("kb") == "kb_v2"
+    assert QdrantManager.resolve_alias("kb") == "kb_v2"
+
+    # The live version survives GC even when it is not among the newest.
+    assert await QdrantManager.garbage_collect_versions("kb", keep=1) == ["kb_v1"]
+    assert [name for _, name in await QdrantManager.list_versions("kb")] == ["kb_v2", "kb_v3"]
+    assert await QdrantManager.count_points("kb") == 0
@@ -0,0 +1,251 @@
+"""Test WebSocket outbound queueing, progress coalescing and cross-worker fan-out."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.connection_manager import ConnectionManager, OutboundChannel
+
+
+class SlowWebSocket:
+    """WebSocket double whose sends take a fixed time."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[dict] = []
+
+    async def send_text(self, data: str):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(data))
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_send_does_not_wait_for_slow_client():
+    """Test that enqueueing returns immediately even if the client is slow."""
+    websocket = SlowWebSocket(delay=0.5)
+    channel = OutboundChannel(websocket, throttle_ms=0)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(10):
+        channel.send({"type": "response", "index": i})
+
+    assert loop.time() - start < 0.05
+    await channel.close(drain_timeout=0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_progress_frames_are_coalesced_and_superseded():
+    """Test that stale thoughts are replaced and dropped before a response."""
+    websocket = SlowWebSocket()
+    channel = OutboundChannel(websocket, throttle_ms=50)
+
+    channel.send({"type": "thought", "step": "assembling_context"})
+    await asyncio.sleep(0.01)
+    channel.send({"type": "thought", "step": "validating_input"})
+    channel.send({"type": "thought", "step": "searching_knowledge"})
+    channel.send({"type": "response", "message": "done"})
+    await channel.close()
+
+    assert websocket.sent == [
+        {"type": "thought", "step": "assembling_context"},
+        {"type": "response", "message": "done"},
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_non_progress_messages_keep_order():
+    """Test that regular messages are delivered in order."""
+    websocket = SlowWebSocket(delay=0.001)
+    channel = OutboundChannel(websocket, throttle_ms=0)
+
+    for i in range(5):
+        channel.send({"type": "response", "index": i})
+    await channel.close()
+
+    assert [m["index"] for m in websocket.sent] == [0, 1, 2, 3, 4]
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis sets and pub/sub used by fan-out."""
+
+    def __init__(self):
+        self.sets: dict[str, set[str]] = {}
+        self.expires: list[str] = []
+        self.published: list[tuple[str, list]] = []
+        self.smembers_calls = 0
+        self.subscribers: dict[str, asyncio.Queue] = {}
+        self.disconnects = 0
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    async def smembers(self, key):
+        self.smembers_calls += 1
+        return set(self.sets.get(key, set()))
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def sadd(self, key, member):
+        self.commands.append(lambda: self.redis.sets.setdefault(key, set()).add(member))
+
+    def expire(self, key, ttl):
+        self.commands.append(lambda: self.redis.expires.append(key))
+
+    def publish(self, channel, data):
+        def publish():
+            self.redis.published.append((channel, json.loads(data)))
+            if channel in self.redis.subscribers:
+                self.redis.subscribers[channel].put_nowait(data)
+
+        self.commands.append(publish)
+
+    async def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakePubSub:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers[channel] = self.queue
+
+    async def listen(self):
+        while True:
+            if self.redis.disconnects:
+                self.redis.disconnects -= 1
+                raise ConnectionError("connection lost")
+            yield {"type": "message", "data": await self.queue.get()}
+
+    async def unsubscribe(self, channel):
+        self.redis.subscribers.pop(channel, None)
+
+    async def aclose(self):
+        pass
+
+
+class FakeWebSocket(SlowWebSocket):
+    async def accept(self):
+        pass
+
+
+async def start_workers(redis: FakeRedis, **kwargs) -> list[ConnectionManager]:
+    """Two fan-out managers sharing one fake Redis, as two workers would."""
+    workers = []
+    for _ in range(2):
+        worker = ConnectionManager(fanout_enabled=True, **kwargs)
+        worker._redis = lambda: redis
+        await worker.start()
+        workers.append(worker)
+    return workers
+
+
+async def wait_for(condition, timeout: float = 1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_send_message_reaches_every_socket_on_another_worker():
+    """Test that a message sent on one worker reaches all tabs held by another."""
+    redis = FakeRedis()
+    sender, holder = await start_workers(redis, batch_interval_ms=1)
+    tabs = [FakeWebSocket(), FakeWebSocket()]
+    for tab in tabs:
+        await holder.connect("s1", tab)
+
+    await sender.send_message("s1", {"type": "response", "message": "hi"})
+
+    await wait_for(lambda: all(tab.sent for tab in tabs))
+    assert [tab.sent for tab in tabs] == [[{"type": "response", "message": "hi"}]] * 2
+    await sender.stop()
+    await holder.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_fanout_batches_publishes_and_caches_routes():
+    """Test that cross-worker messages are published in capped batches, in order."""
+    redis = FakeRedis()
+    sender, holder = await start_workers(redis, batch_interval_ms=20, max_batch_size=3)
+    tab = FakeWebSocket()
+    await holder.connect("s1", tab)
+
+    for i in range(5):
+        await sender.send_message("s1", {"type": "response", "index": i})
+
+    await wait_for(lambda: len(tab.sent) == 5)
+    assert [len(batch) for _, batch in redis.published] == [3, 2]
+    assert [m["index"] for m in tab.sent] == [0, 1, 2, 3, 4]
+    assert redis.smembers_calls == 1
+    await sender.stop()
+    await holder.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_heartbeat_refreshes_session_registration():
+    """Test that held sessions are re-registered before their key expires."""
+    redis = FakeRedis()
+    holder = ConnectionManager(fanout_enabled=True)
+    holder._redis = lambda: redis
+    holder.REGISTRY_TTL = 0.03
+    await holder.start()
+    await holder.connect("s1", FakeWebSocket())
+
+    await wait_for(lambda: len(redis.expires) >= 3)
+    assert set(redis.expires) == {"ws:session:s1"}
+    await holder.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_listener_survives_bad_envelopes_and_disconnects():
+    """Test that malformed batches are skipped and a lost subscription is re-established."""
+    redis = FakeRedis()
+    sender, holder = await start_workers(redis, batch_interval_ms=1)
+    tab = FakeWebSocket()
+    await holder.connect("s1", tab)
+
+    inbox = redis.subscribers[holder.channel]
+    inbox.put_nowait("not json")
+    inbox.put_nowait(json.dumps([{"session_id": "s1"}]))
+    await sender.send_message("s1", {"type": "response", "index": 0})
+    await wait_for(lambda: len(tab.sent) == 1)
+
+    holder.LISTEN_RETRY_DELAY = 0.001
+    redis.disconnects = 1
+    inbox.put_nowait(json.dumps([]))
+    await wait_for(lambda: redis.subscribers[holder.channel] is not inbox)
+    await sender.send_message("s1", {"type": "response", "index": 1})
+
+    await wait_for(lambda: len(tab.sent) == 2)
+    assert [m["index"] for m in tab.sent] == [0, 1]
+    await sender.stop()
+    await holder.stop()
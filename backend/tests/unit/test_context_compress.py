@@ -0,0 +1,208 @@
+"""Test embedding-based context compression with MMR."""
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+from app.ingestion.embedders import embedding as embedding_module
+from app.ingestion.pipeline import IngestionPipeline
+from app.rag import context_compress
+from app.rag.context_compress import (
+    ContextCompressor,
+    annotate_sentences,
+    mmr_select,
+    sentence_spans,
+)
+from app.rag.qdrant_client import QdrantManager
+from app.services.tokenizer import count_tokens
+
+# Vector per topic; the two refund sentences are duplicates of each other and
+# the query leans towards refunds but also relates to shipping.
+TOPICS = {
+    "how long": [0.8, 0.6, 0.0],
+    "refund": [1.0, 0.0, 0.0],
+    "shipping": [0.0, 1.0, 0.0],
+    "careers": [0.0, 0.0, 1.0],
+}
+
+
+class TopicEmbedder:
+    """Embeds a text as the vector of the first topic word it contains."""
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        return [
+            next(v for topic, v in TOPICS.items() if topic in text.lower()) for text in texts
+        ]
+
+    async def generate_single(self, text: str) -> list[float]:
+        return (await self.generate([text]))[0]
+
+
+def use_embedder(monkeypatch, embedder) -> None:
+    """Serve queries and context sentences with the same embedder."""
+    monkeypatch.setattr(embedding_module, "get_embedding_generator", embedder)
+    monkeypatch.setattr(embedding_module, "get_document_embedding_generator", embedder)
+
+
+@pytest.mark.unit
+def test_sentence_spans_split_sentences_and_lines():
+    """Test that sentences and markdown lines become trimmed spans."""
+    text = "# Refunds\n\n  Refunds take 5 days. Ask support!\n- Item one"
+
+    assert [text[s:e] for s, e in sentence_spans(text)] == [
+        "# Refunds",
+        "Refunds take 5 days.",
+        "Ask support!",
+        "- Item one",
+    ]
+
+
+@pytest.mark.unit
+def test_mmr_select_skips_redundant_and_oversized_candidates():
+    """Test that MMR prefers a diverse candidate over a duplicate and respects the budget."""
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.6, 0.8], [0.8, 0.6]], dtype=np.float32)
+
+    selected = mmr_select(np.array([1.0, 0.0]), vectors, [5, 5, 5, 50], budget=10, diversity=0.7)
+
+    assert selected == [0, 2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_compress_mmr_fills_budget_with_distinct_relevant_sentences(monkeypatch):
+    """Test that MMR keeps relevant, non-duplicate sentences in document order."""
+    use_embedder(monkeypatch, TopicEmbedder)
+    documents = [
+        "Careers at our company are open. Refund requests are processed in five days.",
+        "A refund is processed within five days. Shipping takes two days.",
+    ]
+    compressor = ContextCompressor(token_budget=30, mode="mmr", diversity=0.5)
+
+    result = await compressor.async_compress(documents, "How long does a refund take?")
+
+    assert result["compressed"]
+    assert result["context"] == (
+        "Refund requests are processed in five days.\n\nShipping takes two days."
+    )
+    assert result["tokens_used"] <= 30
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_compress_mmr_caps_candidates_and_falls_back_on_errors(monkeypatch):
+    """Test that MMR embeds at most max_sentences and degrades to extractive compression."""
+    embedded: list[list[str]] = []
+
+    class RecordingEmbedder(TopicEmbedder):
+        async def generate(self, texts):
+            embedded.append(texts)
+            return await super().generate(texts)
+
+    class FailingEmbedder(TopicEmbedder):
+        async def generate(self, texts):
+            raise RuntimeError("embedding API unavailable")
+
+    documents = [f"Refund step {i} takes a day. Shipping note {i} applies." for i in range(50)]
+    compressor = ContextCompressor(token_budget=60, mode="mmr", max_sentences=8)
+
+    use_embedder(monkeypatch, RecordingEmbedder)
+    result = await compressor.async_compress(documents, "How long does a refund take?")
+    assert [len(texts) for texts in embedded] == [1, 8]
+    assert result["tokens_used"] <= 60
+
+    use_embedder(monkeypatch, FailingEmbedder)
+    fallback = await compressor.async_compress(documents, "How long does a refund take?")
+    assert fallback == compressor.compress(documents, "How long does a refund take?")
+
+
+@pytest.mark.unit
+def test_compress_uses_precomputed_annotations(monkeypatch):
+    """Test that payloads annotated at ingestion are not re-split or re-counted."""
+    text = "Refunds take five days. " * 40
+    payload = {"text": text, **annotate_sentences(text, "openai/gpt-4o-mini")}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("payload was re-annotated")
+
+    monkeypatch.setattr(context_compress, "annotate_sentences", fail)
+    compressor = ContextCompressor(token_budget=10_000, tokenizer_model="openai/gpt-4o-mini")
+
+    result = compressor.compress([payload], "refund")
+
+    assert not result["compressed"]
+    assert result["tokens_used"] == payload["token_count"] + count_tokens(
+        "refund", "openai/gpt-4o-mini"
+    )
+
+
+@pytest.mark.unit
+def test_extractive_compression_uses_stored_spans_and_counts(monkeypatch):
+    """Test that extractive mode neither re-splits nor re-tokenizes annotated payloads."""
+    model = "openai/gpt-4o-mini"
+    texts = [
+        "Refunds take five days. Note the receipt is required. Shipping is free. Ask us!",
+        "Careers are open. Refund forms are online.",
+    ]
+    payloads = [{"text": text, **annotate_sentences(text, model)} for text in texts]
+
+    class NoRegex:
+        def __getattr__(self, name):
+            raise AssertionError(f"re.{name} called")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("text was re-split or re-tokenized")
+
+    monkeypatch.setattr(context_compress, "re", NoRegex())
+    monkeypatch.setattr(context_compress, "sentence_spans", fail)
+    monkeypatch.setattr(context_compress, "count_tokens_batch", fail)
+    monkeypatch.setattr(context_compress, "annotate_sentences", fail)
+    compressor = ContextCompressor(token_budget=30, tokenizer_model=model)
+
+    result = compressor.compress(payloads, "refund")
+
+    sentences = [(texts[0][start:end], tokens) for start, end, tokens in payloads[0]["sentences"]]
+    key = [sentences[1], sentences[3], sentences[0]]
+    assert result["compressed"]
+    assert result["context"] == " ".join(text for text, _ in key)
+    assert result["tokens_used"] == count_tokens("refund", model) + sum(
+        tokens + 1 for _, tokens in key
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ingested_sentence_spans_slice_payload_text(tmp_path, monkeypatch):
+    """Test that the sentence offsets stored at ingestion cut the payload text into its sentences."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    document = tmp_path / "refunds.md"
+    document.write_text(
+        "# Refunds\n\nRefunds take five days.  Ask support!\n- Keep the receipt.\n" * 40
+    )
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+    )
+    stored: list[dict] = []
+
+    async def upsert_documents(collection_name, points):
+        stored.extend(point.payload for point in points)
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+
+    await pipeline.ingest_document(str(document))
+    await pipeline.close()
+
+    assert stored
+    for payload in stored:
+        text = payload["text"]
+        assert [text[start:end] for start, end, _ in payload["sentences"]] == [
+            text[start:end] for start, end in sentence_spans(text)
+        ]
+        assert {text[start:end] for start, end, _ in payload["sentences"]} <= {
+            "# Refunds",
+            "Refunds take five days.",
+            "Ask support!",
+            "- Keep the receipt.",
+        }
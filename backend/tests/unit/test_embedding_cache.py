@@ -0,0 +1,87 @@
+"""Test the on-disk embedding cache."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.ingestion.embedders.cache import CachedEmbeddingGenerator, EmbeddingCache, text_hash
+
+
+class CountingEmbedder:
+    """Embedder stub that records which texts reach the API."""
+
+    model = "test-model"
+    dimension = 3
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5, -1.0] for text in texts]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_cached_generator_only_embeds_misses(tmp_path):
+    """Test that cached texts skip the API and persist across instances."""
+    path = str(tmp_path / "cache.sqlite3")
+    embedder = CountingEmbedder()
+    cached = CachedEmbeddingGenerator(embedder, EmbeddingCache(path))
+
+    first = await cached.generate(["alpha", "beta", "alpha"])
+    assert embedder.calls == [["alpha", "beta"]]
+    assert first[0] == first[2] == [5.0, 0.5, -1.0]
+
+    reopened = CachedEmbeddingGenerator(embedder, EmbeddingCache(path))
+    second = await reopened.generate(["beta", "gamma"])
+    assert embedder.calls[-1] == ["gamma"]
+    assert second[0] == first[1]
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["misses"] == 1
+
+
+@pytest.mark.unit
+def test_cache_is_keyed_by_model_and_prunable(tmp_path):
+    """Test that entries are isolated per model and pruned by model."""
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many([("h1", [1.0, 2.0])], model="old", dimension=2)
+    cache.put_many([("h1", [3.0, 4.0])], model="new", dimension=2)
+
+    assert cache.get_many(["h1"], model="new", dimension=2) == {"h1": [3.0, 4.0]}
+    assert cache.get_many(["h1"], model="new", dimension=4) == {}
+
+    assert cache.prune(keep_models=["new"]) == 1
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_reads_run_off_the_loop_and_defer_recency_updates(tmp_path):
+    """Test that lookups run in a worker thread and write last_used_at only in batches."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path)
+    cache.put_many([(text_hash("alpha"), [1.0, 2.0, 3.0])], model="test-model", dimension=3)
+    threads = []
+    get_many = cache.get_many
+
+    def record_thread(*args):
+        threads.append(threading.get_ident())
+        return get_many(*args)
+
+    cache.get_many = record_thread
+    cached = CachedEmbeddingGenerator(CountingEmbedder(), cache)
+
+    def last_used() -> float:
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT last_used_at FROM embeddings").fetchone()[0]
+
+    before = last_used()
+    assert await cached.generate(["alpha"]) == [[1.0, 2.0, 3.0]]
+    assert threads and threads[0] != threading.get_ident()
+    assert last_used() == before
+    assert not cache._conn.in_transaction
+
+    cache.flush()
+    assert last_used() > before
@@ -0,0 +1,108 @@
+"""Test token-aware embedding batching, concurrency and retries."""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.ingestion.embedders.scheduler import EmbeddingScheduler
+
+
+class RecordingEmbedder:
+    """Embedder stub that records request sizes and peak concurrency."""
+
+    model = "test-model"
+    dimension = 2
+
+    def __init__(self, failures: int = 0):
+        self.requests: list[list[str]] = []
+        self.failures = failures
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                self.failures -= 1
+                request = httpx.Request("POST", "https://example.test/embeddings")
+                raise openai.RateLimitError(
+                    "rate limited",
+                    response=httpx.Response(429, request=request),
+                    body=None,
+                )
+            self.requests.append(list(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_batches_respect_token_and_item_limits():
+    """Test that texts from many callers are packed within both limits."""
+    embedder = RecordingEmbedder()
+    scheduler = EmbeddingScheduler(
+        embedder,
+        max_batch_size=4,
+        max_batch_tokens=10,
+        max_concurrency=2,
+        max_wait_ms=5,
+        token_counter=lambda texts: [len(text) for text in texts],
+    )
+
+    docs = [["aaa", "bbb", "cc"], ["dddd", "e"], ["ffffff", "g", "h"]]
+    results = await asyncio.gather(*(scheduler.generate(doc) for doc in docs))
+    await scheduler.close()
+
+    assert [[v[0] for v in r] for r in results] == [[len(t) for t in doc] for doc in docs]
+    assert sorted(t for req in embedder.requests for t in req) == sorted(
+        t for doc in docs for t in doc
+    )
+    for request in embedder.requests:
+        assert len(request) <= 4
+        assert sum(len(t) for t in request) <= 10
+    assert embedder.peak <= 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_rate_limit_errors_are_retried():
+    """Test that 429 responses are retried with backoff until success."""
+    embedder = RecordingEmbedder(failures=2)
+    scheduler = EmbeddingScheduler(embedder, base_delay=0.001, max_delay=0.01)
+
+    vector = await scheduler.generate_single("hello")
+    await scheduler.close()
+
+    assert vector == [5.0, 1.0]
+    assert embedder.requests == [["hello"]]
+
+
+@pytest.mark.unit
+def test_concurrent_single_queries_share_requests_across_loops():
+    """Test that concurrent generate_single calls coalesce, on every event loop used."""
+    from app.services.metrics import metrics
+
+    embedder = RecordingEmbedder()
+    scheduler = EmbeddingScheduler(
+        embedder, max_wait_ms=5, max_concurrency=1, metrics_prefix="embedding.query"
+    )
+
+    async def burst(texts):
+        return await asyncio.gather(*(scheduler.generate_single(t) for t in texts))
+
+    metrics.reset()
+    first = asyncio.run(burst([f"query {i}" for i in range(10)]))
+    # A shared generator outlives the loop it first ran on (e.g. across tests).
+    second = asyncio.run(burst(["a", "bb"]))
+
+    assert [v[0] for v in first] == [7.0] * 10
+    assert [v[0] for v in second] == [1.0, 2.0]
+    assert len(embedder.requests) == 2
+    snapshot = metrics.snapshot()
+    assert snapshot["histograms"]["embedding.query.batch_size"]["count"] == 2
+    assert snapshot["timings"]["embedding.query.queue_delay_ms"]["count"] == 12
@@ -0,0 +1,60 @@
+"""Test ingestion manifest bookkeeping and deterministic point IDs."""
+
+import pytest
+
+from app.ingestion.manifest import (
+    IngestionManifest,
+    compute_file_hash,
+    make_point_id,
+    normalize_path,
+)
+
+
+@pytest.mark.unit
+def test_point_ids_are_deterministic():
+    """Test that point IDs depend only on document hash and chunk index."""
+    assert make_point_id("abc", 0) == make_point_id("abc", 0)
+    assert make_point_id("abc", 0) != make_point_id("abc", 1)
+    assert make_point_id("abc", 0) != make_point_id("abd", 0)
+
+
+@pytest.mark.unit
+def test_manifest_roundtrip_and_change_detection(tmp_path):
+    """Test that saved entries reload and detect content or settings changes."""
+    doc = tmp_path / "docs" / "faq.md"
+    doc.parent.mkdir()
+    doc.write_text("first version")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = IngestionManifest(manifest_path, fingerprint="semantic:512")
+    content_hash = compute_file_hash(str(doc))
+    assert not manifest.is_unchanged(str(doc), content_hash)
+
+    manifest.record(str(doc), content_hash, [make_point_id(content_hash, 0)])
+    manifest.save()
+
+    reloaded = IngestionManifest(manifest_path, fingerprint="semantic:512")
+    assert reloaded.is_unchanged(str(doc), content_hash)
+
+    doc.write_text("second version")
+    assert not reloaded.is_unchanged(str(doc), compute_file_hash(str(doc)))
+
+    rechunked = IngestionManifest(manifest_path, fingerprint="recursive:512")
+    assert not rechunked.is_unchanged(str(doc), content_hash)
+
+
+@pytest.mark.unit
+def test_paths_under_and_shared_point_ids(tmp_path):
+    """Test directory scoping and point IDs shared between entries."""
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    top = tmp_path / "a.md"
+    nested = tmp_path / "sub" / "b.md"
+    manifest.record(str(top), "h1", ["p1", "shared"])
+    manifest.record(str(nested), "h2", ["p2", "shared"])
+
+    assert manifest.paths_under(str(tmp_path), recursive=False) == [normalize_path(str(top))]
+    assert set(manifest.paths_under(str(tmp_path))) == {
+        normalize_path(str(top)),
+        normalize_path(str(nested)),
+    }
+    assert manifest.referenced_point_ids(exclude=str(top)) == {"p2", "shared"}
@@ -0,0 +1,176 @@
+"""Test the staged ingestion pipeline with an in-memory vector store."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.ingestion.pipeline import IngestionPipeline
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_staged_ingestion_batches_upserts_and_skips_unchanged(tmp_path):
+    """Test that all chunks are stored once and unchanged files are skipped on rerun."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(5):
+        (docs / f"doc{i}.md").write_text(
+            "\n\n".join(f"Section {j} of document {i}. " + "word " * 400 for j in range(4))
+        )
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+    )
+    stored: dict[str, dict] = {}
+    upserts: list[int] = []
+
+    async def upsert_documents(collection_name, points):
+        upserts.append(len(points))
+        stored.update({point.id: point.payload for point in points})
+
+    async def delete_points(collection_name, point_ids):
+        for point_id in point_ids:
+            stored.pop(point_id, None)
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+    pipeline.qdrant.delete_points = delete_points
+
+    first = await pipeline.ingest_directory(str(docs))
+    assert first.successful == 5
+    assert len(stored) == first.total_chunks == sum(upserts)
+    assert first.stages["upsert"]["items"] == first.total_chunks
+    assert {payload["chunk_index"] for payload in stored.values()} == set(
+        range(first.total_chunks // 5)
+    )
+    for payload in stored.values():
+        sentences = [payload["text"][start:end] for start, end, _ in payload["sentences"]]
+        assert sentences and all(s and s == s.strip() for s in sentences)
+        assert payload["token_count"] > 0
+
+    second = await pipeline.ingest_directory(str(docs))
+    await pipeline.close()
+    assert second.skipped == 5
+    assert sum(upserts) == first.total_chunks
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_filtered_reingest_keeps_files_outside_the_filter(tmp_path):
+    """Test that an extension-filtered run only prunes files that are really gone."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("Markdown document. " * 50)
+    (docs / "b.txt").write_text("Text document. " * 50)
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+    )
+    deleted: list[str] = []
+
+    async def upsert_documents(collection_name, points):
+        pass
+
+    async def delete_points(collection_name, point_ids):
+        deleted.extend(point_ids)
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+    pipeline.qdrant.delete_points = delete_points
+
+    await pipeline.ingest_directory(str(docs))
+    txt_points = pipeline.manifest.get(str(docs / "b.txt"))["point_ids"]
+
+    filtered = await pipeline.ingest_directory(str(docs), file_extensions=[".md"])
+    assert filtered.deleted == 0
+    assert deleted == []
+    assert pipeline.manifest.get(str(docs / "b.txt")) is not None
+
+    (docs / "b.txt").unlink()
+    removed = await pipeline.ingest_directory(str(docs), file_extensions=[".md"])
+    await pipeline.close()
+    assert removed.deleted == 1
+    assert deleted == txt_points
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_points_upserted_counts_shared_points_once(tmp_path):
+    """Test that identical files at two paths report their shared points once."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("Shared document. " * 200)
+    (docs / "copy.md").write_text("Shared document. " * 200)
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+    )
+    stored: set[str] = set()
+
+    async def upsert_documents(collection_name, points):
+        stored.update(str(point.id) for point in points)
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+
+    result = await pipeline.ingest_directory(str(docs))
+    await pipeline.close()
+
+    assert result.total_chunks == 2 * len(stored)
+    assert result.points_upserted == len(stored)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_failed_document_leaves_no_orphan_points(tmp_path, monkeypatch):
+    """Test that groups stored before a later group fails to embed are deleted."""
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_BATCH_SIZE", 2)
+    document = tmp_path / "long.md"
+    document.write_text("\n\n".join(f"Section {i}. " + "Detail text. " * 120 for i in range(6)))
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+    )
+    embedder = pipeline.embedder
+    calls = 0
+    stored: dict[str, dict] = {}
+    upserts = 0
+
+    async def generate(texts):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            await asyncio.sleep(0.05)  # let the first group be upserted
+            raise RuntimeError("embedding API unavailable")
+        return await type(embedder).generate(embedder, texts)
+
+    async def upsert_documents(collection_name, points):
+        nonlocal upserts
+        upserts += 1
+        stored.update({str(point.id): point.payload for point in points})
+
+    async def delete_points(collection_name, point_ids):
+        for point_id in point_ids:
+            stored.pop(point_id, None)
+
+    embedder.generate = generate
+    pipeline.qdrant.upsert_documents = upsert_documents
+    pipeline.qdrant.delete_points = delete_points
+
+    result = await pipeline.ingest_document(str(document))
+    await pipeline.close()
+
+    assert not result["success"]
+    assert upserts >= 1
+    assert stored == {}
+    assert pipeline.manifest.get(str(document)) is None
@@ -0,0 +1,104 @@
+"""Test embedding model selection, dimensions and off-loop encoding."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.ingestion.embedders import embedding as embedding_module
+from app.ingestion.embedders.cache import CachedEmbeddingGenerator, EmbeddingCache
+from app.ingestion.embedders.embedding import requested_dimensions
+from app.ingestion.embedders.local_embedding import (
+    LocalEmbeddingGenerator,
+    embedding_dimension,
+    instruction_prefix,
+    is_local_model,
+)
+
+
+class FakeEncoder:
+    """Stand-in for a loaded SentenceTransformer."""
+
+    def __init__(self):
+        self.threads: list[str] = []
+        self.texts: list[str] = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 3
+
+    def encode(self, texts, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        self.texts.extend(texts)
+        assert kwargs["normalize_embeddings"] is True
+        return np.array([[float(len(text)), 0.0, 0.0] for text in texts])
+
+
+@pytest.mark.unit
+def test_local_model_selection_and_dimensions():
+    """Test that only local/ models use the local backend and report their size."""
+    assert is_local_model("local/BAAI/bge-small-en-v1.5")
+    assert not is_local_model("text-embedding-3-small")
+    assert embedding_dimension("local/BAAI/bge-small-en-v1.5") == 384
+    assert embedding_dimension("local/intfloat/e5-small-v2") == 384
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_generate_encodes_in_executor():
+    """Test that encoding runs off the event loop thread with the model's dimension."""
+    generator = LocalEmbeddingGenerator("local/custom/model")
+    encoder = FakeEncoder()
+    generator._encoder = encoder
+
+    vectors = await generator.generate(["a", "bbb"])
+
+    assert vectors == [[1.0, 0.0, 0.0], [3.0, 0.0, 0.0]]
+    assert generator.dimension == 3
+    assert encoder.threads[0].startswith("embedding")
+    assert await generator.generate([]) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_query_and_document_prefixes(tmp_path, monkeypatch):
+    """Test that e5 queries and documents get their own prefixes and cache entries."""
+    model = "local/intfloat/e5-small-v2"
+    query = LocalEmbeddingGenerator(model, input_type="query")
+    document = LocalEmbeddingGenerator(model)
+    query._encoder = document._encoder = encoder = FakeEncoder()
+
+    await query.generate(["refund policy"])
+    await document.generate(["refund policy"])
+    assert encoder.texts == ["query: refund policy", "passage: refund policy"]
+
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    await CachedEmbeddingGenerator(query, cache).generate(["refund policy"])
+    await CachedEmbeddingGenerator(document, cache).generate(["refund policy"])
+    assert len(encoder.texts) == 4
+
+    assert instruction_prefix("local/BAAI/bge-small-en-v1.5", "document") == ""
+    assert instruction_prefix("text-embedding-3-small", "query") == ""
+    monkeypatch.setattr(settings, "EMBEDDING_LOCAL_QUERY_PREFIX", "search_query: ")
+    assert instruction_prefix("local/custom/model", "query") == "search_query: "
+
+
+@pytest.mark.unit
+def test_requested_dimensions_only_for_matryoshka_models():
+    """Test that only text-embedding-3 models get a reduced ``dimensions`` parameter."""
+    assert requested_dimensions("text-embedding-3-small", 512) == 512
+    assert requested_dimensions("openai/text-embedding-3-large", 1024) == 1024
+    assert requested_dimensions("text-embedding-3-small", 1536) is None
+    assert requested_dimensions("text-embedding-ada-002", 1536) is None
+    with pytest.raises(ValueError):
+        requested_dimensions("text-embedding-3-small", 3072)
+
+
+@pytest.mark.unit
+def test_context_sentences_use_the_document_prefix(monkeypatch):
+    """Test that query-time document embedding uses the passage prefix, not the query one."""
+    monkeypatch.setattr(settings, "EMBEDDING_MODEL", "local/intfloat/e5-small-v2")
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(embedding_module, "_document_embedding_generator", None)
+
+    assert embedding_module.get_document_embedding_generator().prefix == "passage: "
@@ -0,0 +1,89 @@
+"""Test the in-process vector index against Qdrant search."""
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import Distance, VectorParams
+
+from app.rag.local_index import LocalVectorIndex, export_snapshot
+from app.rag.qdrant_client import QdrantManager, build_filter
+
+DIMENSION = 32
+
+
+@pytest.fixture
+def populated_qdrant(monkeypatch):
+    """In-memory Qdrant with a small, randomly embedded collection."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    client = QdrantManager.get_client()
+    client.create_collection(
+        "kb", vectors_config=VectorParams(size=DIMENSION, distance=Distance.COSINE)
+    )
+
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(300, DIMENSION)).astype(np.float32)
+    client.upsert(
+        "kb",
+        points=[
+            models.PointStruct(
+                id=i,
+                vector=vector.tolist(),
+                payload={
+                    "text": f"chunk {i}",
+                    "language": "en" if i % 10 else "zh",
+                    "file_name": f"doc{i % 3}.md",
+                },
+            )
+            for i, vector in enumerate(vectors)
+        ],
+    )
+    return client, rng
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_brute_force_matches_qdrant(populated_qdrant, tmp_path, dtype):
+    """Test that brute-force snapshot search returns Qdrant's ranking and filters."""
+    client, rng = populated_qdrant
+    path = str(tmp_path / "snapshot")
+    meta = export_snapshot("kb", path, dtype=dtype, fields=["file_name"])
+    assert meta["count"] == 300
+
+    index = LocalVectorIndex(path)
+    for _ in range(5):
+        query = rng.normal(size=DIMENSION).tolist()
+        filters = {"file_name": ["doc0.md", "doc2.md"]}
+        expected = client.query_points(
+            "kb", query=query, query_filter=build_filter(filters), limit=10
+        ).points
+
+        hits = index.search(query, limit=10, filters=filters)
+
+        assert [h.id for h in hits] == [p.id for p in expected]
+        assert all(h.payload["language"] == "en" for h in hits)
+        np.testing.assert_allclose(
+            [h.score for h in hits], [p.score for p in expected], atol=1e-2
+        )
+
+
+@pytest.mark.unit
+def test_ivf_search_and_unindexed_filter(populated_qdrant, tmp_path):
+    """Test IVF probing and that filtering on an unindexed field is rejected."""
+    client, rng = populated_qdrant
+    path = str(tmp_path / "snapshot")
+    export_snapshot("kb", path, nlist=8, fields=["file_name"])
+
+    query = rng.normal(size=DIMENSION).tolist()
+    exact = LocalVectorIndex(path, nprobe=8).search(query, limit=5)
+    probed = LocalVectorIndex(path, nprobe=2).search(query, limit=5)
+
+    expected = client.query_points("kb", query=query, query_filter=build_filter(), limit=5)
+    assert [h.id for h in exact] == [p.id for p in expected.points]
+
+    # Probing fewer lists can only miss neighbours, never outrank them.
+    scores = [h.score for h in probed]
+    assert len(probed) == 5 and scores == sorted(scores, reverse=True)
+    assert scores[0] <= exact[0].score + 1e-6
+
+    with pytest.raises(ValueError):
+        LocalVectorIndex(path).search(query, filters={"source_path": "/x"})
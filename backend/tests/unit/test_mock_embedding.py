@@ -0,0 +1,52 @@
+"""Test the deterministic, vectorized mock embedder."""
+
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from app.ingestion.embedders.mock_embedding import MockEmbeddingGenerator
+
+
+@pytest.mark.unit
+def test_random_mode_is_stable_across_processes():
+    """Test that vectors do not depend on hash randomization or global RNG state."""
+    random.seed(1234)
+    state = random.getstate()
+    vector = MockEmbeddingGenerator(dimension=16).embed(["refund policy"])[0]
+    assert random.getstate() == state
+
+    script = (
+        "from app.ingestion.embedders.mock_embedding import MockEmbeddingGenerator;"
+        "print(MockEmbeddingGenerator(dimension=16).embed(['refund policy'])[0].tolist())"
+    )
+    for hash_seed in ("1", "2"):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONHASHSEED": hash_seed},
+        ).stdout
+        np.testing.assert_allclose(eval(output), vector, rtol=1e-6)
+
+
+@pytest.mark.unit
+def test_semantic_mode_keeps_near_duplicates_close():
+    """Test that texts sharing most words are closer than unrelated ones."""
+    embedder = MockEmbeddingGenerator(dimension=256, mode="semantic")
+    base, near, other, empty = embedder.embed(
+        [
+            "Refunds are processed within 5-7 business days after we receive the item.",
+            "Refunds are processed within 5 to 7 business days once we receive the item.",
+            "Our support team is available Monday through Friday, 9 AM to 6 PM.",
+            "",
+        ]
+    )
+
+    np.testing.assert_allclose(np.linalg.norm([base, near, other, empty], axis=1), 1, rtol=1e-5)
+    assert base @ near > 0.8
+    assert base @ near > base @ other + 0.4
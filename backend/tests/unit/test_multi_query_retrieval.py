@@ -0,0 +1,81 @@
+"""Test sub-query fan-out retrieval with RRF fusion."""
+
+import pytest
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.models import Distance, VectorParams
+
+from app.rag import retriever as retriever_module
+from app.rag.qdrant_client import QdrantManager
+from app.rag.retriever import DenseRetriever, reciprocal_rank_fusion
+
+# Two topics on orthogonal axes; point 2 is relevant to both, point 4 to neither.
+VECTORS = {
+    1: [1.0, 0.0, 0.0],
+    2: [0.7, 0.7, 0.0],
+    3: [0.0, 1.0, 0.0],
+    4: [0.0, 0.0, 1.0],
+}
+QUERIES = {"gst registration": [1.0, 0.1, 0.0], "invoice requirements": [0.1, 1.0, 0.0]}
+
+
+class RecordingEmbedder:
+    """Embedder that maps known queries to fixed vectors and records calls."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def generate(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(texts)
+        return [QUERIES[text] for text in texts]
+
+    async def generate_single(self, text: str) -> list[float]:
+        return (await self.generate([text]))[0]
+
+
+@pytest.mark.unit
+def test_reciprocal_rank_fusion_dedupes_and_orders():
+    """Test that points found by several lists are merged and ranked first."""
+
+    def point(point_id):
+        return models.ScoredPoint(id=point_id, version=0, score=1.0)
+
+    fused = reciprocal_rank_fusion([[point(1), point(2)], [point(2), point(3)]], k=60)
+
+    assert [p.id for p in fused] == [2, 1, 3]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.filterwarnings("ignore:Local mode performs exact")
+async def test_multi_search_embeds_once_and_fuses(monkeypatch):
+    """Test that all sub-queries share one embedding call and one batched search."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    client = QdrantManager.get_client()
+    client.create_collection("kb", vectors_config=VectorParams(size=3, distance=Distance.COSINE))
+    client.upsert(
+        "kb",
+        points=[
+            models.PointStruct(id=i, vector=v, payload={"text": f"chunk {i}", "language": "en"})
+            for i, v in VECTORS.items()
+        ],
+    )
+
+    embedder = RecordingEmbedder()
+    monkeypatch.setattr(retriever_module, "get_embedding_generator", lambda: embedder)
+    batch_calls = []
+    original = client.query_batch_points
+    monkeypatch.setattr(
+        client,
+        "query_batch_points",
+        lambda **kwargs: batch_calls.append(kwargs) or original(**kwargs),
+    )
+
+    retriever = DenseRetriever()
+    retriever.k = 3
+    results = await retriever.multi_search(list(QUERIES), collection_name="kb")
+
+    assert embedder.calls == [list(QUERIES)]
+    assert len(batch_calls) == 1
+    # Each topic's best match plus the shared point, each once.
+    assert sorted(p.id for p in results) == [1, 2, 3]
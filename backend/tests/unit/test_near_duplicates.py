@@ -0,0 +1,128 @@
+"""Test SimHash near-duplicate detection at ingestion and query time."""
+
+import os
+
+import pytest
+from qdrant_client import QdrantClient
+
+from app.ingestion.pipeline import IngestionPipeline
+from app.rag.qdrant_client import QdrantManager
+from app.services.simhash import (
+    collapse_near_duplicates,
+    format_signature,
+    hamming_distance,
+    simhash,
+)
+
+POLICY = " ".join(
+    f"Clause {i}: items may be returned within thirty days when unused." for i in range(40)
+)
+
+
+@pytest.mark.unit
+def test_simhash_ignores_formatting_and_separates_topics():
+    """Test that reformatted copies match and unrelated text does not."""
+    exported = "**" + POLICY.upper().replace(".", " .\n") + "**"
+    edited = POLICY.replace("Clause 7: items", "Clause 7: goods")
+    other = " ".join(f"Order {i} ships by courier in two days." for i in range(40))
+
+    assert simhash(exported) == simhash(POLICY)
+    assert hamming_distance(simhash(edited), simhash(POLICY)) <= 3
+    assert hamming_distance(simhash(other), simhash(POLICY)) > 3
+
+
+@pytest.mark.unit
+def test_collapse_keeps_best_of_each_group():
+    """Test that only the first (best-ranked) near duplicate survives."""
+    documents = [
+        {"id": "pdf", "simhash": format_signature(simhash(POLICY))},
+        {"id": "other", "simhash": format_signature(simhash("Shipping takes two days."))},
+        {"id": "html", "simhash": format_signature(simhash(POLICY.lower()))},
+        {"id": "legacy"},
+    ]
+
+    kept = collapse_near_duplicates(documents, max_distance=3)
+
+    assert [doc["id"] for doc in kept] == ["pdf", "other", "legacy"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_ingestion_skips_chunks_duplicated_across_documents(tmp_path, monkeypatch):
+    """Test that a paragraph shared by two exports is stored once."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "policy.md").write_text(POLICY + "\n\n" + "Refund detail. " * 300)
+    (docs / "policy_export.txt").write_text(POLICY + "\n\n" + "Exchange detail. " * 300)
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+        skip_near_duplicates=True,
+    )
+    stored: dict[str, dict] = {}
+
+    async def upsert_documents(collection_name, points):
+        stored.update({point.id: point.payload for point in points})
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+
+    result = await pipeline.ingest_directory(str(docs))
+    await pipeline.close()
+
+    assert result.successful == 2
+    assert result.duplicate_chunks == 1
+    assert sum(payload["text"].startswith("Clause 0") for payload in stored.values()) == 1
+    assert all("simhash" in payload for payload in stored.values())
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.parametrize("change", ["edit", "delete"])
+async def test_dropped_chunk_is_restored_when_its_kept_copy_goes(tmp_path, monkeypatch, change):
+    """Test that changing or deleting the document holding a kept copy re-ingests its dependents."""
+    monkeypatch.setattr(QdrantManager, "_instance", QdrantClient(":memory:"))
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "policy.md").write_text(POLICY + "\n\n" + "Refund detail. " * 300)
+    (docs / "policy_export.txt").write_text(POLICY + "\n\n" + "Exchange detail. " * 300)
+
+    pipeline = IngestionPipeline(
+        chunk_strategy="recursive",
+        use_mock_embeddings=True,
+        manifest_path=str(tmp_path / "manifest.json"),
+        workers=0,
+        skip_near_duplicates=True,
+    )
+    stored: dict[str, dict] = {}
+
+    async def upsert_documents(collection_name, points):
+        stored.update({point.id: point.payload for point in points})
+
+    async def delete_points(collection_name, point_ids):
+        for point_id in point_ids:
+            stored.pop(point_id, None)
+
+    pipeline.qdrant.upsert_documents = upsert_documents
+    pipeline.qdrant.delete_points = delete_points
+
+    await pipeline.ingest_directory(str(docs))
+    documents = pipeline.manifest.documents
+    (dependent,) = [path for path, entry in documents.items() if "depends_on" in entry]
+    (canonical,) = documents[dependent]["depends_on"]
+
+    if change == "edit":
+        with open(canonical, "w") as f:
+            f.write("Warranty detail. " * 300)
+    else:
+        os.remove(canonical)
+    await pipeline.ingest_directory(str(docs))
+    await pipeline.close()
+
+    clauses = [payload for payload in stored.values() if payload["text"].startswith("Clause 0")]
+    assert [payload["source_path"] for payload in clauses] == [dependent]
+    assert "depends_on" not in pipeline.manifest.get(dependent)
+    assert pipeline.manifest.invalidated_paths() == []
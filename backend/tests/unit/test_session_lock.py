@@ -0,0 +1,73 @@
+"""Test per-session lock ordering and isolation."""
+
+import asyncio
+
+import pytest
+
+from app.services.metrics import metrics
+from app.services.session_lock import SessionLockManager, SessionLockTimeoutError
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_same_session_turns_run_in_order():
+    """Test that turns for one session never overlap and keep arrival order."""
+    locks = SessionLockManager(distributed=False)
+    events = []
+
+    async def turn(index: int):
+        async with locks.acquire("session-a"):
+            events.append(("start", index))
+            await asyncio.sleep(0.01)
+            events.append(("end", index))
+
+    await asyncio.gather(*(turn(i) for i in range(3)))
+
+    assert events == [
+        ("start", 0),
+        ("end", 0),
+        ("start", 1),
+        ("end", 1),
+        ("start", 2),
+        ("end", 2),
+    ]
+    assert not locks.is_locked("session-a")
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_different_sessions_run_in_parallel():
+    """Test that different sessions do not block each other."""
+    locks = SessionLockManager(distributed=False)
+    both_inside = asyncio.Event()
+    inside = set()
+
+    async def turn(session_id: str):
+        async with locks.acquire(session_id):
+            inside.add(session_id)
+            if len(inside) == 2:
+                both_inside.set()
+            await asyncio.wait_for(both_inside.wait(), timeout=1)
+
+    await asyncio.gather(turn("session-a"), turn("session-b"))
+
+    assert inside == {"session-a", "session-b"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_wait_timeout_raises_and_records_metric():
+    """Test that waiting past the timeout raises SessionLockTimeoutError."""
+    locks = SessionLockManager(distributed=False, wait_timeout=0.01)
+    metrics.reset()
+
+    async with locks.acquire("session-a"):
+        with pytest.raises(SessionLockTimeoutError):
+            async with locks.acquire("session-a"):
+                pass
+
+    assert metrics.counters["session_lock.timeouts"] == 1
+    # The acquired wait and the timed-out one are both recorded.
+    assert metrics.timings["session_lock.wait_ms"].count == 2
+    assert metrics.timings["session_lock.wait_ms"].max >= 5
+    assert not locks.is_locked("session-a")